@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+""" Benchmark subsequence engines over text size and pattern periodicity """
+
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from tabulate import tabulate
+from subs_index import FMIndex, build_index
+from subs_stream import find_stream
+
+SOLUTIONS = [
+    'solution1_str_find', 'solution2_str_index', 'solution3_functional',
+    'solution4_kmers_functional', 'solution4_kmers_imperative',
+    'solution5_re'
+]
+INDEXED = {'subs_index'}
+BUILD = 'subs_index_build'
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    sizes: List[int]
+    lengths: List[int]
+    periods: List[int]
+    engines: List[str]
+    budget: float
+    memory: int
+    seed: int
+    tablefmt: str
+
+
+class Result(NamedTuple):
+    """ One benchmark measurement """
+    engine: str
+    text: str
+    size: int
+    pattern_len: int
+    period: int
+    matches: Optional[int]
+    seconds: Optional[float]
+    mb_per_sec: Optional[float]
+
+
+class Footprint(NamedTuple):
+    """ Bytes an engine holds beyond the text itself """
+    per_base: int
+    per_kmer_base: int
+    per_match: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark subsequence engines',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('-s',
+                        '--sizes',
+                        help='Text sizes, e.g., 1K 1M 1G',
+                        metavar='size',
+                        nargs='+',
+                        default=['1K', '10K', '100K', '1M'])
+
+    parser.add_argument('-l',
+                        '--lengths',
+                        help='Pattern lengths',
+                        metavar='int',
+                        type=int,
+                        nargs='+',
+                        default=[4, 16, 64])
+
+    parser.add_argument('-p',
+                        '--periods',
+                        help='Pattern periods (0 for an aperiodic pattern)',
+                        metavar='int',
+                        type=int,
+                        nargs='+',
+                        default=[0, 1, 2])
+
+    parser.add_argument('-e',
+                        '--engines',
+                        help='Engines to run',
+                        metavar='engine',
+                        nargs='+',
+                        choices=list(ENGINES),
+                        default=list(ENGINES))
+
+    parser.add_argument('-b',
+                        '--budget',
+                        help='Skip a run expected to take longer, going by '
+                        'the last size',
+                        metavar='seconds',
+                        type=float,
+                        default=10.)
+
+    parser.add_argument('-m',
+                        '--memory',
+                        help='Skip a run expected to use more memory, '
+                        'e.g., 512M, 4G (default half of physical memory)',
+                        metavar='size',
+                        type=str)
+
+    parser.add_argument('--seed',
+                        help='Random seed',
+                        metavar='int',
+                        type=int,
+                        default=1)
+
+    parser.add_argument('-t',
+                        '--tablefmt',
+                        metavar='table',
+                        type=str,
+                        choices=['plain', 'simple', 'grid', 'pipe', 'tsv'],
+                        default='simple',
+                        help='Tabulate table style')
+
+    args = parser.parse_args()
+
+    try:
+        sizes = sorted(map(parse_size, args.sizes))
+        memory = parse_size(args.memory) if args.memory else \
+            physical_memory() // 2
+    except ValueError as err:
+        parser.error(str(err))
+
+    if bad_len := next((n for n in args.lengths if n < 1), None):
+        parser.error(f'--lengths "{bad_len}" must be > 0')
+
+    if bad_period := next((p for p in args.periods if p < 0), None):
+        parser.error(f'--periods "{bad_period}" must be >= 0')
+
+    shortest = min(args.lengths)
+    if bad_period := next((p for p in args.periods if p >= shortest), None):
+        parser.error(f'--periods "{bad_period}" must be less than the '
+                     f'shortest of --lengths "{shortest}"')
+
+    return Args(sizes=sizes,
+                lengths=args.lengths,
+                periods=args.periods,
+                engines=args.engines,
+                budget=args.budget,
+                memory=memory,
+                seed=args.seed,
+                tablefmt=args.tablefmt)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    rng = np.random.default_rng(args.seed)
+    last: Dict[str, Result] = {}
+    results: List[Result] = []
+
+    for size in args.sizes:
+        text_random = random_text(rng, size)
+        with tempfile.TemporaryDirectory() as tmp:
+            indexes: Dict[str, Optional[FMIndex]] = {}
+            for length in args.lengths:
+                for period in args.periods:
+                    pattern = make_pattern(rng, length, period)
+                    texts = {'random': text_random}
+                    if period:
+                        texts['periodic'] = periodic_text(
+                            pattern, period, size)
+
+                    for text_name, text in texts.items():
+                        # Index each text once, timed apart from the queries
+                        label = text_name if text_name == 'random' else \
+                            f'{text_name}-{length}-{period}'
+                        if INDEXED & set(args.engines) and \
+                                label not in indexes:
+                            key = f'{BUILD}-{text_name}'
+                            skip = over_budget(args, last.get(key), BUILD,
+                                               size, 0, 0)
+                            indexes[label], result = build_engine_index(
+                                text, text_name, period,
+                                os.path.join(tmp, label), skip)
+                            last[key] = result
+                            results.append(result)
+                            print(format_result(result), file=sys.stderr)
+
+                        matches = expected_matches(size, length, period,
+                                                   text_name)
+                        for engine in args.engines:
+                            key = f'{engine}-{text_name}-{length}-{period}'
+                            target = indexes[label] if engine in INDEXED \
+                                else text
+                            skip = target is None or over_budget(
+                                args, last.get(key), engine, size, length,
+                                matches)
+                            result = run_engine(engine, target, text_name,
+                                                size, pattern, period, skip)
+                            last[key] = result
+                            results.append(result)
+                            print(format_result(result), file=sys.stderr)
+
+    hdr = list(Result._fields)
+    print(tabulate(results, headers=hdr, tablefmt=args.tablefmt,
+                   floatfmt='.4f', missingval='skipped'))
+
+
+# --------------------------------------------------
+def parse_size(size: str) -> int:
+    """ Parse a size like 100, 10K, 1M or 1G """
+
+    units = {'K': 1_000, 'M': 1_000_000, 'G': 1_000_000_000}
+    value = size.upper()
+    mult = units.get(value[-1:], 1)
+    if mult > 1:
+        value = value[:-1]
+
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f'Invalid size "{size}"')
+
+    return int(value) * mult
+
+
+# --------------------------------------------------
+def test_parse_size() -> None:
+    """ Test parse_size """
+
+    assert parse_size('100') == 100
+    assert parse_size('10K') == 10_000
+    assert parse_size('1m') == 1_000_000
+    assert parse_size('1G') == 1_000_000_000
+    for bad in ['', 'K', 'foo', '0', '-1M']:
+        try:
+            parse_size(bad)
+        except ValueError:
+            pass
+        else:
+            assert False, bad
+
+
+# --------------------------------------------------
+def physical_memory() -> int:
+    """ Bytes of physical memory, or 4GB if it cannot be found """
+
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return 4 * 2**30
+
+
+# --------------------------------------------------
+def random_text(rng: np.random.Generator, size: int) -> str:
+    """ Uniform random DNA """
+
+    bases = np.frombuffer(b'ACGT', dtype=np.uint8)
+    return rng.choice(bases, size).tobytes().decode()
+
+
+# --------------------------------------------------
+def make_pattern(rng: np.random.Generator, length: int, period: int) -> str:
+    """ Random pattern, or a random unit of `period` bases repeated """
+
+    if not period or period >= length:
+        return random_text(rng, length)
+
+    unit = random_text(rng, period)
+    return (unit * (length // period + 1))[:length]
+
+
+# --------------------------------------------------
+def periodic_text(pattern: str, period: int, size: int) -> str:
+    """
+    Worst case: repeat the pattern's unit so it matches everywhere. A
+    pattern no longer than the period has no unit to repeat.
+    """
+
+    if not 0 < period < len(pattern):
+        raise ValueError(f'Period "{period}" must be > 0 and less than '
+                         f'the pattern length "{len(pattern)}"')
+
+    unit = pattern[:period]
+    return (unit * (size // period + 1))[:size]
+
+
+# --------------------------------------------------
+def test_patterns() -> None:
+    """ Test make_pattern, periodic_text """
+
+    rng = np.random.default_rng(1)
+    assert len(make_pattern(rng, 10, 0)) == 10
+    pat = make_pattern(rng, 7, 2)
+    assert pat == pat[:2] * 3 + pat[0]
+    assert len(set(make_pattern(rng, 8, 1))) == 1
+    assert periodic_text('ATATA', 2, 5) == 'ATATA'
+    assert periodic_text('ATATA', 2, 8) == 'ATATATAT'
+    for bad in [0, 5, 6]:
+        try:
+            periodic_text('ATATA', bad, 10)
+        except ValueError:
+            pass
+        else:
+            assert False, bad
+
+
+# --------------------------------------------------
+def expected_matches(size: int, length: int, period: int,
+                     text_name: str) -> float:
+    """
+    Matches expected by chance in random text, or every period bases in
+    the repeated unit of a periodic text
+    """
+
+    positions = max(size - length + 1, 0)
+    if text_name == 'periodic':
+        return positions / period
+
+    return positions / 4**length
+
+
+# --------------------------------------------------
+def test_expected_matches() -> None:
+    """ Test expected_matches """
+
+    assert expected_matches(1003, 4, 0, 'random') == 1000 / 256
+    assert expected_matches(1003, 4, 2, 'periodic') == 500
+    assert expected_matches(3, 4, 2, 'periodic') == 0
+
+
+# --------------------------------------------------
+def solution_engine(module: str) -> Callable[[str, str], int]:
+    """ Count matches with a solution's find_subseq() """
+
+    find = importlib.import_module(module).find_subseq
+
+    def engine(text: str, pattern: str) -> int:
+        return len(find(text, pattern))
+
+    return engine
+
+
+# --------------------------------------------------
+def stream_engine(text: str, pattern: str) -> int:
+    """ Count matches with subs_stream in 4MB blocks """
+
+    size = 2**22
+    blocks = (text[i:i + size] for i in range(0, len(text), size))
+    return sum(1 for _ in find_stream(blocks, pattern))
+
+
+# --------------------------------------------------
+def fm_index_engine(index: FMIndex, pattern: str) -> int:
+    """ Count matches with a subs_index built beforehand """
+
+    return len(index.locate(pattern))
+
+
+ENGINES: Dict[str, Callable[[Any, str], int]] = {
+    **{name: solution_engine(name)
+       for name in SOLUTIONS}, 'subs_stream': stream_engine,
+    'subs_index': fm_index_engine
+}
+
+# Rough peaks: a list holds an 8-byte pointer to each 28-byte int or
+# 49-byte str plus its characters, and the suffix array build holds about
+# ten int64 arrays as long as the text
+FOOTPRINTS: Dict[str, Footprint] = {
+    'solution1_str_find': Footprint(0, 0, 36),
+    'solution2_str_index': Footprint(1, 0, 36),
+    'solution3_functional': Footprint(36, 0, 100),
+    'solution4_kmers_functional': Footprint(0, 0, 36),
+    'solution4_kmers_imperative': Footprint(57, 1, 36),
+    'solution5_re': Footprint(0, 0, 36),
+    'subs_stream': Footprint(0, 0, 0),
+    'subs_index': Footprint(0, 0, 100),
+    BUILD: Footprint(80, 0, 0),
+}
+
+
+# --------------------------------------------------
+def predict_memory(engine: str, size: int, length: int,
+                   matches: float) -> int:
+    """ Bytes an engine is expected to hold beyond the text """
+
+    cost = FOOTPRINTS[engine]
+    return int(size * (cost.per_base + cost.per_kmer_base * length) +
+               matches * cost.per_match)
+
+
+# --------------------------------------------------
+def over_budget(args: Args, last: Optional[Result], engine: str, size: int,
+                length: int, matches: float) -> bool:
+    """
+    Whether a run should be skipped: it was skipped on a smaller text, the
+    time on the last text scaled up to this size is over the budget, or
+    it is expected to need more than the memory allowed
+    """
+
+    if last is not None:
+        if last.seconds is None:
+            return True
+        if last.seconds * size / last.size > args.budget:
+            return True
+
+    return predict_memory(engine, size, length, matches) > args.memory
+
+
+# --------------------------------------------------
+def test_over_budget() -> None:
+    """ Test predict_memory, over_budget """
+
+    args = Args([], [], [], [], 10., 2**30, 1, 'plain')
+    last = Result('subs_stream', 'random', 1000, 4, 0, 1, 0.01, 0.1)
+    assert not over_budget(args, last, 'subs_stream', 10**6, 4, 0)
+    assert over_budget(args, last, 'subs_stream', 10**7, 4, 0)
+    assert over_budget(args, last._replace(seconds=None), 'subs_stream',
+                       10**4, 4, 0)
+
+    # A list of 10^8 k-mers of 4 bases is about 6GB
+    assert predict_memory('solution4_kmers_imperative', 10**8, 4, 0) == \
+        61 * 10**8
+    assert not over_budget(args, None, 'solution4_kmers_imperative', 10**6,
+                           4, 0)
+    assert over_budget(args, None, 'solution4_kmers_imperative', 10**8, 4, 0)
+    assert over_budget(args, None, BUILD, 10**8, 0, 0)
+    assert over_budget(args, None, 'solution1_str_find', 10**8, 1, 10**8)
+    assert not over_budget(args, None, 'solution1_str_find', 10**8, 16, 1)
+
+
+# --------------------------------------------------
+def build_engine_index(text: str, text_name: str, period: int, basename: str,
+                       skip: bool) -> Tuple[Optional[FMIndex], Result]:
+    """ Build and time a subs_index, unless it is skipped """
+
+    index, matches, secs, rate = None, None, None, None
+    if not skip:
+        start = time.perf_counter()
+        build_index(basename, ['bench'], [text])
+        secs = time.perf_counter() - start
+        rate = len(text) / 1e6 / secs if secs else None
+        index, matches = FMIndex(basename), 0
+
+    return index, Result(engine=BUILD,
+                         text=text_name,
+                         size=len(text),
+                         pattern_len=0,
+                         period=period,
+                         matches=matches,
+                         seconds=secs,
+                         mb_per_sec=rate)
+
+
+# --------------------------------------------------
+def run_engine(engine: str, target: Any, text_name: str, size: int,
+               pattern: str, period: int, skip: bool) -> Result:
+    """
+    Time one engine on a text of size, or on its index for the indexed
+    engines, unless it is skipped
+    """
+
+    matches, secs, rate = None, None, None
+    if not skip:
+        start = time.perf_counter()
+        matches = ENGINES[engine](target, pattern)
+        secs = time.perf_counter() - start
+        rate = size / 1e6 / secs if secs else None
+
+    return Result(engine=engine,
+                  text=text_name,
+                  size=size,
+                  pattern_len=len(pattern),
+                  period=period,
+                  matches=matches,
+                  seconds=secs,
+                  mb_per_sec=rate)
+
+
+# --------------------------------------------------
+def test_run_engine() -> None:
+    """ Test all engines agree """
+
+    text = 'GATATATGCATATACTT' * 3
+    with tempfile.TemporaryDirectory() as tmp:
+        index, built = build_engine_index(text, 'test', 2,
+                                          os.path.join(tmp, 'test'), False)
+        assert built.engine == BUILD
+        assert built.seconds is not None
+        assert built.matches == 0
+        for engine in ENGINES:
+            target = index if engine in INDEXED else text
+            result = run_engine(engine, target, 'test', len(text), 'ATAT', 2,
+                                False)
+            assert result.matches == 9
+            assert result.size == len(text)
+            assert result.pattern_len == 4
+
+        skipped, result = build_engine_index(text, 'test', 2,
+                                             os.path.join(tmp, 'x'), True)
+        assert skipped is None
+        assert result.seconds is None
+
+    assert run_engine('subs_stream', text, 'test', len(text), 'ATAT', 2,
+                      True).matches is None
+
+
+# --------------------------------------------------
+def format_result(result: Result) -> str:
+    """ One-line progress message """
+
+    if result.seconds is None:
+        return f'{result.engine:28} {result.size:>12,} skipped'
+
+    return (f'{result.engine:28} {result.size:>12,} {result.text:8} '
+            f'm={result.pattern_len:<4} p={result.period:<3} '
+            f'{result.seconds:10.4f}s')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -2,7 +2,7 @@
 """ Find subsequences """
 
 import argparse
-from typing import NamedTuple
+from typing import List, NamedTuple
 
 
 class Args(NamedTuple):
@@ -33,18 +33,24 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
+    print(*find_subseq(args.seq, args.subseq))
+
+
+# --------------------------------------------------
+def find_subseq(seq: str, subseq: str) -> List[int]:
+    """ Find the 1-based positions of subseq in seq """
 
     # Method 1: str.find()
     last = 0
     found = []
     while True:
-        pos = args.seq.find(args.subseq, last)
+        pos = seq.find(subseq, last)
         if pos == -1:
             break
         found.append(pos + 1)
         last = pos + 1
 
-    print(*found)
+    return found
 
 
 # --------------------------------------------------
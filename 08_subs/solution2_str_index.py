@@ -2,7 +2,7 @@
 """ Find subsequences """
 
 import argparse
-from typing import NamedTuple
+from typing import List, NamedTuple
 
 
 class Args(NamedTuple):
@@ -33,7 +33,12 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    seq, subseq = args.seq, args.subseq
+    print(' '.join(map(str, find_subseq(args.seq, args.subseq))))
+
+
+# --------------------------------------------------
+def find_subseq(seq: str, subseq: str) -> List[int]:
+    """ Find the 1-based positions of subseq in seq """
 
     # Method 2: str.index()
     found = []
@@ -42,7 +47,7 @@ def main() -> None:
         last = seq.index(subseq, last) + 1
         found.append(last)
 
-    print(' '.join(map(str, found)))
+    return found
 
 
 # --------------------------------------------------
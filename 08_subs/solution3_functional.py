@@ -4,7 +4,7 @@
 import argparse
 import operator
 from functools import partial
-from typing import NamedTuple
+from typing import List, NamedTuple
 
 
 class Args(NamedTuple):
@@ -35,12 +35,18 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    seq, subseq = args.seq, args.subseq
+    print(*find_subseq(args.seq, args.subseq))
+
+
+# --------------------------------------------------
+def find_subseq(seq: str, subseq: str) -> List[int]:
+    """ Find the 1-based positions of subseq in seq """
+
     r = list(range(len(seq) - len(subseq)))
     ok = partial(operator.le, 0)
     find = partial(seq.find, subseq)
     add1 = partial(operator.add, 1)
-    print(*sorted(map(add1, set(filter(ok, map(find, r))))))
+    return sorted(map(add1, set(filter(ok, map(find, r)))))
 
 
 # --------------------------------------------------
@@ -3,7 +3,7 @@
 
 import argparse
 from itertools import starmap
-from typing import NamedTuple, Iterator
+from typing import Iterator, List, NamedTuple
 
 
 class Args(NamedTuple):
@@ -34,13 +34,19 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    seq, subseq = args.seq, args.subseq
+    print(*find_subseq(args.seq, args.subseq))
+
+
+# --------------------------------------------------
+def find_subseq(seq: str, subseq: str) -> List[int]:
+    """ Find the 1-based positions of subseq in seq """
+
     k = len(subseq)
     kmers = enumerate(seq[i:i + k] for i in range(len(seq) - k + 1))
     found: Iterator[int] = filter(
         None, starmap(lambda i, kmer: i + 1
                       if kmer == subseq else None, kmers))
-    print(*found)
+    return list(found)
 
 
 # --------------------------------------------------
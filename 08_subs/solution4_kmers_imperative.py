@@ -2,7 +2,7 @@
 """ Find subsequences """
 
 import argparse
-from typing import NamedTuple
+from typing import List, NamedTuple
 
 
 class Args(NamedTuple):
@@ -33,11 +33,16 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    seq, subseq = args.seq, args.subseq
+    print(*find_subseq(args.seq, args.subseq))
+
+
+# --------------------------------------------------
+def find_subseq(seq: str, subseq: str) -> List[int]:
+    """ Find the 1-based positions of subseq in seq """
+
     k = len(subseq)
     kmers = [seq[i:i + k] for i in range(len(seq) - k + 1)]
-    found = [i + 1 for i, kmer in enumerate(kmers) if kmer == subseq]
-    print(*found)
+    return [i + 1 for i, kmer in enumerate(kmers) if kmer == subseq]
 
 
 # --------------------------------------------------
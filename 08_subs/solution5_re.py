@@ -3,7 +3,7 @@
 
 import argparse
 import re
-from typing import NamedTuple
+from typing import List, NamedTuple
 
 
 class Args(NamedTuple):
@@ -34,8 +34,14 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    seq, subseq = args.seq, args.subseq
-    print(*[m.start() + 1 for m in re.finditer(f'(?=({subseq}))', seq)])
+    print(*find_subseq(args.seq, args.subseq))
+
+
+# --------------------------------------------------
+def find_subseq(seq: str, subseq: str) -> List[int]:
+    """ Find the 1-based positions of subseq in seq """
+
+    return [m.start() + 1 for m in re.finditer(f'(?=({subseq}))', seq)]
 
 
 # --------------------------------------------------
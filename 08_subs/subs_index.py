@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+""" Find subsequences using an on-disk FM-index """
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Dict, List, NamedTuple, Optional, TextIO, Tuple
+import numpy as np
+from Bio import SeqIO
+
+SEPARATOR = 1  # Byte placed between records so no match spans two records
+SENTINEL = 0  # Smallest byte, terminates the text
+BLOCK = 128  # Rows between occurrence checkpoints
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    index: str
+    build: Optional[TextIO]
+    patterns: List[str]
+    count: bool
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Find subsequences using an on-disk FM-index',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('index', metavar='INDEX', help='Index basename')
+
+    parser.add_argument('pattern',
+                        metavar='PATTERN',
+                        nargs='*',
+                        help='Sub-sequence(s) to find')
+
+    parser.add_argument('-b',
+                        '--build',
+                        help='Build the index from this FASTA file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'))
+
+    parser.add_argument('-f',
+                        '--pattern_file',
+                        help='File of sub-sequences, one per line',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'))
+
+    parser.add_argument('-c',
+                        '--count',
+                        help='Only count occurrences',
+                        action='store_true')
+
+    args = parser.parse_intermixed_args()
+
+    patterns = args.pattern
+    if args.pattern_file:
+        patterns += list(filter(None, map(str.strip, args.pattern_file)))
+
+    if not args.build and not patterns:
+        parser.error('Nothing to do: give --build and/or patterns')
+
+    if not args.build and not os.path.isfile(args.index + '.sa.npy'):
+        parser.error(f'Missing index "{args.index}", use --build')
+
+    return Args(index=args.index,
+                build=args.build,
+                patterns=patterns,
+                count=args.count)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+
+    if args.build:
+        ids, seqs = [], []
+        for rec in SeqIO.parse(args.build, 'fasta'):
+            ids.append(rec.id)
+            seqs.append(str(rec.seq))
+
+        build_index(args.index, ids, seqs)
+        print(f'Indexed {len(ids):,} sequence{"" if len(ids) == 1 else "s"} '
+              f'to "{args.index}".',
+              file=sys.stderr)
+
+    index = FMIndex(args.index)
+    for pattern in args.patterns:
+        if args.count:
+            print(pattern, index.count(pattern), sep='\t')
+        else:
+            for seq_id, pos in index.locate(pattern):
+                print(pattern, seq_id, pos, sep='\t')
+
+
+# --------------------------------------------------
+def build_suffix_array(text: bytes) -> np.ndarray:
+    """ Build a suffix array by prefix doubling """
+
+    n = len(text)
+    rank = np.frombuffer(text, dtype=np.uint8).astype(np.int64)
+    sa = np.argsort(rank, kind='stable')
+    k = 1
+    while n > 1:
+        # Sort on (rank of suffix, rank of the suffix k positions later)
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+        first, second = rank[sa], second[sa]
+        new_group = np.ones(n, dtype=np.int64)
+        new_group[1:] = (first[1:] != first[:-1]) | (second[1:] !=
+                                                     second[:-1])
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(new_group) - 1
+        if rank.max() == n - 1:
+            break
+        k *= 2
+
+    return sa
+
+
+# --------------------------------------------------
+def test_build_suffix_array() -> None:
+    """ Test build_suffix_array """
+
+    for text in [b'\0', b'A\0', b'BANANA\0', b'GATATATGCATATACTT\0']:
+        expected = sorted(range(len(text)), key=lambda i: text[i:])
+        assert list(build_suffix_array(text)) == expected
+
+
+# --------------------------------------------------
+def build_index(basename: str, ids: List[str], seqs: List[str]) -> None:
+    """ Write suffix array, BWT and occurrence tables to disk """
+
+    text = bytes([SEPARATOR]).join(s.encode() for s in seqs) + bytes(
+        [SENTINEL])
+    sa = build_suffix_array(text)
+    codes = np.frombuffer(text, dtype=np.uint8)
+    bwt = codes[sa - 1]
+
+    # Checkpoint the running count of every byte each BLOCK rows
+    alphabet = np.unique(codes)
+    occ = np.zeros((len(bwt) // BLOCK + 1, len(alphabet)), dtype=np.int64)
+    for col, byte in enumerate(alphabet):
+        running = np.cumsum(bwt == byte)
+        occ[1:, col] = running[BLOCK - 1::BLOCK][:len(occ) - 1]
+
+    counts = np.bincount(codes, minlength=256)
+    first = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    starts = np.cumsum([0] + [len(s) + 1 for s in seqs])[:-1]
+
+    dtype = np.int32 if len(text) < 2**31 else np.int64
+    np.save(basename + '.sa.npy', sa.astype(dtype))
+    np.save(basename + '.bwt.npy', bwt)
+    np.save(basename + '.occ.npy', occ.astype(dtype))
+    np.save(basename + '.alphabet.npy', alphabet)
+    np.save(basename + '.first.npy', first)
+    np.save(basename + '.starts.npy', np.array(starts, dtype=np.int64))
+    with open(basename + '.ids.txt', 'wt') as fh:
+        fh.write('\n'.join(ids) + '\n')
+
+
+# --------------------------------------------------
+class FMIndex:
+    """ Memory-mapped FM-index, loaded lazily from disk """
+
+    def __init__(self, basename: str) -> None:
+        self.basename = basename
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._ids: List[str] = []
+        self._columns: Dict[int, int] = {}
+
+    def _load(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(f'{self.basename}.{name}.npy',
+                                         mmap_mode='r')
+        return self._arrays[name]
+
+    def _occ(self, byte: int, row: int) -> int:
+        """ Number of times byte occurs in BWT[:row] """
+
+        block, offset = divmod(row, BLOCK)
+        count = int(self._load('occ')[block, self._columns[byte]])
+        if offset:
+            start = block * BLOCK
+            count += int(
+                np.count_nonzero(self._load('bwt')[start:row] == byte))
+        return count
+
+    def range(self, pattern: str) -> Tuple[int, int]:
+        """ Suffix array rows [low, high) prefixed by pattern """
+
+        if not self._columns:
+            alphabet = self._load('alphabet')
+            self._columns = {int(b): i for i, b in enumerate(alphabet)}
+
+        first = self._load('first')
+        low, high = 0, len(self._load('bwt'))
+        for byte in reversed(pattern.encode()):
+            if byte not in self._columns:
+                return 0, 0
+            low = int(first[byte]) + self._occ(byte, low)
+            high = int(first[byte]) + self._occ(byte, high)
+            if low >= high:
+                return 0, 0
+
+        return low, high
+
+    def count(self, pattern: str) -> int:
+        """ Count occurrences of pattern """
+
+        low, high = self.range(pattern) if pattern else (0, 0)
+        return high - low
+
+    def locate(self, pattern: str) -> List[Tuple[str, int]]:
+        """ Sorted (sequence id, 1-based position) of each occurrence """
+
+        low, high = self.range(pattern) if pattern else (0, 0)
+        if low == high:
+            return []
+
+        if not self._ids:
+            with open(self.basename + '.ids.txt', 'rt') as fh:
+                self._ids = fh.read().splitlines()
+
+        positions = np.sort(self._load('sa')[low:high])
+        starts = self._load('starts')
+        recs = np.searchsorted(starts, positions, side='right') - 1
+        return [(self._ids[rec], int(pos - starts[rec]) + 1)
+                for rec, pos in zip(recs, positions)]
+
+
+# --------------------------------------------------
+def test_fm_index() -> None:
+    """ Test FMIndex against str.find """
+
+    seqs = ['GATATATGCATATACTT', 'ATATAT', 'CCCC']
+    with tempfile.TemporaryDirectory() as tmp:
+        basename = os.path.join(tmp, 'idx')
+        build_index(basename, ['s1', 's2', 's3'], seqs)
+        index = FMIndex(basename)
+
+        assert index.locate('ATAT') == [('s1', 2), ('s1', 4), ('s1', 10),
+                                        ('s2', 1), ('s2', 3)]
+        assert index.count('ATAT') == 5
+        assert index.count('TTA') == 0
+        assert index.count('N') == 0
+        assert index.count('') == 0
+        assert index.locate('CCC') == [('s3', 1), ('s3', 2)]
+        for pattern in ['A', 'T', 'GAT', 'TATAC', 'ATATATG']:
+            expected = sum(
+                len([i for i in range(len(s)) if s.startswith(pattern, i)])
+                for s in seqs)
+            assert index.count(pattern) == expected
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
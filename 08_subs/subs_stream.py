@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+""" Find subsequences in a file, streaming the sequence in blocks """
+
+import argparse
+import io
+import os
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterable, Iterator, NamedTuple, TextIO, Tuple
+from solution1_str_find import find_subseq
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+    subseq: str
+    block_size: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Find subsequences in a file, streaming',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        help='Sequence or FASTA file')
+
+    parser.add_argument('subseq', metavar='subseq', help='Sub-sequence')
+
+    parser.add_argument('-b',
+                        '--block_size',
+                        help='Characters to read at a time',
+                        metavar='int',
+                        type=int,
+                        default=2**22)
+
+    args = parser.parse_args()
+
+    if not args.subseq:
+        parser.error('subseq must not be empty')
+
+    if args.block_size < 1:
+        parser.error(f'--block_size "{args.block_size}" must be > 0')
+
+    return Args(args.file, args.subseq, args.block_size)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    default_id = os.path.basename(args.file.name)
+
+    records = groupby(read_blocks(args.file, args.block_size),
+                      key=itemgetter(0, 1))
+    for (_, seq_id), blocks in records:
+        for pos in find_stream(map(itemgetter(2), blocks), args.subseq):
+            print(seq_id or default_id, pos, sep='\t')
+
+
+# --------------------------------------------------
+def read_blocks(fh: TextIO, size: int) -> Iterator[Tuple[int, str, str]]:
+    """
+    Yield (record number, record id, block) with about size characters
+    of sequence per block. Newlines are removed. A file without FASTA
+    headers is one record with an empty id.
+    """
+
+    rec_num, seq_id, line_start = 0, '', True
+    buf, buffered = [], 0
+    while piece := fh.readline(size):
+        if line_start and piece.startswith('>'):
+            if buf:
+                yield rec_num, seq_id, ''.join(buf)
+                buf, buffered = [], 0
+
+            if not piece.endswith('\n'):
+                piece += fh.readline()
+
+            rec_num += 1
+            seq_id = next(iter(piece[1:].split()), '')
+            continue
+
+        line_start = piece.endswith('\n')
+        buf.append(piece.rstrip('\r\n'))
+        buffered += len(buf[-1])
+        if buffered >= size:
+            yield rec_num, seq_id, ''.join(buf)
+            buf, buffered = [], 0
+
+    if buf:
+        yield rec_num, seq_id, ''.join(buf)
+
+
+# --------------------------------------------------
+def test_read_blocks() -> None:
+    """ Test read_blocks """
+
+    fasta = '>s1 desc\nACGT\nAC\n>s2\nGGGGGG\n>s3\n'
+    assert list(read_blocks(io.StringIO(fasta), 100)) == [
+        (1, 's1', 'ACGTAC'),
+        (2, 's2', 'GGGGGG'),
+    ]
+    assert list(read_blocks(io.StringIO(fasta), 4)) == [
+        (1, 's1', 'ACGT'),
+        (1, 's1', 'AC'),
+        (2, 's2', 'GGGG'),
+        (2, 's2', 'GG'),
+    ]
+    assert list(read_blocks(io.StringIO('GATTACA\n'), 3)) == [
+        (0, '', 'GAT'),
+        (0, '', 'TAC'),
+        (0, '', 'A'),
+    ]
+
+
+# --------------------------------------------------
+def find_stream(blocks: Iterable[str], subseq: str) -> Iterator[int]:
+    """
+    Yield the 1-based positions of subseq in the concatenated blocks,
+    carrying the last len(subseq) - 1 characters across each boundary
+    """
+
+    keep = len(subseq) - 1
+    carry, offset = '', 0
+    for block in blocks:
+        seq = carry + block
+        for pos in find_subseq(seq, subseq):
+            yield offset + pos
+
+        carry = seq[max(0, len(seq) - keep):] if keep else ''
+        offset += len(seq) - len(carry)
+
+
+# --------------------------------------------------
+def test_find_stream() -> None:
+    """ Test find_stream """
+
+    seq = 'GATATATGCATATACTT'
+    for size in range(1, len(seq) + 1):
+        blocks = [seq[i:i + size] for i in range(0, len(seq), size)]
+        assert list(find_stream(blocks, 'ATAT')) == [2, 4, 10]
+        assert list(find_stream(blocks, 'T')) == [3, 5, 7, 11, 13, 16, 17]
+        assert list(find_stream(blocks, 'GATATATGCATATACTTA')) == []
+
+    assert list(find_stream([], 'A')) == []
+    assert list(find_stream(['AAA', 'A'], 'AA')) == [1, 2, 3]
+    assert list(find_stream(['A', 'C', 'G', 'T'], 'ACGT')) == [1]
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+""" Tests for subs_index.py """
+
+import glob
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+
+PRG = './subs_index.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+REF = './tests/inputs/ref.fa'
+PATTERNS = './tests/inputs/patterns.txt'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Usage """
+
+    for arg in ['-h', '--help']:
+        rv, out = getstatusoutput(f'{RUN} {arg}')
+        assert rv == 0
+        assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_missing_index() -> None:
+    """ Dies on missing index """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad} ATAT')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f'Missing index "{bad}"', out)
+
+
+# --------------------------------------------------
+def test_build_and_query() -> None:
+    """ Builds an index, then queries it """
+
+    basename = random_string()
+    try:
+        rv, out = getstatusoutput(f'{RUN} -b {REF} {basename} ATAT')
+        assert rv == 0
+        assert out.splitlines() == [
+            'Indexed 3 sequences to "{}".'.format(basename),
+            'ATAT\tseq1\t2',
+            'ATAT\tseq1\t4',
+            'ATAT\tseq1\t10',
+            'ATAT\tseq2\t1',
+            'ATAT\tseq2\t3',
+        ]
+
+        rv, out = getstatusoutput(f'{RUN} {basename} -c -f {PATTERNS} TTT')
+        assert rv == 0
+        assert out.splitlines() == ['TTT\t0', 'ATAT\t5', 'CCC\t2']
+
+    finally:
+        for file in glob.glob(basename + '.*'):
+            os.remove(file)
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return ''.join(
+        random.sample(string.ascii_letters + string.digits,
+                      k=random.randint(5, 10)))
@@ -0,0 +1,90 @@
+""" Tests for subs_stream.py """
+
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+
+PRG = './subs_stream.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+REF = './tests/inputs/ref.fa'
+SEQ = './tests/inputs/seq.txt'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Usage """
+
+    for arg in ['-h', '--help']:
+        rv, out = getstatusoutput(f'{RUN} {arg}')
+        assert rv == 0
+        assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad} ATAT')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_block_size() -> None:
+    """ Dies on bad block size """
+
+    size = random.choice(range(-10, 1))
+    rv, out = getstatusoutput(f'{RUN} -b {size} {SEQ} ATAT')
+    assert rv != 0
+    assert re.search(f'--block_size "{size}" must be > 0', out)
+
+
+# --------------------------------------------------
+def test_plain_sequence() -> None:
+    """ Runs on a file with no headers """
+
+    for size in [1, 3, 100]:
+        rv, out = getstatusoutput(f'{RUN} -b {size} {SEQ} ATAT')
+        assert rv == 0
+        assert out.splitlines() == [
+            'seq.txt\t2',
+            'seq.txt\t4',
+            'seq.txt\t10',
+        ]
+
+
+# --------------------------------------------------
+def test_fasta() -> None:
+    """ Runs on multi-line, multi-record FASTA """
+
+    for size in [2, 5, 100]:
+        rv, out = getstatusoutput(f'{RUN} -b {size} {REF} ATAT')
+        assert rv == 0
+        assert out.splitlines() == [
+            'seq1\t2',
+            'seq1\t4',
+            'seq1\t10',
+            'seq2\t1',
+            'seq2\t3',
+        ]
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return ''.join(
+        random.sample(string.ascii_letters + string.digits,
+                      k=random.randint(5, 10)))
@@ -0,0 +1,254 @@
+""" Edge list, gzip and CSR writers and edge sampling for overlap graphs """
+
+import gzip
+import os
+import random
+import sys
+import tempfile
+from array import array
+from typing import Dict, List, Optional, TextIO, Tuple
+import numpy as np
+
+FORMATS = ['txt', 'gz', 'csr']
+
+
+# --------------------------------------------------
+class EdgeWriter:
+    """ Write "source target" lines to a file or STDOUT """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.num_edges = 0
+        self.fh: TextIO = sys.stdout if filename == '-' else self.open()
+
+    def open(self) -> TextIO:
+        """ Open the output file """
+
+        return open(self.filename, 'wt')
+
+    def write(self, source: str, target: str) -> None:
+        """ Write one edge """
+
+        self.fh.write(f'{source} {target}\n')
+        self.num_edges += 1
+
+    def close(self) -> None:
+        """ Flush and close """
+
+        if self.fh is sys.stdout:
+            self.fh.flush()
+        else:
+            self.fh.close()
+
+    def __enter__(self) -> 'EdgeWriter':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --------------------------------------------------
+class GzipEdgeWriter(EdgeWriter):
+    """ Write a gzip-compressed edge list """
+
+    def open(self) -> TextIO:
+        return gzip.open(self.filename, 'wt', compresslevel=6)
+
+
+# --------------------------------------------------
+class CsrEdgeWriter(EdgeWriter):
+    """
+    Write a compressed sparse row adjacency as BASE.indptr.npy,
+    BASE.indices.npy and BASE.nodes.txt. Node names are interned to
+    integers and both edge columns are streamed to temporary files.
+    On close, one pass counts the edges from each source, and a second
+    sorts each block of edges by source and scatters the targets into
+    place in the memory-mapped indices, so only a block of edges and an
+    array per node are held in memory.
+    """
+
+    def __init__(self, filename: str, block: int = 2**20) -> None:
+        self.block = block
+        self.nodes: Dict[str, int] = {}
+        self.sources, self.targets = array('q'), array('q')
+        super().__init__(filename)
+        self.src_fh = open(f'{filename}.src.tmp', 'wb')
+        self.dst_fh = open(f'{filename}.dst.tmp', 'wb')
+
+    def open(self) -> TextIO:
+        if self.filename == '-':
+            raise ValueError('CSR output needs a filename')
+        return open(f'{self.filename}.nodes.txt', 'wt')
+
+    def intern(self, node: str) -> int:
+        """ Integer ID for a node name """
+
+        if (num := self.nodes.get(node)) is None:
+            num = self.nodes[node] = len(self.nodes)
+            self.fh.write(node + '\n')
+        return num
+
+    def write(self, source: str, target: str) -> None:
+        self.sources.append(self.intern(source))
+        self.targets.append(self.intern(target))
+        self.num_edges += 1
+        if len(self.sources) >= self.block:
+            self.flush()
+
+    def flush(self) -> None:
+        """ Append the buffered edges to the temporary column files """
+
+        self.sources.tofile(self.src_fh)
+        self.targets.tofile(self.dst_fh)
+        self.sources, self.targets = array('q'), array('q')
+
+    def close(self) -> None:
+        self.flush()
+        self.src_fh.close()
+        self.dst_fh.close()
+        super().close()
+
+        src_file, dst_file = self.src_fh.name, self.dst_fh.name
+        num, num_nodes = self.num_edges, len(self.nodes)
+        sources = np.memmap(src_file, dtype=np.int64, mode='r') if num \
+            else np.zeros(0, dtype=np.int64)
+        targets = np.memmap(dst_file, dtype=np.int64, mode='r') if num \
+            else np.zeros(0, dtype=np.int64)
+        blocks = range(0, num, self.block)
+
+        counts = np.zeros(num_nodes, dtype=np.int64)
+        for start in blocks:
+            counts += np.bincount(sources[start:start + self.block],
+                                  minlength=num_nodes)
+        indptr = np.concatenate(([0], np.cumsum(counts)))
+        np.save(f'{self.filename}.indptr.npy', indptr)
+
+        # The next free slot of each source, filled in order of arrival
+        indices = np.lib.format.open_memmap(f'{self.filename}.indices.npy',
+                                            mode='w+',
+                                            dtype=np.int64,
+                                            shape=(num, ))
+        free = indptr[:-1].copy()
+        for start in blocks:
+            end = start + self.block
+            order = np.argsort(sources[start:end], kind='stable')
+            src = sources[start:end][order]
+            nodes, first, sizes = np.unique(src,
+                                            return_index=True,
+                                            return_counts=True)
+            rank = np.arange(len(src)) - np.repeat(first, sizes)
+            indices[free[src] + rank] = targets[start:end][order]
+            free[nodes] += sizes
+        indices.flush()
+        del indices, sources, targets
+
+        os.remove(src_file)
+        os.remove(dst_file)
+
+
+# --------------------------------------------------
+def edge_writer(filename: str, fmt: str) -> EdgeWriter:
+    """ Writer for one of FORMATS """
+
+    writers = {'txt': EdgeWriter, 'gz': GzipEdgeWriter, 'csr': CsrEdgeWriter}
+    return writers[fmt](filename)
+
+
+# --------------------------------------------------
+def test_edge_writers() -> None:
+    """ Test edge_writer """
+
+    edges = [('b', 'a'), ('a', 'c'), ('b', 'c'), ('c', 'a')]
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'out')
+        with edge_writer(out, 'txt') as writer:
+            for edge in edges:
+                writer.write(*edge)
+        assert open(out).read() == 'b a\na c\nb c\nc a\n'
+        assert writer.num_edges == 4
+
+        with edge_writer(out + '.gz', 'gz') as writer:
+            for edge in edges:
+                writer.write(*edge)
+        assert gzip.open(out + '.gz', 'rt').read() == 'b a\na c\nb c\nc a\n'
+
+        for block in [1, 3, 100]:
+            with CsrEdgeWriter(out, block) as writer:
+                for edge in edges:
+                    writer.write(*edge)
+            assert open(out + '.nodes.txt').read() == 'b\na\nc\n'
+            assert list(np.load(out + '.indptr.npy')) == [0, 2, 3, 4]
+            assert list(np.load(out + '.indices.npy')) == [1, 2, 2, 1]
+            assert not os.path.exists(out + '.src.tmp')
+
+        # Already in order of source
+        with CsrEdgeWriter(out, 2) as writer:
+            for edge in [('a', 'b'), ('a', 'c'), ('b', 'a'), ('c', 'a')]:
+                writer.write(*edge)
+        assert list(np.load(out + '.indptr.npy')) == [0, 2, 3, 4]
+        assert list(np.load(out + '.indices.npy')) == [1, 2, 0, 0]
+
+        # Targets keep their order of arrival for each source
+        rand = random.Random(1)
+        names = [str(i) for i in range(50)]
+        edges = [(rand.choice(names), rand.choice(names)) for _ in range(500)]
+        for block in [1, 7, 64, 1000]:
+            with CsrEdgeWriter(out, block) as writer:
+                for edge in edges:
+                    writer.write(*edge)
+            nodes = open(out + '.nodes.txt').read().splitlines()
+            indptr = np.load(out + '.indptr.npy')
+            indices = np.load(out + '.indices.npy')
+            assert [(nodes[src], nodes[dst]) for src in range(len(nodes))
+                    for dst in indices[indptr[src]:indptr[src + 1]]] == \
+                sorted(edges, key=lambda edge: writer.nodes[edge[0]])
+
+        with CsrEdgeWriter(out) as writer:
+            pass
+        assert list(np.load(out + '.indptr.npy')) == [0]
+        assert list(np.load(out + '.indices.npy')) == []
+
+
+# --------------------------------------------------
+class EdgeSample:
+    """ Keep every edge up to size, then a uniform reservoir sample """
+
+    def __init__(self, size: int, seed: Optional[int] = None) -> None:
+        self.size = size
+        self.seen = 0
+        self.edges: List[Tuple[str, str]] = []
+        self.rand = random.Random(seed)
+
+    def add(self, source: str, target: str) -> None:
+        """ Offer an edge to the sample """
+
+        self.seen += 1
+        if len(self.edges) < self.size:
+            self.edges.append((source, target))
+        elif (pos := self.rand.randrange(self.seen)) < self.size:
+            self.edges[pos] = (source, target)
+
+    @property
+    def is_complete(self) -> bool:
+        """ Whether every edge seen is in the sample """
+
+        return self.seen == len(self.edges)
+
+
+# --------------------------------------------------
+def test_edge_sample() -> None:
+    """ Test EdgeSample """
+
+    sample = EdgeSample(3, seed=1)
+    for i in range(3):
+        sample.add(str(i), 'x')
+    assert sample.is_complete
+    assert sample.edges == [('0', 'x'), ('1', 'x'), ('2', 'x')]
+
+    for i in range(3, 100):
+        sample.add(str(i), 'x')
+    assert not sample.is_complete
+    assert sample.seen == 100
+    assert len(sample.edges) == 3
+
+    assert EdgeSample(0).is_complete
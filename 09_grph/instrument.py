@@ -0,0 +1,159 @@
+""" Lazy debug messages, phase timings and counters """
+
+import io
+import json
+import time
+from contextlib import contextmanager
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    TextIO, TypeVar)
+
+T = TypeVar('T')
+
+
+# --------------------------------------------------
+class Lazy:
+    """
+    Defer an expensive debug payload until a log handler formats it,
+    e.g., logging.debug('STARTS\\n%s', Lazy(pformat, start))
+    """
+
+    def __init__(self, func: Callable[..., Any], *args: Any) -> None:
+        self.func = func
+        self.args = args
+
+    def __str__(self) -> str:
+        return str(self.func(*self.args))
+
+
+# --------------------------------------------------
+def test_lazy() -> None:
+    """ Test Lazy """
+
+    calls = []
+
+    def expensive(x: int) -> int:
+        calls.append(x)
+        return x * 2
+
+    msg = Lazy(expensive, 21)
+    assert calls == []
+    assert f'{msg}' == '42'
+    assert calls == [21]
+
+
+# --------------------------------------------------
+class Metrics:
+    """
+    Per-phase wall-clock seconds and integer counters. Time spent in a
+    nested phase or timed iterator is not also charged to its parent.
+    A disabled instance does no timing at all.
+    """
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._children: List[float] = []
+
+    def _charge(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """ Time the enclosed block """
+
+        if not self.enabled:
+            yield
+            return
+
+        self._children.append(0.)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._charge(name, elapsed - self._children.pop())
+            if self._children:
+                self._children[-1] += elapsed
+
+    def timed(self, items: Iterable[T], name: str) -> Iterable[T]:
+        """ Charge the time spent producing each item to a phase """
+
+        return self._timed(items, name) if self.enabled else items
+
+    def _timed(self, items: Iterable[T], name: str) -> Iterator[T]:
+        items = iter(items)
+        while True:
+            start = time.perf_counter()
+            item = next(items, self)
+            elapsed = time.perf_counter() - start
+            self._charge(name, elapsed)
+            if self._children:
+                self._children[-1] += elapsed
+            if item is self:
+                return
+            yield item  # type: ignore
+
+    def count(self, name: str, num: int = 1) -> None:
+        """ Add to a counter """
+
+        self.counters[name] = self.counters.get(name, 0) + num
+
+    def maximum(self, name: str, value: int) -> None:
+        """ Keep the largest value seen """
+
+        self.counters[name] = max(self.counters.get(name, value), value)
+
+    def to_dict(self, **extra: Any) -> Dict[str, Any]:
+        """ Structured record of this run """
+
+        return {
+            **extra, 'phases': {
+                name: round(secs, 6)
+                for name, secs in self.phases.items()
+            },
+            'counters': self.counters
+        }
+
+    def write(self, fh: Optional[TextIO], **extra: Any) -> None:
+        """ Append the record as one JSON line """
+
+        if fh and self.enabled:
+            fh.write(json.dumps(self.to_dict(**extra)) + '\n')
+            fh.flush()
+
+
+# --------------------------------------------------
+def test_metrics() -> None:
+    """ Test Metrics """
+
+    metrics = Metrics()
+    with metrics.phase('index'):
+        assert list(metrics.timed(iter([1, 2, 3]), 'parse')) == [1, 2, 3]
+        metrics.count('records', 3)
+    with metrics.phase('edges'):
+        metrics.count('edges')
+        metrics.count('edges')
+        metrics.maximum('max_fanout', 2)
+        metrics.maximum('max_fanout', 1)
+
+    assert set(metrics.phases) == {'parse', 'index', 'edges'}
+    assert all(secs >= 0 for secs in metrics.phases.values())
+    assert metrics.counters == {'records': 3, 'edges': 2, 'max_fanout': 2}
+
+    out = io.StringIO()
+    metrics.write(out, program='test')
+    record = json.loads(out.getvalue())
+    assert record['program'] == 'test'
+    assert record['counters']['edges'] == 2
+    assert set(record['phases']) == {'parse', 'index', 'edges'}
+
+    off = Metrics(enabled=False)
+    items = [1, 2]
+    assert off.timed(items, 'parse') is items
+    with off.phase('index'):
+        pass
+    assert off.phases == {}
+    out = io.StringIO()
+    off.write(out)
+    assert out.getvalue() == ''
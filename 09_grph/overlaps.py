@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+""" Suffix-prefix overlaps of every length from a minimum """
+
+import argparse
+import logging
+import sys
+from array import array
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+    min_k: int
+    max_k: Optional[int]
+    outfile: TextIO
+    debug: bool
+
+
+class Trie(NamedTuple):
+    """
+    Aho-Corasick automaton over read prefixes. Reads are inserted in
+    sorted order, so the reads below each node are the contiguous
+    range order[low[node]:high[node]].
+    """
+    order: List[int]
+    children: List[Dict[str, int]]
+    depth: array
+    fail: array
+    low: array
+    high: array
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Suffix-prefix overlaps of every length from a minimum',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        help='FASTA file')
+
+    parser.add_argument('-m',
+                        '--min_k',
+                        help='Minimum overlap',
+                        metavar='size',
+                        type=int,
+                        default=3)
+
+    parser.add_argument('-x',
+                        '--max_k',
+                        help='Maximum overlap (default: read length)',
+                        metavar='size',
+                        type=int)
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'),
+                        default=sys.stdout)
+
+    parser.add_argument('-d', '--debug', help='Debug', action='store_true')
+
+    args = parser.parse_args()
+
+    if args.min_k < 1:
+        parser.error(f'--min_k "{args.min_k}" must be > 0')
+
+    if args.max_k is not None and args.max_k < args.min_k:
+        parser.error(f'--max_k "{args.max_k}" must be >= --min_k')
+
+    return Args(file=args.file,
+                min_k=args.min_k,
+                max_k=args.max_k,
+                outfile=args.outfile,
+                debug=args.debug)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+
+    logging.basicConfig(
+        filename='.log',
+        filemode='w',
+        level=logging.DEBUG if args.debug else logging.CRITICAL)
+
+    logging.debug('input file = "%s"', args.file.name)
+
+    ids, seqs = [], []
+    for title, seq in SimpleFastaParser(args.file):
+        ids.append(title.split(None, 1)[0] if title else '')
+        seqs.append(seq)
+
+    trie = build_trie(seqs, args.max_k)
+    logging.debug('%d reads, %d trie nodes', len(seqs), len(trie.children))
+
+    for source, target, length in find_overlaps(trie, seqs, args.min_k):
+        args.outfile.write(f'{ids[source]} {ids[target]} {length}\n')
+
+
+# --------------------------------------------------
+def build_trie(seqs: List[str], max_k: Optional[int] = None) -> Trie:
+    """ Build the automaton over the first max_k bases of each read """
+
+    order = sorted(range(len(seqs)), key=seqs.__getitem__)
+    trie = Trie(order=order,
+                children=[{}],
+                depth=array('l', [0]),
+                fail=array('l', [0]),
+                low=array('l', [0]),
+                high=array('l', [len(seqs)]))
+
+    for rank, read in enumerate(order):
+        node = 0
+        for base in seqs[read][:max_k]:
+            if (child := trie.children[node].get(base)) is None:
+                child = len(trie.children)
+                trie.children[node][base] = child
+                trie.children.append({})
+                trie.depth.append(trie.depth[node] + 1)
+                trie.fail.append(0)
+                trie.low.append(rank)
+                trie.high.append(rank)
+            trie.high[child] = rank + 1
+            node = child
+
+    # Breadth-first: a node's failure link is the longest proper suffix
+    # of its path that is also a path from the root
+    queue = deque(trie.children[0].values())
+    while queue:
+        node = queue.popleft()
+        for base, child in trie.children[node].items():
+            queue.append(child)
+            fail = trie.fail[node]
+            while fail and base not in trie.children[fail]:
+                fail = trie.fail[fail]
+            trie.fail[child] = trie.children[fail].get(base, 0)
+
+    return trie
+
+
+# --------------------------------------------------
+def find_overlaps(trie: Trie, seqs: List[str],
+                  min_k: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Stream (source, target, length) for every suffix of source of at
+    least min_k bases that is a prefix of target, longest first
+    """
+
+    for source, seq in enumerate(seqs):
+        # Longest suffix of seq that is a path in the trie
+        node = 0
+        for base in seq:
+            while node and base not in trie.children[node]:
+                node = trie.fail[node]
+            node = trie.children[node].get(base, 0)
+
+        # Shorter suffixes that are paths follow the failure links
+        while trie.depth[node] >= min_k:
+            for rank in range(trie.low[node], trie.high[node]):
+                if (target := trie.order[rank]) != source:
+                    yield source, target, trie.depth[node]
+            node = trie.fail[node]
+
+
+# --------------------------------------------------
+def test_find_overlaps() -> None:
+    """ Test find_overlaps """
+
+    seqs = ['AAATAAA', 'AAATTTT', 'TTTTCCC', 'AAATCCC', 'GGGTGGG']
+    assert sorted(find_overlaps(build_trie(seqs, 3), seqs, 3)) == [
+        (0, 1, 3),
+        (0, 3, 3),
+        (1, 2, 3),
+    ]
+    assert sorted(find_overlaps(build_trie(seqs), seqs, 3)) == [
+        (0, 1, 3),
+        (0, 3, 3),
+        (1, 2, 3),
+        (1, 2, 4),
+    ]
+    assert sorted(find_overlaps(build_trie(seqs), seqs, 4)) == [(1, 2, 4)]
+    assert list(find_overlaps(build_trie(seqs), seqs, 5)) == []
+
+
+# --------------------------------------------------
+def test_find_overlaps_brute_force() -> None:
+    """ Compare find_overlaps to checking every pair """
+
+    seqs = [
+        'ACGTACGT', 'GTACGTTT', 'CGTACG', 'ACGACG', 'TTTACGT', 'ACG',
+        'ACGTACGT'
+    ]
+    for min_k in range(1, 9):
+        for max_k in [min_k, min_k + 2, None]:
+            expected = sorted(
+                (i, j, k) for i, a in enumerate(seqs)
+                for j, b in enumerate(seqs) if i != j
+                for k in range(min_k, min(len(a), len(b), max_k or 99) + 1)
+                if a[-k:] == b[:k])
+            trie = build_trie(seqs, max_k)
+            assert sorted(find_overlaps(trie, seqs, min_k)) == expected
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,7 @@ from pprint import pformat
 from typing import List, NamedTuple, TextIO
 from Bio import SeqIO
 from iteration_utilities import starfilter
+from instrument import Lazy
 
 
 class Args(NamedTuple):
@@ -68,8 +69,8 @@ def main() -> None:
             start[kmers[0]].append(rec.id)
             end[kmers[-1]].append(rec.id)
 
-    logging.debug(f'STARTS\n{pformat(start)}')
-    logging.debug(f'ENDS\n{pformat(end)}')
+    logging.debug('STARTS\n%s', Lazy(pformat, start))
+    logging.debug('ENDS\n%s', Lazy(pformat, end))
 
     for kmer in set(start).intersection(set(end)):
         for pair in starfilter(op.ne, product(end[kmer], start[kmer])):
@@ -4,13 +4,16 @@
 import argparse
 import logging
 import operator as op
+import sys
 from collections import defaultdict
 from itertools import product
 from pprint import pformat
-from typing import List, NamedTuple, TextIO
+from typing import List, NamedTuple, Optional, TextIO
 from Bio import SeqIO
 from iteration_utilities import starfilter
 from graphviz import Digraph
+from graph_output import FORMATS, EdgeSample, edge_writer
+from instrument import Lazy, Metrics
 
 
 class Args(NamedTuple):
@@ -19,7 +22,11 @@ class Args(NamedTuple):
     k: int
     debug: bool
     outfile: TextIO
+    edges: str
+    out_format: str
     view: bool
+    render_max: int
+    metrics: Optional[TextIO]
 
 
 # --------------------------------------------------
@@ -49,11 +56,39 @@ def get_args() -> Args:
                         type=argparse.FileType('wt'),
                         default='graph.txt')
 
+    parser.add_argument('-e',
+                        '--edges',
+                        help='Edge output filename ("-" for STDOUT)',
+                        metavar='FILE',
+                        type=str,
+                        default='-')
+
+    parser.add_argument('-f',
+                        '--format',
+                        help='Edge output format',
+                        metavar='format',
+                        type=str,
+                        choices=FORMATS,
+                        default='txt')
+
     parser.add_argument('-v',
                         '--view',
                         help='View outfile',
                         action='store_true')
 
+    parser.add_argument('-m',
+                        '--render_max',
+                        help='Most edges to lay out; '
+                        'larger graphs are sampled',
+                        metavar='edges',
+                        type=int,
+                        default=1000)
+
+    parser.add_argument('--metrics',
+                        help='Append phase timings and counters as JSON',
+                        metavar='FILE',
+                        type=argparse.FileType('at'))
+
     parser.add_argument('-d', '--debug', help='Debug', action='store_true')
 
     args = parser.parse_args()
@@ -61,10 +96,20 @@ def get_args() -> Args:
     if args.overlap < 1:
         parser.error(f'-k "{args.overlap}" must be > 0')
 
+    if args.render_max < 0:
+        parser.error(f'--render_max "{args.render_max}" must be >= 0')
+
+    if args.format != 'txt' and args.edges == '-':
+        parser.error(f'--format "{args.format}" needs an --edges file')
+
     return Args(file=args.file,
                 k=args.overlap,
                 outfile=args.outfile,
+                edges=args.edges,
+                out_format=args.format,
                 view=args.view,
+                render_max=args.render_max,
+                metrics=args.metrics,
                 debug=args.debug)
 
 
@@ -81,25 +126,49 @@ def main() -> None:
 
     logging.debug('input file = "%s"', args.file.name)
 
+    metrics = Metrics(enabled=bool(args.metrics))
     start, end = defaultdict(list), defaultdict(list)
-    for rec in SeqIO.parse(args.file, 'fasta'):
-        if kmers := find_kmers(str(rec.seq), args.k):
-            start[kmers[0]].append(rec.id)
-            end[kmers[-1]].append(rec.id)
-
-    logging.debug(f'STARTS\n{pformat(start)}')
-    logging.debug(f'ENDS\n{pformat(end)}')
-
-    dot = Digraph()
-    for kmer in set(start).intersection(set(end)):
-        for s1, s2 in starfilter(op.ne, product(end[kmer], start[kmer])):
-            print(s1, s2)
-            dot.node(s1)
-            dot.node(s2)
-            dot.edge(s1, s2)
-
-    # args.outfile.close()
-    dot.render(args.outfile.name, view=args.view)
+    with metrics.phase('index'):
+        records = metrics.timed(SeqIO.parse(args.file, 'fasta'), 'parse')
+        for rec in records:
+            metrics.count('records')
+            if kmers := find_kmers(str(rec.seq), args.k):
+                start[kmers[0]].append(rec.id)
+                end[kmers[-1]].append(rec.id)
+
+    logging.debug('STARTS\n%s', Lazy(pformat, start))
+    logging.debug('ENDS\n%s', Lazy(pformat, end))
+
+    # Layout is superlinear, so only a bounded sample of edges is drawn
+    sample = EdgeSample(args.render_max)
+    with metrics.phase('edges'), \
+            edge_writer(args.edges, args.out_format) as writer:
+        for kmer in set(start).intersection(set(end)):
+            metrics.maximum('max_fanout', len(start[kmer]))
+            for s1, s2 in starfilter(op.ne, product(end[kmer], start[kmer])):
+                writer.write(s1, s2)
+                sample.add(s1, s2)
+
+    if sample.edges:
+        if not sample.is_complete:
+            print(f'Rendering a sample of {len(sample.edges):,} '
+                  f'of {sample.seen:,} edges',
+                  file=sys.stderr)
+
+        with metrics.phase('render'):
+            dot = Digraph()
+            for s1, s2 in sample.edges:
+                dot.node(s1)
+                dot.node(s2)
+                dot.edge(s1, s2)
+
+            # args.outfile.close()
+            dot.render(args.outfile.name, view=args.view)
+
+    metrics.count('kmers', len(start.keys() | end.keys()))
+    metrics.count('edges', sample.seen)
+    metrics.count('rendered_edges', len(sample.edges))
+    metrics.write(args.metrics, program='solution2_graph', k=args.k)
 
 
 # --------------------------------------------------
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+""" Overlap Graphs """
+
+import argparse
+import logging
+from array import array
+from typing import (Dict, Iterable, Iterator, List, NamedTuple, Optional,
+                    TextIO, Tuple)
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from graph_output import FORMATS, edge_writer
+from instrument import Metrics
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+    k: int
+    outfile: str
+    out_format: str
+    metrics: Optional[TextIO]
+    debug: bool
+
+
+class Index(NamedTuple):
+    """ Reads chained by first and last k-mer """
+    ids: List[str]
+    start: Dict[str, int]
+    end: Dict[str, int]
+    next_start: array
+    next_end: array
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Overlap Graphs',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        help='FASTA file')
+
+    parser.add_argument('-k',
+                        '--overlap',
+                        help='Size of overlap',
+                        metavar='size',
+                        type=int,
+                        default=3)
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename ("-" for STDOUT)',
+                        metavar='FILE',
+                        type=str,
+                        default='-')
+
+    parser.add_argument('-f',
+                        '--format',
+                        help='Output format',
+                        metavar='format',
+                        type=str,
+                        choices=FORMATS,
+                        default='txt')
+
+    parser.add_argument('--metrics',
+                        help='Append phase timings and counters as JSON',
+                        metavar='FILE',
+                        type=argparse.FileType('at'))
+
+    parser.add_argument('-d', '--debug', help='Debug', action='store_true')
+
+    args = parser.parse_args()
+
+    if args.overlap < 1:
+        parser.error(f'-k "{args.overlap}" must be > 0')
+
+    if args.format != 'txt' and args.outfile == '-':
+        parser.error(f'--format "{args.format}" needs an --outfile')
+
+    return Args(file=args.file,
+                k=args.overlap,
+                outfile=args.outfile,
+                out_format=args.format,
+                metrics=args.metrics,
+                debug=args.debug)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+
+    logging.basicConfig(
+        filename='.log',
+        filemode='w',
+        level=logging.DEBUG if args.debug else logging.CRITICAL)
+
+    logging.debug('input file = "%s"', args.file.name)
+
+    metrics = Metrics(enabled=bool(args.metrics))
+    with metrics.phase('index'):
+        records = metrics.timed(SimpleFastaParser(args.file), 'parse')
+        index = build_index(records, args.k)
+
+    logging.debug('%d reads, %d starts, %d ends', len(index.ids),
+                  len(index.start), len(index.end))
+
+    with metrics.phase('edges'), \
+            edge_writer(args.outfile, args.out_format) as writer:
+        for source, target in find_edges(index):
+            writer.write(source, target)
+
+    logging.debug('%d edges', writer.num_edges)
+
+    if metrics.enabled:
+        metrics.count('records', len(index.ids))
+        metrics.count('kmers', len(index.start.keys() | index.end.keys()))
+        metrics.count('edges', writer.num_edges)
+        metrics.maximum('max_fanout', max_fanout(index))
+        metrics.write(args.metrics,
+                      program='solution3_stream',
+                      k=args.k,
+                      format=args.out_format)
+
+
+# --------------------------------------------------
+def build_index(records: Iterable[Tuple[str, str]], k: int) -> Index:
+    """
+    Intern read ids to integers and chain the reads sharing a first
+    or last k-mer through next_start/next_end (-1 ends a chain)
+    """
+
+    index = Index(ids=[],
+                  start={},
+                  end={},
+                  next_start=array('q'),
+                  next_end=array('q'))
+    start_tail: Dict[str, int] = {}
+    end_tail: Dict[str, int] = {}
+
+    for title, seq in records:
+        if len(seq) < k:
+            continue
+
+        read = len(index.ids)
+        index.ids.append(title.split(None, 1)[0] if title else '')
+        index.next_start.append(-1)
+        index.next_end.append(-1)
+        link(seq[:k], read, index.start, start_tail, index.next_start)
+        link(seq[-k:], read, index.end, end_tail, index.next_end)
+
+    return index
+
+
+# --------------------------------------------------
+def link(kmer: str, read: int, head: Dict[str, int], tail: Dict[str, int],
+         chain: array) -> None:
+    """ Append read to the chain for kmer """
+
+    if kmer in tail:
+        chain[tail[kmer]] = read
+    else:
+        head[kmer] = read
+    tail[kmer] = read
+
+
+# --------------------------------------------------
+def walk(first: int, chain: array) -> Iterator[int]:
+    """ Follow a chain of reads """
+
+    while first != -1:
+        yield first
+        first = chain[first]
+
+
+# --------------------------------------------------
+def find_edges(index: Index) -> Iterator[Tuple[str, str]]:
+    """
+    Stream (source, target) for every read whose last k-mer is the
+    first k-mer of another read. Only the targets for one k-mer are
+    held in memory, never the product of sources and targets.
+    """
+
+    ids = index.ids
+    for kmer, first_end in index.end.items():
+        if (first_start := index.start.get(kmer)) is None:
+            continue
+
+        targets = [(read, ids[read])
+                   for read in walk(first_start, index.next_start)]
+        for source in walk(first_end, index.next_end):
+            source_id = ids[source]
+            for target, target_id in targets:
+                if target != source:
+                    yield source_id, target_id
+
+
+# --------------------------------------------------
+def max_fanout(index: Index) -> int:
+    """ Most reads sharing a first k-mer that is also some last k-mer """
+
+    return max((sum(1 for _ in walk(first, index.next_start))
+                for kmer, first in index.start.items() if kmer in index.end),
+               default=0)
+
+
+# --------------------------------------------------
+def test_find_edges() -> None:
+    """ Test find_edges """
+
+    reads = [('Rosalind_0498', 'AAATAAA'), ('Rosalind_2391', 'AAATTTT'),
+             ('Rosalind_2323', 'TTTTCCC'), ('Rosalind_0442', 'AAATCCC'),
+             ('Rosalind_5013', 'GGGTGGG')]
+
+    assert list(find_edges(build_index(iter(reads), 3))) == [
+        ('Rosalind_0498', 'Rosalind_2391'),
+        ('Rosalind_0498', 'Rosalind_0442'),
+        ('Rosalind_2391', 'Rosalind_2323'),
+    ]
+    assert list(find_edges(build_index(iter(reads), 4))) == [
+        ('Rosalind_2391', 'Rosalind_2323'),
+    ]
+    assert list(find_edges(build_index(iter(reads), 8))) == []
+    assert max_fanout(build_index(iter(reads), 3)) == 3
+    assert max_fanout(build_index(iter(reads), 8)) == 0
+
+    # A read never overlaps itself, but does overlap its duplicates
+    same = [('a', 'AAAA'), ('b', 'AAAA'), ('c', 'AA')]
+    assert list(find_edges(build_index(iter(same), 3))) == [
+        ('a', 'b'), ('b', 'a')
+    ]
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+""" Tests for overlaps.py """
+
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+
+PRG = './overlaps.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+SAMPLE1 = './tests/inputs/1.fa'
+SAMPLE2 = './tests/inputs/2.fa'
+SAMPLE3 = './tests/inputs/3.fa'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Usage """
+
+    rv, out = getstatusoutput(RUN)
+    assert rv > 0
+    assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_min_k() -> None:
+    """ Dies on bad min_k """
+
+    k = random.choice(range(-10, 1))
+    rv, out = getstatusoutput(f'{RUN} -m {k} {SAMPLE1}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f'--min_k "{k}" must be > 0', out)
+
+
+# --------------------------------------------------
+def test_bad_max_k() -> None:
+    """ Dies on max_k less than min_k """
+
+    rv, out = getstatusoutput(f'{RUN} -m 5 -x 4 {SAMPLE1}')
+    assert rv != 0
+    assert re.search('--max_k "4" must be >= --min_k', out)
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_fixed_k() -> None:
+    """ A single overlap length matches grph.py """
+
+    for in_file in [SAMPLE1, SAMPLE2, SAMPLE3]:
+        for k in [3, 4, 5]:
+            expected = open(f'{in_file}.{k}.out').read().rstrip()
+            cmd = f"{RUN} -m {k} -x {k} {in_file} | cut -d ' ' -f 1,2 | sort"
+            rv, out = getstatusoutput(cmd)
+            assert rv == 0
+            assert out.rstrip() == expected
+
+
+# --------------------------------------------------
+def test_min_k() -> None:
+    """ Reports every overlap length from min_k """
+
+    out_file = random_string()
+    try:
+        rv, out = getstatusoutput(f'{RUN} -m 3 -o {out_file} {SAMPLE1}')
+        assert rv == 0
+        assert out == ''
+        assert sorted(open(out_file).read().splitlines()) == [
+            'Rosalind_0498 Rosalind_0442 3',
+            'Rosalind_0498 Rosalind_2391 3',
+            'Rosalind_2391 Rosalind_2323 3',
+            'Rosalind_2391 Rosalind_2323 4',
+        ]
+    finally:
+        if os.path.isfile(out_file):
+            os.remove(out_file)
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """Generate a random string"""
+
+    return ''.join(
+        random.sample(string.ascii_letters + string.digits,
+                      k=random.randint(5, 10)))
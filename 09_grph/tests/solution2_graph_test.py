@@ -0,0 +1,68 @@
+""" Tests for the edge output of solution2_graph.py """
+
+import gzip
+import os
+import platform
+import re
+import tempfile
+from subprocess import getstatusoutput
+import numpy as np
+
+PRG = './solution2_graph.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+SAMPLE1 = './tests/inputs/1.fa'
+EDGES = {
+    ('Rosalind_0498', 'Rosalind_2391'),
+    ('Rosalind_0498', 'Rosalind_0442'),
+    ('Rosalind_2391', 'Rosalind_2323'),
+}
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_format_needs_file() -> None:
+    """ Dies on a binary format to STDOUT """
+
+    rv, out = getstatusoutput(f'{RUN} -m 0 -f gz {SAMPLE1}')
+    assert rv != 0
+    assert re.search('--format "gz" needs an --edges file', out)
+
+
+# --------------------------------------------------
+def test_stdout() -> None:
+    """ Edges go to STDOUT by default """
+
+    rv, out = getstatusoutput(f'{RUN} -m 0 {SAMPLE1}')
+    assert rv == 0
+    assert {tuple(line.split()) for line in out.splitlines()} == EDGES
+
+
+# --------------------------------------------------
+def test_formats() -> None:
+    """ Edges are written by the chosen writer """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, 'edges')
+        rv, _ = getstatusoutput(f'{RUN} -m 0 -f txt -e {out} {SAMPLE1}')
+        assert rv == 0
+        assert {tuple(line.split())
+                for line in open(out).read().splitlines()} == EDGES
+
+        rv, _ = getstatusoutput(f'{RUN} -m 0 -f gz -e {out}.gz {SAMPLE1}')
+        assert rv == 0
+        assert {tuple(line.split())
+                for line in gzip.open(out + '.gz', 'rt')} == EDGES
+
+        rv, _ = getstatusoutput(f'{RUN} -m 0 -f csr -e {out} {SAMPLE1}')
+        assert rv == 0
+        nodes = open(out + '.nodes.txt').read().splitlines()
+        indptr = np.load(out + '.indptr.npy')
+        indices = np.load(out + '.indices.npy')
+        assert {(nodes[src], nodes[dst]) for src in range(len(nodes))
+                for dst in indices[indptr[src]:indptr[src + 1]]} == EDGES
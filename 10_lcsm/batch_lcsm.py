@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+""" Longest Common Substring for many families in parallel """
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+from typing import Iterable, Iterator, List, NamedTuple, Optional, TextIO
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from rich.console import Console
+from rich.progress import track
+from solution2_binary_search import ENGINES
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    files: List[str]
+    engine: str
+    jobs: int
+    outfile: TextIO
+    quiet: bool
+
+
+class Result(NamedTuple):
+    """ One family """
+    family: str
+    length: int
+    lcs: str
+    seconds: float
+    error: Optional[str]
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Longest Common Substring for many families in parallel',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('paths',
+                        help='FASTA files or directories of them',
+                        metavar='PATH',
+                        nargs='+')
+
+    parser.add_argument('-e',
+                        '--engine',
+                        help='Search engine',
+                        metavar='engine',
+                        type=str,
+                        choices=list(ENGINES),
+                        default='automaton')
+
+    parser.add_argument('-x',
+                        '--extension',
+                        help='File extensions to take from directories',
+                        metavar='ext',
+                        nargs='+',
+                        default=['.fa', '.fasta', '.fna', '.faa'])
+
+    parser.add_argument('-j',
+                        '--jobs',
+                        help='Number of worker processes',
+                        metavar='int',
+                        type=int,
+                        default=os.cpu_count() or 1)
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'),
+                        default=sys.stdout)
+
+    parser.add_argument('-q',
+                        '--quiet',
+                        help='Do not show progress',
+                        action='store_true')
+
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        parser.error(f'--jobs "{args.jobs}" must be > 0')
+
+    try:
+        files = list(find_files(args.paths, args.extension))
+    except FileNotFoundError as err:
+        parser.error(str(err))
+
+    return Args(files=files,
+                engine=args.engine,
+                jobs=args.jobs,
+                outfile=args.outfile,
+                quiet=args.quiet)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    solve = partial(solve_family, engine=args.engine)
+    console = Console(stderr=True)
+
+    print('\t'.join(['family', 'length', 'lcs', 'seconds']),
+          file=args.outfile)
+
+    with multiprocessing.Pool(args.jobs) as pool:
+        # Families are small, so hand them out in chunks
+        chunksize = max(1, min(64, len(args.files) // (4 * args.jobs)))
+        results: Iterable[Result] = pool.imap(solve, args.files, chunksize)
+        for result in track(results,
+                            total=len(args.files),
+                            description='Families',
+                            console=console,
+                            disable=args.quiet):
+            if result.error:
+                console.print(f'{result.family}: {result.error}')
+            print(f'{result.family}\t{result.length}\t{result.lcs}\t'
+                  f'{result.seconds:.4f}',
+                  file=args.outfile)
+
+
+# --------------------------------------------------
+def find_files(paths: List[str], extensions: List[str]) -> Iterator[str]:
+    """ Files as given, and the files in directories by extension """
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                for name in sorted(names):
+                    if os.path.splitext(name)[1] in extensions:
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            raise FileNotFoundError(f'No such file or directory: \'{path}\'')
+
+
+# --------------------------------------------------
+def family_name(filename: str) -> str:
+    """ Family name from a filename """
+
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+# --------------------------------------------------
+def solve_family(filename: str, engine: str) -> Result:
+    """ Find the LCS of one FASTA, timing it and catching errors """
+
+    start = time.perf_counter()
+    lcs, error = '', None
+    try:
+        with open(filename, 'rt') as fh:
+            seqs = [seq for _, seq in SimpleFastaParser(fh)]
+        if not seqs:
+            error = 'no sequences'
+        else:
+            lcs = ENGINES[engine](seqs) or ''
+    except (OSError, UnicodeDecodeError, ValueError) as err:
+        error = str(err)
+
+    return Result(family=family_name(filename),
+                  length=len(lcs),
+                  lcs=lcs,
+                  seconds=time.perf_counter() - start,
+                  error=error)
+
+
+# --------------------------------------------------
+def test_solve_family() -> None:
+    """ Test solve_family """
+
+    for engine in ENGINES:
+        res = solve_family('tests/inputs/1.fa', engine)
+        assert res.family == '1'
+        assert res.length == 2
+        assert res.lcs in ['AC', 'CA', 'TA']
+        assert res.seconds >= 0
+        assert res.error is None
+
+        res = solve_family('tests/inputs/none.fa', engine)
+        assert (res.length, res.lcs, res.error) == (0, '', None)
+
+    res = solve_family('tests/inputs/empty.fa', 'automaton')
+    assert (res.length, res.error) == (0, 'no sequences')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+""" Index FASTA record names, lengths and offsets for random access """
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import BinaryIO, List, NamedTuple, Optional, TextIO, Tuple
+
+SUFFIX = '.fxi'
+VERSION = 2  # Sidecars from other versions are rebuilt
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    files: List[TextIO]
+    regions: List[str]
+    outfile: TextIO
+
+
+class FaiRecord(NamedTuple):
+    """
+    One record, as in a samtools .fai: the sequence starts at byte
+    offset, and every full line holds line_bases bases in line_width
+    bytes. Both are 0 when the lines are uneven.
+    """
+    name: str
+    length: int
+    offset: int
+    line_bases: int
+    line_width: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Index FASTA record names, lengths and offsets',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('files',
+                        help='Input FASTA',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        nargs='+')
+
+    parser.add_argument('-r',
+                        '--region',
+                        help='Print region NAME or NAME:START-END (1-based)',
+                        metavar='region',
+                        type=str,
+                        action='append',
+                        default=[])
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'),
+                        default=sys.stdout)
+
+    args = parser.parse_args()
+
+    if len(args.files) > 1 and args.region:
+        parser.error('--region needs a single FILE')
+
+    for region in args.region:
+        try:
+            parse_region(region)
+        except ValueError as err:
+            parser.error(str(err))
+
+    for fh in args.files:
+        fh.close()
+
+    return Args(files=args.files, regions=args.region, outfile=args.outfile)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+
+    for fh in args.files:
+        index = load_index(fh.name)
+        if not args.regions:
+            for rec in index:
+                print(f'{fh.name}\t{rec.name}\t{rec.length}',
+                      file=args.outfile)
+            continue
+
+        by_name = {rec.name: rec for rec in index}
+        with open(fh.name, 'rb') as seq_fh:
+            for region in args.regions:
+                name, start, end = parse_region(region)
+                if (rec := by_name.get(name)) is None:
+                    sys.exit(f'"{name}" not found in "{fh.name}"')
+                try:
+                    seq = fetch(seq_fh, rec, start, end)
+                except ValueError as err:
+                    sys.exit(str(err))
+                print(f'>{region}\n{seq}', file=args.outfile)
+
+
+# --------------------------------------------------
+def build_index(fh: BinaryIO) -> List[FaiRecord]:
+    """ Index every record in one pass over the raw bytes """
+
+    records: List[FaiRecord] = []
+    name: Optional[str] = None
+    length = offset = line_bases = line_width = 0
+    pos, short_line, blank, uneven = 0, False, False, False
+
+    def finish() -> None:
+        if name is not None:
+            records.append(
+                FaiRecord(name, length, offset,
+                          0 if uneven else line_bases,
+                          0 if uneven else line_width))
+
+    for line in fh:
+        pos += len(line)
+        if line.startswith(b'>'):
+            finish()
+            name = (line[1:].split(None, 1) or [b''])[0].decode()
+            length, offset, line_bases, line_width = 0, pos, 0, 0
+            short_line, blank, uneven = False, False, False
+            continue
+
+        if not (bases := len(line.rstrip())):
+            blank = True
+            continue
+
+        # Bases after a blank line are not where the line width puts them
+        if blank:
+            uneven = True
+
+        if not line_bases:
+            line_bases, line_width = bases, len(line)
+        elif short_line or bases > line_bases or \
+                len(line) - bases != line_width - line_bases:
+            uneven = True
+        short_line = short_line or bases < line_bases
+        length += bases
+
+    finish()
+    return records
+
+
+# --------------------------------------------------
+def test_build_index() -> None:
+    """ Test build_index """
+
+    fasta = (b'>seq1 desc\nACGTA\nCGTAC\nGT\n'
+             b'>seq2\r\nAAAA\r\nCC\r\n'
+             b'>seq3\nAC\nACGT\n'
+             b'>\n'
+             b'>seq4\nACGT\n\nTTGG\n'
+             b'>seq5\n\nACGT\n'
+             b'>seq6\nACGT\nTT\n\n\n')
+    with tempfile.TemporaryFile() as fh:
+        fh.write(fasta)
+        fh.seek(0)
+        assert build_index(fh) == [
+            FaiRecord('seq1', 12, 11, 5, 6),
+            FaiRecord('seq2', 6, 33, 4, 6),
+            FaiRecord('seq3', 6, 49, 0, 0),
+            FaiRecord('', 0, 59, 0, 0),
+            FaiRecord('seq4', 8, 65, 0, 0),
+            FaiRecord('seq5', 4, 82, 0, 0),
+            FaiRecord('seq6', 6, 94, 4, 5),
+        ]
+
+
+# --------------------------------------------------
+def index_name(filename: str) -> str:
+    """ Sidecar index for a FASTA file """
+
+    return filename + SUFFIX
+
+
+# --------------------------------------------------
+def load_index(filename: str) -> List[FaiRecord]:
+    """
+    Read the sidecar index, building or rebuilding it first if it is
+    missing or the FASTA file's size or mtime or the index VERSION has
+    changed. The index is still returned if the sidecar cannot be
+    written.
+    """
+
+    stat = os.stat(filename)
+    stamp = f'#{VERSION}\t{stat.st_size}\t{stat.st_mtime_ns}\n'
+    sidecar = index_name(filename)
+
+    if os.path.isfile(sidecar):
+        with open(sidecar, 'rt') as fh:
+            if fh.readline() == stamp:
+                return [
+                    FaiRecord(name, *map(int, rest))
+                    for name, *rest in (line.rstrip('\n').split('\t')
+                                        for line in fh)
+                ]
+
+    with open(filename, 'rb') as fh:
+        records = build_index(fh)
+
+    try:
+        tmp_fd, tmp_name = tempfile.mkstemp(
+            dir=os.path.dirname(sidecar) or '.', suffix=SUFFIX)
+        with os.fdopen(tmp_fd, 'wt') as out:
+            out.write(stamp)
+            for rec in records:
+                out.write('\t'.join(map(str, rec)) + '\n')
+        os.replace(tmp_name, sidecar)
+    except OSError:
+        pass
+
+    return records
+
+
+# --------------------------------------------------
+def test_load_index() -> None:
+    """ Test load_index only rebuilds on change """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fasta = os.path.join(tmp, 'test.fa')
+        with open(fasta, 'wt') as fh:
+            fh.write('>a\nACGT\nAC\n>b\nGGG\n')
+
+        assert load_index(fasta) == [
+            FaiRecord('a', 6, 3, 4, 5),
+            FaiRecord('b', 3, 14, 3, 4)
+        ]
+        assert os.path.isfile(index_name(fasta))
+
+        # An unchanged stamp is trusted, so a marked sidecar is reused
+        with open(index_name(fasta), 'at') as fh:
+            fh.write('c\t1\t2\t3\t4\n')
+        assert len(load_index(fasta)) == 3
+
+        with open(fasta, 'at') as fh:
+            fh.write('>d\nT\n')
+        assert [rec.name for rec in load_index(fasta)] == ['a', 'b', 'd']
+
+
+# --------------------------------------------------
+def parse_region(region: str) -> Tuple[str, int, Optional[int]]:
+    """ NAME or NAME:START-END (1-based, inclusive) to 0-based start, end """
+
+    name, sep, span = region.rpartition(':')
+    if sep and span.replace('-', '', 1).isdigit() and '-' in span:
+        start, end = map(int, span.split('-'))
+        if start < 1 or end < start:
+            raise ValueError(f'Invalid region "{region}"')
+        return name, start - 1, end
+
+    return region, 0, None
+
+
+# --------------------------------------------------
+def test_parse_region() -> None:
+    """ Test parse_region """
+
+    assert parse_region('chr1') == ('chr1', 0, None)
+    assert parse_region('chr1:1-10') == ('chr1', 0, 10)
+    assert parse_region('a:b:5-5') == ('a:b', 4, 5)
+    assert parse_region('chr1:x') == ('chr1:x', 0, None)
+    try:
+        parse_region('chr1:10-1')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+
+# --------------------------------------------------
+def fetch(fh: BinaryIO,
+          rec: FaiRecord,
+          start: int = 0,
+          end: Optional[int] = None) -> str:
+    """ Read rec's bases start..end (0-based, half-open) by seeking """
+
+    end = rec.length if end is None else min(end, rec.length)
+    if start >= end:
+        return ''
+
+    if not rec.line_bases:
+        raise ValueError(f'"{rec.name}" has uneven lines, reindex it')
+
+    def byte_pos(base: int) -> int:
+        lines, col = divmod(base, rec.line_bases)
+        return rec.offset + lines * rec.line_width + col
+
+    fh.seek(first := byte_pos(start))
+    chunk = fh.read(byte_pos(end) - first)
+    return chunk.replace(b'\n', b'').replace(b'\r', b'').decode()
+
+
+# --------------------------------------------------
+def test_fetch() -> None:
+    """ Test fetch """
+
+    with tempfile.TemporaryFile() as fh:
+        fh.write(b'>a\nACGTA\nCGTAC\nGT\n>b\r\nTTTT\r\nGG\r\n')
+        fh.seek(0)
+        rec_a, rec_b = build_index(fh)
+        assert fetch(fh, rec_a) == 'ACGTACGTACGT'
+        assert fetch(fh, rec_a, 3, 7) == 'TACG'
+        assert fetch(fh, rec_a, 5, 10) == 'CGTAC'
+        assert fetch(fh, rec_a, 10, 99) == 'GT'
+        assert fetch(fh, rec_a, 12) == ''
+        assert fetch(fh, rec_b, 2, 6) == 'TTGG'
+
+    # samtools refuses a blank line inside a record, and so does fetch
+    with tempfile.TemporaryFile() as fh:
+        fh.write(b'>a\nACGT\n\nTTGG\n')
+        fh.seek(0)
+        rec_a, = build_index(fh)
+        try:
+            fetch(fh, rec_a, 5, 8)
+        except ValueError as err:
+            assert str(err) == '"a" has uneven lines, reindex it'
+        else:
+            assert False
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+""" Scan for shortest, number using a FASTA index """
+
+import argparse
+from typing import NamedTuple, TextIO
+from faidx import load_index
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Scan for shortest, number using a FASTA index',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        help='FASTA file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'))
+
+    args = parser.parse_args()
+
+    return Args(args.file)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    args.file.close()
+
+    # Built once, then reused until the file changes
+    index = load_index(args.file.name)
+
+    shortest = min((rec.length for rec in index), default=0)
+    num_seqs = len(index)
+
+    print(f'shortest = "{shortest}", num = "{num_seqs}"')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
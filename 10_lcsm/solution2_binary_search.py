@@ -2,17 +2,22 @@
 """ Longest Common Substring """
 
 import argparse
+import logging
 import random
-from collections import Counter
-from functools import partial
-from itertools import chain
-from typing import Callable, List, NamedTuple, TextIO
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+import numpy as np
 from Bio import SeqIO
 
+HASH_BASE = 0x9E3779B97F4A7C15  # Odd, so it has an inverse modulo 2**64
+HASH_INVERSE = pow(HASH_BASE, -1, 2**64)
+
 
 class Args(NamedTuple):
     """ Command-line arguments """
     file: TextIO
+    engine: str
+    debug: bool
 
 
 # --------------------------------------------------
@@ -28,9 +33,19 @@ def get_args() -> Args:
                         metavar='FILE',
                         type=argparse.FileType('rt'))
 
+    parser.add_argument('-e',
+                        '--engine',
+                        help='Search engine',
+                        metavar='engine',
+                        type=str,
+                        choices=list(ENGINES),
+                        default='binary_search')
+
+    parser.add_argument('-d', '--debug', help='Debug', action='store_true')
+
     args = parser.parse_args()
 
-    return Args(args.file)
+    return Args(args.file, args.engine, args.debug)
 
 
 # --------------------------------------------------
@@ -39,48 +54,212 @@ def main() -> None:
 
     args = get_args()
 
+    logging.basicConfig(
+        filename='.log',
+        filemode='w',
+        level=logging.DEBUG if args.debug else logging.CRITICAL)
+
     # Get a list of the sequences as strings
     seqs = [str(rec.seq) for rec in SeqIO.parse(args.file, 'fasta')]
 
+    if lcs := ENGINES[args.engine](seqs):
+        print(lcs)
+    else:
+        print('No common subsequence.')
+
+
+# --------------------------------------------------
+def lcs_binary_search(
+        seqs: List[str],
+        find_common: Optional[Callable[[List[str], int], List[str]]] = None
+) -> Optional[str]:
+    """ Longest common substring by binary search over k-mer sizes """
+
+    if not seqs:
+        return None
+
     # Find the length of the shortest sequence
     shortest = min(map(len, seqs))
 
-    # Find a starting point
-    common = partial(common_kmers, seqs)
-    start = binary_search(common, 1, shortest)
+    # Each k is a full pass over every sequence, so evaluate it only once,
+    # remembering whether it was found and the k-mers of the longest k
+    find = partial(find_common or common_kmers, seqs)
+    best: List[str] = []
+
+    @lru_cache(maxsize=None)
+    def probe(k: int) -> bool:
+        nonlocal best
+        if kmers := find(k):
+            # Bisection only probes above its last hit
+            best = kmers
+        return bool(kmers)
+
+    longest = binary_search(probe, 1, shortest)
+    lcs = random.choice(best) if longest > 0 else None
+
+    info = probe.cache_info()
+    logging.debug('k = %d after %d probes (%d cached) of 1..%d', longest,
+                  info.misses, info.hits, shortest)
+
+    return lcs
+
+
+# --------------------------------------------------
+def lcs_hashed(seqs: List[str]) -> Optional[str]:
+    """ Binary search using integer k-mer hashes """
+
+    hasher = KmerHasher(seqs)
+    return lcs_binary_search(seqs,
+                             partial(common_kmers_hashed, hasher=hasher))
+
 
-    if start >= 0:
-        # Hill climb to find max
-        candidates = []
-        for k in range(start, shortest + 1):
-            if kmers := common(k):
-                candidates.append(random.choice(kmers))
+# --------------------------------------------------
+def lcs_automaton(seqs: List[str]) -> Optional[str]:
+    """
+    Longest common substring using a suffix automaton of the shortest
+    sequence. Each other sequence is streamed through the automaton to
+    find the longest match ending in each state, and each state keeps
+    the minimum of those over all sequences. Linear in total length.
+    """
+
+    if not seqs:
+        return None
+
+    shortest = min(seqs, key=len)
+    sam = SuffixAutomaton(shortest)
+    order = sorted(range(len(sam.length)), key=sam.length.__getitem__,
+                   reverse=True)
+    best = list(sam.length)
+
+    for seq in seqs:
+        if seq is shortest:
+            continue
+
+        matched = [0] * len(best)
+        state, size = 0, 0
+        for char in seq:
+            while state and char not in sam.next[state]:
+                state = sam.link[state]
+                size = sam.length[state]
+            if (nxt := sam.next[state].get(char)) is not None:
+                state, size = nxt, size + 1
+                if size > matched[state]:
+                    matched[state] = size
             else:
-                break
+                state, size = 0, 0
 
-        # Print the longest candidate
-        print(max(candidates, key=len))
-    else:
-        print('No common subsequence.')
+        # A match in a state is a full match of every suffix-link parent
+        for node in order:
+            if matched[node] and (parent := sam.link[node]) >= 0:
+                matched[parent] = max(matched[parent], sam.length[parent])
+            if matched[node] < best[node]:
+                best[node] = matched[node]
+
+    node = max(range(len(best)), key=best.__getitem__)
+    if (size := best[node]) == 0:
+        return None
+
+    end = sam.first_end[node] + 1
+    return shortest[end - size:end]
 
 
 # --------------------------------------------------
-def binary_search(f: Callable, low: int, high: int) -> int:
-    """ Binary search """
+def test_lcs_engines() -> None:
+    """ Test lcs_binary_search, lcs_automaton """
+
+    for engine in [lcs_binary_search, lcs_hashed, lcs_automaton]:
+        assert engine(['GATTACA', 'TAGACCA', 'ATACA']) in ['AC', 'CA', 'TA']
+        assert engine(['GATTACTA', 'TAGACTCA', 'ATACTA']) in ['TAC', 'ACT']
+        assert engine(['AAA', 'CCC']) is None
+        assert engine(['ACGT']) == 'ACGT'
+        assert engine([]) is None
 
-    hi, lo = f(high), f(low)
-    mid = (high + low) // 2
+    assert lcs_automaton(['ABABC', 'BABCA', 'ABCBA']) == 'ABC'
+    assert lcs_automaton(['XABCDY', 'ABCD', 'ZZABCDZZ', 'ABCQABCD']) == 'ABCD'
 
-    if hi and lo:
-        return high
 
-    if lo and not hi:
-        return binary_search(f, low, mid)
+# --------------------------------------------------
+class SuffixAutomaton:
+    """ Suffix automaton: state 0 is the root, link[0] is -1 """
+
+    def __init__(self, seq: str) -> None:
+        self.next: List[Dict[str, int]] = [{}]
+        self.link: List[int] = [-1]
+        self.length: List[int] = [0]
+        self.first_end: List[int] = [-1]
+        last = 0
+
+        for pos, char in enumerate(seq):
+            cur = self._add_state(self.length[last] + 1, pos)
+            state = last
+            while state != -1 and char not in self.next[state]:
+                self.next[state][char] = cur
+                state = self.link[state]
+
+            if state == -1:
+                self.link[cur] = 0
+            else:
+                nxt = self.next[state][char]
+                if self.length[state] + 1 == self.length[nxt]:
+                    self.link[cur] = nxt
+                else:
+                    clone = self._add_state(self.length[state] + 1,
+                                            self.first_end[nxt])
+                    self.next[clone] = dict(self.next[nxt])
+                    self.link[clone] = self.link[nxt]
+                    while state != -1 and self.next[state].get(char) == nxt:
+                        self.next[state][char] = clone
+                        state = self.link[state]
+                    self.link[nxt] = self.link[cur] = clone
+            last = cur
+
+    def _add_state(self, length: int, first_end: int) -> int:
+        self.next.append({})
+        self.link.append(-1)
+        self.length.append(length)
+        self.first_end.append(first_end)
+        return len(self.length) - 1
+
+
+# --------------------------------------------------
+def test_suffix_automaton() -> None:
+    """ Test SuffixAutomaton accepts exactly the substrings """
 
-    if hi and not lo:
-        return binary_search(f, mid, high)
+    seq = 'GATTACA'
+    sam = SuffixAutomaton(seq)
+    assert len(sam.length) <= 2 * len(seq)
 
-    return -1
+    def accepts(sub: str) -> bool:
+        state = 0
+        for char in sub:
+            if (state := sam.next[state].get(char, -1)) == -1:
+                return False
+        return True
+
+    for i in range(len(seq)):
+        for j in range(i + 1, len(seq) + 1):
+            assert accepts(seq[i:j])
+    assert not accepts('GG')
+    assert not accepts('ACAT')
+
+
+# --------------------------------------------------
+def binary_search(f: Callable, low: int, high: int) -> int:
+    """
+    Largest k in low..high where f(k) is truthy, or -1 if there is none.
+    f must be monotone: once it is false for some k, it is false for
+    every larger k. Each k is evaluated at most once.
+    """
+
+    found = -1
+    while low <= high:
+        mid = (low + high) // 2
+        if f(mid):
+            found, low = mid, mid + 1
+        else:
+            high = mid - 1
+
+    return found
 
 
 # --------------------------------------------------
@@ -95,15 +274,47 @@ def test_binary_search() -> None:
     f2 = partial(common_kmers, seqs2)
     assert binary_search(f2, 1, 6) == 3
 
+    assert binary_search(f2, 4, 6) == -1
+    assert binary_search(lambda k: k <= 1000, 1, 10**6) == 1000
+    assert binary_search(lambda k: True, 1, 10**6) == 10**6
+
+
+# --------------------------------------------------
+def test_probe_count() -> None:
+    """ Test lcs_binary_search evaluates O(log L) distinct k """
+
+    probes: List[int] = []
+
+    def find_common(seqs: List[str], k: int) -> List[str]:
+        probes.append(k)
+        return common_kmers(seqs, k)
+
+    seq = 'ACGT' * 256
+    assert lcs_binary_search([seq, seq], find_common) == seq
+    assert len(probes) == len(set(probes))
+    assert len(probes) <= len(seq).bit_length()
+
 
 # --------------------------------------------------
 def common_kmers(seqs: List[str], k: int) -> List[str]:
-    """ Find k-mers common to all elements """
+    """
+    Find k-mers common to all elements, keeping only the k-mers of the
+    shortest that are still shared, so memory does not grow with the
+    number of sequences and a probe stops once none are left
+    """
+
+    if not seqs:
+        return []
+
+    ordered = sorted(seqs, key=len)
+    common = set(find_kmers(ordered[0], k))
+    for seq in ordered[1:]:
+        if not common:
+            break
+        kmers = (seq[i:i + k] for i in range(len(seq) - k + 1))
+        common = {kmer for kmer in kmers if kmer in common}
 
-    kmers = [set(find_kmers(seq, k)) for seq in seqs]
-    counts = Counter(chain.from_iterable(kmers))
-    n = len(seqs)
-    return [kmer for kmer, freq in counts.items() if freq == n]
+    return list(common)
 
 
 # --------------------------------------------------
@@ -115,6 +326,138 @@ def test_common_kmers() -> None:
     assert sorted(common_kmers(seqs, 2)) == ['AC', 'CA', 'TA']
 
 
+# --------------------------------------------------
+def common_kmers_hashed(seqs: List[str],
+                        k: int,
+                        hasher: Optional['KmerHasher'] = None) -> List[str]:
+    """
+    Find k-mers common to all elements by intersecting arrays of integer
+    hashes, starting from the shortest sequence and stopping as soon as
+    the intersection is empty. Each survivor is compared as a string
+    with one k-mer of the same hash in each sequence, and a hash
+    collision falls back to common_kmers.
+    """
+
+    if not seqs:
+        return []
+
+    hasher = hasher or KmerHasher(seqs)
+    ordered = sorted(range(len(seqs)), key=lambda i: len(seqs[i]))
+    shortest = seqs[ordered[0]]
+    hashes, first = np.unique(hasher.hashes(ordered[0], k),
+                              return_index=True)
+    positions = []
+    for i in ordered[1:]:
+        # The first position of each hash of this sequence
+        other, where = np.unique(hasher.hashes(i, k), return_index=True)
+        index = np.searchsorted(other, hashes).clip(max=len(other) - 1)
+        found = other[index] == hashes if len(other) else \
+            np.zeros(len(hashes), dtype=bool)
+        hashes, first = hashes[found], first[found]
+        positions = [pos[found] for pos in positions]
+        positions.append(where[index[found]])
+        if not len(hashes):
+            return []
+
+    kmers = [shortest[pos:pos + k] for pos in first]
+    for i, where in zip(ordered[1:], positions):
+        seq = seqs[i]
+        if any(kmer != seq[pos:pos + k] for kmer, pos in zip(kmers, where)):
+            return common_kmers(seqs, k)
+
+    return kmers
+
+
+# --------------------------------------------------
+def test_common_kmers_hashed() -> None:
+    """ Test common_kmers_hashed """
+
+    seqs = ['GATTACA', 'TAGACCA', 'ATACA']
+    assert common_kmers_hashed(seqs, 5) == []
+    assert sorted(common_kmers_hashed(seqs, 2)) == ['AC', 'CA', 'TA']
+    assert common_kmers_hashed(seqs, 8) == []
+    assert common_kmers_hashed([], 1) == []
+    assert common_kmers_hashed(['ACGT'], 4) == ['ACGT']
+
+    seqs = ['ACGTTGCAACGT' * 3, 'TTGCAACG', 'GGTTGCAACGTT']
+    hasher = KmerHasher(seqs)
+    for k in range(1, 10):
+        assert sorted(common_kmers_hashed(seqs, k, hasher)) == \
+            sorted(common_kmers(seqs, k))
+
+    # A hash that matches a different k-mer is caught and recounted
+    class Colliding(KmerHasher):
+        """ Every k-mer has the same hash """
+
+        def hashes(self, i: int, k: int) -> np.ndarray:
+            return np.zeros(max(0, len(self.seqs[i]) - k + 1),
+                            dtype=np.uint64)
+
+    seqs = ['GATTACA', 'TAGACCA', 'ATACA']
+    assert sorted(common_kmers_hashed(seqs, 2, Colliding(seqs))) == \
+        ['AC', 'CA', 'TA']
+    assert common_kmers_hashed(seqs, 3, Colliding(seqs)) == []
+
+
+# --------------------------------------------------
+class KmerHasher:
+    """
+    Polynomial hashes of the k-mers of each sequence, modulo 2**64. The
+    prefix sums of each sequence are weighted by the inverse of the base,
+    so that each k-mer's hash is a difference of two prefix sums times
+    one power of the base. The powers and the prefix sums do not depend
+    on k, so they are computed once for every probe.
+    """
+
+    def __init__(self, seqs: List[str]) -> None:
+        self.seqs = seqs
+        longest = max(map(len, seqs), default=0)
+        self.powers = np.ones(longest + 1, dtype=np.uint64)
+        self.powers[1:] = np.cumprod(
+            np.full(longest, HASH_BASE, dtype=np.uint64))
+        inverse = np.ones(longest, dtype=np.uint64)
+        inverse[1:] = np.cumprod(
+            np.full(max(longest - 1, 0), HASH_INVERSE, dtype=np.uint64))
+
+        self.prefixes = []
+        for seq in seqs:
+            codes = np.frombuffer(seq.encode(), dtype=np.uint8)
+            prefix = np.zeros(len(codes) + 1, dtype=np.uint64)
+            prefix[1:] = np.cumsum(codes * inverse[:len(codes)],
+                                   dtype=np.uint64)
+            self.prefixes.append(prefix)
+
+    def hashes(self, i: int, k: int) -> np.ndarray:
+        """ Hash of every k-mer of sequence i """
+
+        prefix = self.prefixes[i]
+        num = len(prefix) - k
+        if num < 1 or k < 1:
+            return np.zeros(0, dtype=np.uint64)
+
+        return (prefix[k:] - prefix[:num]) * self.powers[k - 1:k - 1 + num]
+
+
+# --------------------------------------------------
+def kmer_hashes(seq: str, k: int) -> np.ndarray:
+    """ Hash of every k-mer of one sequence """
+
+    return KmerHasher([seq]).hashes(0, k)
+
+
+# --------------------------------------------------
+def test_kmer_hashes() -> None:
+    """ Test kmer_hashes """
+
+    assert len(kmer_hashes('', 1)) == 0
+    assert len(kmer_hashes('ACGT', 5)) == 0
+    hashes = kmer_hashes('ACGTACGT', 4)
+    assert len(hashes) == 5
+    assert hashes[0] == hashes[4]
+    assert len(set(hashes.tolist())) == 4
+    assert kmer_hashes('ACGTACGT', 3)[1] == kmer_hashes('CGT', 3)[0]
+
+
 # --------------------------------------------------
 def find_kmers(seq: str, k: int) -> List[str]:
     """ Find k-mers in string """
@@ -135,6 +478,13 @@ def test_find_kmers() -> None:
     assert find_kmers('ACTG', 5) == []
 
 
+ENGINES: Dict[str, Callable[[List[str]], Optional[str]]] = {
+    'binary_search': lcs_binary_search,
+    'hash': lcs_hashed,
+    'automaton': lcs_automaton,
+}
+
+
 # --------------------------------------------------
 if __name__ == '__main__':
     main()
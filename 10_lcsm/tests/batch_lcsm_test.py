@@ -0,0 +1,101 @@
+""" Tests for batch_lcsm.py """
+
+import os
+import platform
+import random
+import re
+import string
+import tempfile
+from subprocess import getstatusoutput
+
+PRG = './batch_lcsm.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+INPUT1 = './tests/inputs/1.fa'
+INPUT2 = './tests/inputs/2.fa'
+INPUT_DIR = './tests/inputs'
+LCS2 = ('GCCTTTTGATTTTAACGTTTATCGGGTGTAGTAAGATTGCGCGCTAATTCCAATAAACG'
+        'TATGGAGGACATTCCCCGT')
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Prints usage """
+
+    rv, out = getstatusoutput(RUN)
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_jobs() -> None:
+    """ Dies on bad --jobs """
+
+    rv, out = getstatusoutput(f'{RUN} -j 0 {INPUT1}')
+    assert rv != 0
+    assert re.search('--jobs "0" must be > 0', out)
+
+
+# --------------------------------------------------
+def test_files() -> None:
+    """ Runs on files """
+
+    outfile = random_string()
+    try:
+        rv, out = getstatusoutput(f'{RUN} -q -j 2 -o {outfile} {INPUT1} '
+                                  f'{INPUT2}')
+        assert rv == 0
+        assert out == ''
+        rows = [line.split('\t') for line in open(outfile).read().splitlines()]
+        assert rows[0] == ['family', 'length', 'lcs', 'seconds']
+        assert [row[0] for row in rows[1:]] == ['1', '2']
+        assert rows[1][1:3] in [['2', 'AC'], ['2', 'CA'], ['2', 'TA']]
+        assert rows[2][1:3] == ['78', LCS2]
+        assert all(float(row[3]) >= 0 for row in rows[1:])
+    finally:
+        if os.path.isfile(outfile):
+            os.remove(outfile)
+
+
+# --------------------------------------------------
+def test_dir() -> None:
+    """ Runs on a directory, reporting bad families """
+
+    for engine in ['binary_search', 'hash', 'automaton']:
+        rv, out = getstatusoutput(f'{RUN} -q -e {engine} {INPUT_DIR}')
+        assert rv == 0
+        lines = out.splitlines()
+        assert 'empty: no sequences' in lines
+        families = [line.split('\t')[:2] for line in lines if '\t' in line]
+        assert families == [['family', 'length'], ['1', '2'], ['2', '78'],
+                            ['empty', '0'], ['none', '0']]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        rv, out = getstatusoutput(f'{RUN} -q {tmp} -x .txt')
+        assert rv == 0
+        assert out == 'family\tlength\tlcs\tseconds'
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """ Generate a random string """
+
+    k = random.randint(5, 10)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=k))
@@ -0,0 +1,109 @@
+""" Tests for faidx.py """
+
+import os
+import platform
+import random
+import re
+import shutil
+import string
+import tempfile
+from subprocess import getstatusoutput
+
+PRG = './faidx.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+INPUT1 = './tests/inputs/1.fa'
+INPUT2 = './tests/inputs/2.fa'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Prints usage """
+
+    rv, out = getstatusoutput(RUN)
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_region() -> None:
+    """ Dies on bad region """
+
+    rv, out = getstatusoutput(f'{RUN} {INPUT1} -r Rosalind_1:5-2')
+    assert rv != 0
+    assert re.search('Invalid region "Rosalind_1:5-2"', out)
+
+    # Keep the sidecar out of the inputs
+    with tempfile.TemporaryDirectory() as tmp:
+        fasta = os.path.join(tmp, '1.fa')
+        shutil.copy(INPUT1, fasta)
+        rv, out = getstatusoutput(f'{RUN} {fasta} -r foo')
+        assert rv != 0
+        assert out == f'"foo" not found in "{fasta}"'
+
+
+# --------------------------------------------------
+def test_lengths() -> None:
+    """ Lists records, writes and reuses the sidecar """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fasta = os.path.join(tmp, '1.fa')
+        shutil.copy(INPUT1, fasta)
+
+        for _ in range(2):
+            rv, out = getstatusoutput(f'{RUN} {fasta}')
+            assert rv == 0
+            assert out.splitlines() == [
+                f'{fasta}\tRosalind_1\t7', f'{fasta}\tRosalind_2\t7',
+                f'{fasta}\tRosalind_3\t5'
+            ]
+            assert os.path.isfile(fasta + '.fxi')
+
+
+# --------------------------------------------------
+def test_regions() -> None:
+    """ Fetches regions across line breaks """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fasta = os.path.join(tmp, '2.fa')
+        shutil.copy(INPUT2, fasta)
+        # The first record
+        with open(INPUT2) as fh:
+            name = fh.readline()[1:].rstrip()
+            seq = ''
+            for line in fh:
+                if line.startswith('>'):
+                    break
+                seq += line.rstrip()
+
+        rv, out = getstatusoutput(
+            f'{RUN} {fasta} -r {name}:55-130 -r {name}')
+        assert rv == 0
+        assert out.splitlines() == [
+            f'>{name}:55-130', seq[54:130], f'>{name}', seq
+        ]
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """ Generate a random string """
+
+    k = random.randint(5, 10)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=k))
@@ -0,0 +1,237 @@
+""" Download directory with a sqlite index, expiry and LRU eviction """
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Collection, Iterable, List, NamedTuple, Optional
+
+INDEX = 'cache.sqlite'
+NEGATIVE_STATUS = (404, 410)
+
+
+class Entry(NamedTuple):
+    """ One indexed download """
+    prot_id: str
+    status: int
+    size: int
+    digest: str
+    fetched: float
+    used: float
+
+
+# --------------------------------------------------
+class FastaCache:
+    """
+    ID.fasta files in a directory, indexed in cache.sqlite by fetch time,
+    last use, size, SHA-256 and HTTP status. A 404/410 is remembered for
+    negative_ttl seconds so it is not fetched again on every run. Files
+    older than ttl are fetched again, and evict() removes the least
+    recently used files until the directory is within max_bytes.
+    Files already in the directory without an entry are adopted.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 ttl: Optional[float] = None,
+                 negative_ttl: float = 86400.,
+                 max_bytes: Optional[int] = None) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(os.path.join(directory, INDEX), timeout=60)
+        with self.db:
+            self.db.execute('''CREATE TABLE IF NOT EXISTS entry (
+                               prot_id TEXT PRIMARY KEY,
+                               status INTEGER NOT NULL,
+                               size INTEGER NOT NULL,
+                               digest TEXT NOT NULL,
+                               fetched REAL NOT NULL,
+                               used REAL NOT NULL)''')
+
+    def path(self, prot_id: str) -> str:
+        """ Filename for an ID """
+
+        return os.path.join(self.directory, f'{prot_id}.fasta')
+
+    def get(self, prot_id: str) -> Optional[Entry]:
+        """ The entry for an ID, if any """
+
+        row = self.db.execute('SELECT * FROM entry WHERE prot_id = ?',
+                              (prot_id, )).fetchone()
+        return Entry(*row) if row else None
+
+    def is_fresh(self, entry: Entry, now: float) -> bool:
+        """ Whether an entry can be used without fetching again """
+
+        if entry.status in NEGATIVE_STATUS:
+            return now - entry.fetched < self.negative_ttl
+
+        if self.ttl is not None and now - entry.fetched >= self.ttl:
+            return False
+
+        # A file removed or changed behind our back is fetched again
+        try:
+            return os.path.getsize(self.path(entry.prot_id)) == entry.size
+        except OSError:
+            return False
+
+    def lookup(self, prot_ids: Iterable[str]) -> List[str]:
+        """
+        Mark the fresh IDs as used and return the IDs that must be fetched
+        """
+
+        now = time.time()
+        stale: List[str] = []
+        with self.db:
+            for prot_id in dict.fromkeys(prot_ids):
+                if (entry := self.get(prot_id)) is None:
+                    entry = self._adopt(prot_id)
+
+                if entry and self.is_fresh(entry, now):
+                    self.db.execute(
+                        'UPDATE entry SET used = ? WHERE prot_id = ?',
+                        (now, prot_id))
+                else:
+                    stale.append(prot_id)
+
+        return stale
+
+    def _adopt(self, prot_id: str) -> Optional[Entry]:
+        """ Index a file that was downloaded without the cache """
+
+        if not os.path.isfile(file := self.path(prot_id)):
+            return None
+
+        with open(file, 'rb') as fh:
+            data = fh.read()
+        mtime = os.path.getmtime(file)
+        entry = Entry(prot_id, 200, len(data),
+                      hashlib.sha256(data).hexdigest(), mtime, mtime)
+        self.db.execute('INSERT INTO entry VALUES (?, ?, ?, ?, ?, ?)', entry)
+        return entry
+
+    def store(self, prot_id: str, status: int, text: str = '') -> None:
+        """
+        Save a 200 response to the directory, or remember a negative one.
+        Other failures are not cached and will be fetched again.
+        """
+
+        if status != 200 and status not in NEGATIVE_STATUS:
+            return
+
+        data = text.encode() if status == 200 else b''
+        file = self.path(prot_id)
+        if status == 200:
+            # Never leave a partial file to be mistaken for a download
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp, file)
+        elif os.path.isfile(file):
+            os.remove(file)
+
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                'INSERT OR REPLACE INTO entry VALUES (?, ?, ?, ?, ?, ?)',
+                (prot_id, status, len(data), hashlib.sha256(data).hexdigest(),
+                 now, now))
+
+    def total_bytes(self) -> int:
+        """ Size of all cached files """
+
+        return self.db.execute('SELECT COALESCE(SUM(size), 0) FROM entry'
+                               ).fetchone()[0]
+
+    def evict(self, keep: Collection[str] = ()) -> List[str]:
+        """
+        Drop expired negative entries, then the least recently used files
+        other than those in keep until within max_bytes. Returns the IDs
+        of the files removed.
+        """
+
+        now = time.time()
+        removed: List[str] = []
+        with self.db:
+            self.db.execute(
+                'DELETE FROM entry WHERE status IN (?, ?) AND fetched <= ?',
+                (*NEGATIVE_STATUS, now - self.negative_ttl))
+
+            if self.max_bytes is None:
+                return removed
+
+            total = self.total_bytes()
+            rows = self.db.execute(
+                'SELECT prot_id, size FROM entry WHERE size > 0 '
+                'ORDER BY used, prot_id').fetchall()
+            for prot_id, size in rows:
+                if total <= self.max_bytes:
+                    break
+                if prot_id in keep:
+                    continue
+                if os.path.isfile(file := self.path(prot_id)):
+                    os.remove(file)
+                self.db.execute('DELETE FROM entry WHERE prot_id = ?',
+                                (prot_id, ))
+                total -= size
+                removed.append(prot_id)
+
+        return removed
+
+    def close(self) -> None:
+        """ Close the index """
+
+        self.db.close()
+
+    def __enter__(self) -> 'FastaCache':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --------------------------------------------------
+def test_fasta_cache() -> None:
+    """ Test FastaCache """
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'OLD.fasta'), 'wt') as fh:
+            fh.write('>OLD\nMK\n')
+
+        with FastaCache(tmp, max_bytes=20) as cache:
+            assert cache.lookup(['A', 'OLD', 'B', 'A']) == ['A', 'B']
+            assert cache.get('OLD') is not None
+
+            cache.store('A', 200, '>A\nMNAS\n')
+            cache.store('B', 404)
+            cache.store('C', 503)
+            assert cache.lookup(['A', 'B', 'C']) == ['C']
+            assert open(cache.path('A')).read() == '>A\nMNAS\n'
+            assert not os.path.exists(cache.path('B'))
+            assert cache.get('C') is None
+            assert cache.total_bytes() == 16
+
+            # A file changed behind the cache's back is stale
+            with open(cache.path('A'), 'at') as fh:
+                fh.write('X')
+            assert cache.lookup(['A']) == ['A']
+            cache.store('A', 200, '>A\nMNAS\n')
+
+            # Over budget: OLD was used least recently
+            cache.store('D', 200, '>D\nMKLV\n')
+            assert cache.evict(keep={'A'}) == ['OLD']
+            assert not os.path.exists(cache.path('OLD'))
+            assert cache.total_bytes() == 16
+
+            cache.max_bytes = 0
+            assert cache.evict(keep={'D'}) == ['A']
+            assert cache.lookup(['D']) == []
+
+        with FastaCache(tmp, ttl=0, negative_ttl=0) as cache:
+            assert cache.lookup(['B', 'D']) == ['B', 'D']
+            cache.evict()
+            assert cache.get('B') is None
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+""" Scan local protein FASTA for PROSITE motifs in parallel """
+
+import argparse
+import multiprocessing
+import os
+import re
+import sys
+import time
+from itertools import islice
+from typing import (Callable, Dict, FrozenSet, Iterable, Iterator, List,
+                    NamedTuple, Pattern, TextIO, Tuple)
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from tabulate import tabulate
+from solution2_manual import find_kmers, is_match
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from parallel import ordered  # noqa: E402 pylint: disable=C0413
+
+MATCHERS = ['regex', 'manual']
+N_GLYCOSYLATION = 'N-{P}-[ST]-{P}'
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    files: List[TextIO]
+    patterns: List[str]
+    matcher: str
+    compare: bool
+    jobs: int
+    batch: int
+    outfile: TextIO
+
+
+class Element(NamedTuple):
+    """ One position of a PROSITE pattern """
+    residues: FrozenSet[str]
+    negate: bool
+    low: int
+    high: int
+
+
+class Motif(NamedTuple):
+    """ A PROSITE pattern, parsed and compiled """
+    pattern: str
+    elements: List[Element]
+    at_start: bool
+    at_end: bool
+    regex: Pattern
+
+
+class Batch(NamedTuple):
+    """ Results for a batch of records from one worker """
+    hits: List[Tuple[str, List[List[int]]]]
+    residues: int
+    seconds: Dict[str, float]
+    disagree: List[str]
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Scan local protein FASTA for PROSITE motifs in parallel',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('files',
+                        help='Protein FASTA file(s)',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        nargs='+')
+
+    parser.add_argument('-p',
+                        '--pattern',
+                        help='PROSITE pattern, one column each in the output',
+                        metavar='pattern',
+                        type=str,
+                        action='append')
+
+    parser.add_argument('-m',
+                        '--matcher',
+                        help='Matcher',
+                        metavar='matcher',
+                        type=str,
+                        choices=MATCHERS,
+                        default='regex')
+
+    parser.add_argument('-c',
+                        '--compare',
+                        help='Run both matchers, report throughput to STDERR',
+                        action='store_true')
+
+    parser.add_argument('-j',
+                        '--jobs',
+                        help='Number of worker processes',
+                        metavar='int',
+                        type=int,
+                        default=multiprocessing.cpu_count())
+
+    parser.add_argument('-b',
+                        '--batch',
+                        help='Records sent to a worker at a time',
+                        metavar='int',
+                        type=int,
+                        default=1000)
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'),
+                        default=sys.stdout)
+
+    args = parser.parse_args()
+    patterns = args.pattern or [N_GLYCOSYLATION]
+
+    if args.jobs < 1:
+        parser.error(f'--jobs "{args.jobs}" must be > 0')
+
+    if args.batch < 1:
+        parser.error(f'--batch "{args.batch}" must be > 0')
+
+    for pattern in patterns:
+        try:
+            motif = compile_motif(pattern)
+        except ValueError as err:
+            parser.error(str(err))
+        if (args.matcher == 'manual' or args.compare) and \
+                not is_fixed(motif):
+            parser.error(f'Pattern "{pattern}" has a variable length, '
+                         'use the regex matcher')
+
+    return Args(files=args.files,
+                patterns=patterns,
+                matcher=args.matcher,
+                compare=args.compare,
+                jobs=args.jobs,
+                batch=args.batch,
+                outfile=args.outfile)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    matchers = MATCHERS if args.compare else [args.matcher]
+    batches = batched(read_records(args.files), args.batch)
+    residues = 0
+    seconds = dict.fromkeys(matchers, 0.)
+    disagree: List[str] = []
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(args.jobs,
+                              initializer=init_worker,
+                              initargs=(args.patterns, matchers)) as pool:
+        for batch in ordered(pool, scan_batch, batches, 2 * args.jobs):
+            for rec_id, positions in batch.hits:
+                cols = [' '.join(map(str, pos)) for pos in positions]
+                print('\t'.join([rec_id] + cols), file=args.outfile)
+            residues += batch.residues
+            for name, secs in batch.seconds.items():
+                seconds[name] += secs
+            disagree.extend(batch.disagree)
+    wall = time.perf_counter() - start
+
+    if args.compare:
+        print(throughput_table(seconds, residues, wall), file=sys.stderr)
+        if disagree:
+            sys.exit(f'Matchers disagree on {len(disagree)} records, '
+                     f'e.g., "{disagree[0]}"')
+
+
+# --------------------------------------------------
+def read_records(files: List[TextIO]) -> Iterator[Tuple[str, str]]:
+    """ (ID, sequence) for every record in every file """
+
+    for fh in files:
+        for title, seq in SimpleFastaParser(fh):
+            yield (title.split(None, 1)[0] if title else ''), seq
+
+
+# --------------------------------------------------
+def batched(items: Iterable[Tuple[str, str]],
+            size: int) -> Iterator[List[Tuple[str, str]]]:
+    """ Lists of up to size items """
+
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+# --------------------------------------------------
+def compile_motif(pattern: str) -> Motif:
+    """
+    Parse a PROSITE pattern, e.g., N-{P}-[ST]-{P} or <M-x(2,4)-[DE]>.
+    Raises ValueError if it is malformed.
+    """
+
+    elements: List[Element] = []
+    at_start = pattern.startswith('<')
+    at_end = pattern.rstrip('.').endswith('>')
+    body = pattern.rstrip('.').lstrip('<').rstrip('>')
+
+    element = re.compile(r'(x|[A-Z]|\[([A-Z]+)\]|\{([A-Z]+)\})'
+                         r'(?:\((\d+)(?:,(\d+))?\))?$')
+    for part in body.split('-'):
+        if not (match := element.match(part)):
+            raise ValueError(f'Invalid PROSITE pattern "{pattern}"')
+
+        core, allowed, forbidden, low, high = match.groups()
+        low = int(low) if low else 1
+        high = int(high) if high else low
+        if high < low or high == 0:
+            raise ValueError(f'Invalid PROSITE pattern "{pattern}"')
+
+        if core == 'x':
+            elements.append(Element(frozenset(), True, low, high))
+        elif forbidden:
+            elements.append(Element(frozenset(forbidden), True, low, high))
+        else:
+            elements.append(
+                Element(frozenset(allowed or core), False, low, high))
+
+    return Motif(pattern, elements, at_start, at_end,
+                 re.compile(prosite_to_regex(elements, at_start, at_end)))
+
+
+# --------------------------------------------------
+def prosite_to_regex(elements: List[Element], at_start: bool,
+                     at_end: bool) -> str:
+    """ Regular expression reporting every, even overlapping, match """
+
+    def char_class(elem: Element) -> str:
+        if elem.negate and not elem.residues:
+            return '.'
+        residues = ''.join(sorted(elem.residues))
+        if elem.negate:
+            return f'[^{residues}]'
+        return residues if len(residues) == 1 else f'[{residues}]'
+
+    def repeat(elem: Element) -> str:
+        if elem.low == elem.high:
+            return '' if elem.low == 1 else f'{{{elem.low}}}'
+        return f'{{{elem.low},{elem.high}}}'
+
+    body = ''.join(char_class(elem) + repeat(elem) for elem in elements)
+    return f'(?=({"^" if at_start else ""}{body}{"$" if at_end else ""}))'
+
+
+# --------------------------------------------------
+def test_compile_motif() -> None:
+    """ Test compile_motif """
+
+    motif = compile_motif(N_GLYCOSYLATION)
+    assert motif.regex.pattern == '(?=(N[^P][ST][^P]))'
+    assert is_fixed(motif)
+
+    motif = compile_motif('<M-x(2,4)-[DE]-x-{C}(2)>.')
+    assert motif.regex.pattern == '(?=(^M.{2,4}[DE].[^C]{2}$))'
+    assert motif.at_start and motif.at_end
+    assert not is_fixed(motif)
+
+    for bad in ['', 'N--P', 'N-[P', 'n-P', 'N-x(3,2)', 'N-x(0)']:
+        try:
+            compile_motif(bad)
+        except ValueError:
+            pass
+        else:
+            assert False, bad
+
+
+# --------------------------------------------------
+def is_fixed(motif: Motif) -> bool:
+    """ Whether every match has the same length """
+
+    return all(elem.low == elem.high for elem in motif.elements)
+
+
+# --------------------------------------------------
+def find_regex(motif: Motif, seq: str) -> List[int]:
+    """ 0-based starts of every match, using the compiled regex """
+
+    return [match.start() for match in motif.regex.finditer(seq)]
+
+
+# --------------------------------------------------
+def find_manual(motif: Motif, seq: str) -> List[int]:
+    """
+    0-based starts of every match of a fixed-length motif, checking each
+    k-mer from solution2_manual's find_kmers() with its is_match() for
+    N-glycosylation, or else against the residues allowed at each
+    position
+    """
+
+    checks = [(elem.residues, elem.negate) for elem in motif.elements
+              for _ in range(elem.low)]
+
+    def allowed(kmer: str) -> bool:
+        return all((res in residues) != negate
+                   for res, (residues, negate) in zip(kmer, checks))
+
+    match = is_match if motif.pattern.rstrip('.') == N_GLYCOSYLATION \
+        else allowed
+    kmers = find_kmers(seq, len(checks))
+    starts: Iterable[int] = range(len(kmers))
+    if motif.at_start and motif.at_end:
+        starts = [0] if len(kmers) == 1 else []
+    elif kmers and (motif.at_start or motif.at_end):
+        starts = [0 if motif.at_start else len(kmers) - 1]
+
+    return [start for start in starts if match(kmers[start])]
+
+
+# --------------------------------------------------
+def test_matchers() -> None:
+    """ Test find_regex and find_manual agree """
+
+    motif = compile_motif(N_GLYCOSYLATION)
+    for seq, expected in [('', []), ('NPTX', []), ('NXTP', []),
+                          ('NXSX', [0]), ('ANXTX', [1]), ('NNTSYS', [0, 1]),
+                          ('XNNTSYSXNNTSYS', [1, 2, 8, 9])]:
+        assert find_regex(motif, seq) == expected
+        assert find_manual(motif, seq) == expected
+
+    for pattern in ['x-C-x', '[KR]-{P}', '<M-x', 'x-K>', '<M-K>', 'C(2)-x']:
+        motif = compile_motif(pattern)
+        for seq in ['MKCCK', 'MK', 'AMKRPCCAK', 'K', '']:
+            assert find_regex(motif, seq) == find_manual(motif, seq), \
+                (pattern, seq)
+
+
+MATCHER_FUNCS: Dict[str, Callable[[Motif, str], List[int]]] = {
+    'regex': find_regex,
+    'manual': find_manual
+}
+
+WORKER: Dict[str, List] = {}
+
+
+# --------------------------------------------------
+def init_worker(patterns: List[str], matchers: List[str]) -> None:
+    """ Compile the motifs once per worker process """
+
+    WORKER['motifs'] = list(map(compile_motif, patterns))
+    WORKER['matchers'] = matchers
+
+
+# --------------------------------------------------
+def scan_batch(records: List[Tuple[str, str]]) -> Batch:
+    """
+    Find every motif in each record with each matcher, keeping the
+    records with a match as found by the first matcher
+    """
+
+    motifs: List[Motif] = WORKER['motifs']
+    matchers: List[str] = WORKER['matchers']
+    seconds = dict.fromkeys(matchers, 0.)
+    results: Dict[str, List[List[List[int]]]] = {}
+
+    for name in matchers:
+        find = MATCHER_FUNCS[name]
+        start = time.perf_counter()
+        results[name] = [[find(motif, seq) for motif in motifs]
+                         for _, seq in records]
+        seconds[name] += time.perf_counter() - start
+
+    first = results[matchers[0]]
+    disagree = [
+        rec_id for i, (rec_id, _) in enumerate(records)
+        if any(results[name][i] != first[i] for name in matchers[1:])
+    ]
+    hits = [(rec_id, [[pos + 1 for pos in found] for found in found_all])
+            for (rec_id, _), found_all in zip(records, first)
+            if any(found_all)]
+
+    return Batch(hits=hits,
+                 residues=sum(len(seq) for _, seq in records),
+                 seconds=seconds,
+                 disagree=disagree)
+
+
+# --------------------------------------------------
+def test_scan_batch() -> None:
+    """ Test scan_batch """
+
+    init_worker([N_GLYCOSYLATION, 'C-C'], MATCHERS)
+    batch = scan_batch([('a', 'XNNTSYS'), ('b', 'MKLV'), ('c', 'CCC')])
+    assert batch.hits == [('a', [[2, 3], []]), ('c', [[], [1, 2]])]
+    assert batch.residues == 14
+    assert set(batch.seconds) == set(MATCHERS)
+    assert batch.disagree == []
+
+
+# --------------------------------------------------
+def throughput_table(seconds: Dict[str, float], residues: int,
+                     wall: float) -> str:
+    """ Matcher time summed over workers, and residues per second """
+
+    rows = [[name, residues, secs, residues / secs / 1e6 if secs else None]
+            for name, secs in seconds.items()]
+    return tabulate(rows,
+                    headers=['matcher', 'residues', 'cpu_seconds', 'M/sec'],
+                    floatfmt='.3f') + f'\nwall seconds: {wall:.3f}'
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
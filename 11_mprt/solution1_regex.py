@@ -4,16 +4,20 @@
 import argparse
 import os
 import re
-import sys
-from typing import NamedTuple, List, TextIO
-import requests
+from typing import NamedTuple, List, Optional, TextIO
 from Bio import SeqIO
+from fasta_cache import FastaCache
+from uniprot import BASE_URL, download
 
 
 class Args(NamedTuple):
     """ Command-line arguments """
     file: TextIO
     download_dir: str
+    base_url: str
+    workers: int
+    ttl: Optional[float]
+    max_mb: Optional[float]
 
 
 # --------------------------------------------------
@@ -36,9 +40,45 @@ def get_args() -> Args:
                         type=str,
                         default='fasta')
 
+    parser.add_argument('-u',
+                        '--base_url',
+                        help='UniProt URL to fetch ID.fasta from',
+                        metavar='URL',
+                        type=str,
+                        default=BASE_URL)
+
+    parser.add_argument('-w',
+                        '--workers',
+                        help='Maximum concurrent downloads',
+                        metavar='int',
+                        type=int,
+                        default=8)
+
+    parser.add_argument('-t',
+                        '--ttl',
+                        help='Download again after this many hours',
+                        metavar='hours',
+                        type=float)
+
+    parser.add_argument('-m',
+                        '--max_mb',
+                        help='Evict least recently used downloads over this',
+                        metavar='MB',
+                        type=float)
+
     args = parser.parse_args()
 
-    return Args(args.file, args.download_dir)
+    if args.workers < 1:
+        parser.error(f'--workers "{args.workers}" must be > 0')
+
+    if args.ttl is not None and args.ttl < 0:
+        parser.error(f'--ttl "{args.ttl}" must be >= 0')
+
+    if args.max_mb is not None and args.max_mb < 0:
+        parser.error(f'--max_mb "{args.max_mb}" must be >= 0')
+
+    return Args(args.file, args.download_dir, args.base_url, args.workers,
+                args.ttl, args.max_mb)
 
 
 # --------------------------------------------------
@@ -46,7 +86,12 @@ def main():
     """ Make a jazz noise here """
 
     args = get_args()
-    files = fetch_fasta(args.file, args.download_dir)
+    cache = FastaCache(
+        args.download_dir,
+        ttl=None if args.ttl is None else args.ttl * 3600,
+        max_bytes=None if args.max_mb is None else int(args.max_mb * 1e6))
+    with cache:
+        files = fetch_fasta(args.file, cache, args.base_url, args.workers)
     regex = re.compile('(?=(N[^P][ST][^P]))')
 
     for file in files:
@@ -59,28 +104,13 @@ def main():
 
 
 # --------------------------------------------------
-def fetch_fasta(fh: TextIO, fasta_dir: str) -> List[str]:
+def fetch_fasta(fh: TextIO,
+                cache: FastaCache,
+                base_url: str = BASE_URL,
+                workers: int = 8) -> List[str]:
     """ Fetch the FASTA files into the download directory """
 
-    if not os.path.isdir(fasta_dir):
-        os.makedirs(fasta_dir)
-
-    files = []
-    for prot_id in map(str.rstrip, fh):
-        fasta = os.path.join(fasta_dir, prot_id + '.fasta')
-        if not os.path.isfile(fasta):
-            url = f'http://www.uniprot.org/uniprot/{prot_id}.fasta'
-            response = requests.get(url)
-            if response.status_code == 200:
-                print(response.text, file=open(fasta, 'wt'))
-            else:
-                print(f'Error fetching "{url}": "{response.status_code}"',
-                      file=sys.stderr)
-                continue
-
-        files.append(fasta)
-
-    return files
+    return download(map(str.rstrip, fh), cache, base_url, workers)
 
 
 # --------------------------------------------------
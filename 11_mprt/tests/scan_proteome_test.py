@@ -0,0 +1,105 @@
+""" Tests for scan_proteome.py """
+
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+
+PRG = './scan_proteome.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+INPUT = './tests/inputs/proteome.fa'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Usage """
+
+    rv, out = getstatusoutput(RUN)
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_pattern() -> None:
+    """ Dies on bad pattern """
+
+    rv, out = getstatusoutput(f'{RUN} -p "N-[ST" {INPUT}')
+    assert rv != 0
+    assert re.search('Invalid PROSITE pattern "N-\\[ST"', out)
+
+    rv, out = getstatusoutput(f'{RUN} -m manual -p "C-x(2,4)-C" {INPUT}')
+    assert rv != 0
+    assert re.search('has a variable length', out)
+
+
+# --------------------------------------------------
+def test_default() -> None:
+    """ N-glycosylation motif """
+
+    for matcher in ['regex', 'manual']:
+        for jobs in [1, 2]:
+            rv, out = getstatusoutput(
+                f'{RUN} -m {matcher} -j {jobs} -b 1 {INPUT}')
+            assert rv == 0
+            assert out.splitlines() == [
+                'sp|P1|TEST_1\t2 10', 'sp|P3|TEST_3\t1 2 8 9'
+            ]
+
+
+# --------------------------------------------------
+def test_patterns() -> None:
+    """ One column per pattern """
+
+    outfile = random_string()
+    try:
+        rv, out = getstatusoutput(f'{RUN} -p "N-{{P}}-[ST]-{{P}}" '
+                                  f'-p "C-x(2)-C" -o {outfile} {INPUT}')
+        assert rv == 0
+        assert out == ''
+        assert open(outfile).read().splitlines() == [
+            'sp|P1|TEST_1\t2 10\t15', 'sp|P3|TEST_3\t1 2 8 9\t'
+        ]
+    finally:
+        if os.path.isfile(outfile):
+            os.remove(outfile)
+
+
+# --------------------------------------------------
+def test_compare() -> None:
+    """ Reports throughput of both matchers """
+
+    rv, out = getstatusoutput(f'{RUN} -c {INPUT}')
+    assert rv == 0
+    lines = out.splitlines()
+    assert 'sp|P1|TEST_1\t2 10' in lines
+    assert any(re.match(r'regex\s+38\s', line) for line in lines)
+    assert any(re.match(r'manual\s+38\s', line) for line in lines)
+    assert any(line.startswith('wall seconds:') for line in lines)
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """ Generate a random string """
+
+    k = random.randint(5, 10)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=k))
@@ -0,0 +1,174 @@
+""" Tests for uniprot.py against a local stand-in for UniProt """
+
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from subprocess import getstatusoutput
+from typing import Dict, Iterator, List
+from fasta_cache import FastaCache
+from uniprot import download, fetch_all
+
+PROGRAMS = ['./solution1_regex.py', './solution2_manual.py']
+FASTA = {
+    'P1': '>sp|P1|TEST_1\nMNASANPTANXSA\n',
+    'P2': '>sp|P2|TEST_2\nMKLVAAG\n',
+    'P3': '>sp|P3|TEST_3\nNNTSYSXNNTSYS\n',
+}
+
+
+# --------------------------------------------------
+class StandIn(ThreadingHTTPServer):
+    """ Serve FASTA from a dict, counting requests in flight """
+
+    def __init__(self, pages: Dict[str, str], fail_first: int = 0) -> None:
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.pages = pages
+        self.fail_first = fail_first
+        self.requests: List[str] = []
+        self.in_flight = self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """ Base URL """
+
+        return f'http://127.0.0.1:{self.server_address[1]}/uniprot'
+
+
+class Handler(BaseHTTPRequestHandler):
+    """ GET /uniprot/ID.fasta """
+
+    server: StandIn
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """ Serve one page, failing the first fail_first requests """
+
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight,
+                                       server.in_flight)
+            fail = len(server.requests) <= server.fail_first
+
+        time.sleep(.02)
+        prot_id = os.path.basename(self.path).replace('.fasta', '')
+        if fail:
+            self.send_response(503)
+            body = b''
+        elif (page := server.pages.get(prot_id)) is None:
+            self.send_response(404)
+            body = b''
+        else:
+            self.send_response(200)
+            body = page.encode()
+
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, *args) -> None:  # pylint: disable=arguments-differ
+        pass
+
+
+# --------------------------------------------------
+@contextmanager
+def stand_in(pages: Dict[str, str], fail_first: int = 0) -> Iterator[StandIn]:
+    """ Run a stand-in server in a thread """
+
+    server = StandIn(pages, fail_first)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# --------------------------------------------------
+def test_fetch_all() -> None:
+    """ Results come back in order, with 404s reported """
+
+    ids = ['P3', 'NOPE', 'P1', 'P2'] * 5
+    with stand_in(FASTA) as server:
+        results = list(fetch_all(ids, server.url, workers=3, backoff=0))
+
+    assert [res.prot_id for res in results] == ids
+    for res in results:
+        if res.prot_id == 'NOPE':
+            assert (res.status, res.text) == (404, '')
+            assert res.error
+        else:
+            assert (res.status, res.text) == (200, FASTA[res.prot_id])
+            assert res.error is None
+    assert 1 < server.max_in_flight <= 3
+
+
+# --------------------------------------------------
+def test_retries() -> None:
+    """ Retries server errors, and gives up after too many """
+
+    with stand_in(FASTA, fail_first=2) as server:
+        res, = fetch_all(['P1'], server.url, retries=2, backoff=0)
+        assert (res.status, res.text) == (200, FASTA['P1'])
+        assert len(server.requests) == 3
+
+    with stand_in(FASTA, fail_first=5) as server:
+        res, = fetch_all(['P1'], server.url, retries=2, backoff=0)
+        assert res.status == 503
+        assert len(server.requests) == 3
+
+    # Nothing listening
+    res, = fetch_all(['P1'], 'http://127.0.0.1:1', retries=0)
+    assert res.status == 0
+    assert res.error
+
+
+# --------------------------------------------------
+def test_download() -> None:
+    """ Downloads only what the cache cannot supply """
+
+    with tempfile.TemporaryDirectory() as tmp, stand_in(FASTA) as server, \
+            FastaCache(os.path.join(tmp, 'fasta'), max_bytes=40) as cache:
+        files = download(['P1', 'NOPE', 'P2', ''], cache, server.url)
+        assert files == [cache.path('P1'), cache.path('P2')]
+        assert open(files[0]).read() == FASTA['P1']
+
+        # The 404 is remembered, and P2 is evicted to make room for P3
+        files = download(['P1', 'P3', 'NOPE'], cache, server.url)
+        assert files == [cache.path('P1'), cache.path('P3')]
+        assert not os.path.isfile(cache.path('P2'))
+        assert sorted(server.requests) == [
+            '/uniprot/NOPE.fasta', '/uniprot/P1.fasta', '/uniprot/P2.fasta',
+            '/uniprot/P3.fasta'
+        ]
+
+
+# --------------------------------------------------
+def test_programs() -> None:
+    """ Solutions find motifs in sequences from the stand-in """
+
+    with tempfile.TemporaryDirectory() as tmp, stand_in(FASTA) as server:
+        ids = os.path.join(tmp, 'ids.txt')
+        with open(ids, 'wt') as fh:
+            fh.write('P1\nP2\nP3\nNOPE\n')
+
+        for i, prg in enumerate(PROGRAMS):
+            fasta_dir = os.path.join(tmp, str(i))
+            cmd = f'{prg} -u {server.url} -w 2 -d {fasta_dir} {ids}'
+            error = f'Error fetching "{server.url}/NOPE.fasta": "404"'
+            for suffix in ['', ' (cached)']:
+                rv, out = getstatusoutput(cmd)
+                assert rv == 0
+                assert out.splitlines() == [
+                    error + suffix, 'P1', '2 10', 'P3', '1 2 8 9'
+                ]
+
+        assert len(server.requests) == 2 * 4
@@ -0,0 +1,134 @@
+""" Concurrent UniProt FASTA downloads over a pooled HTTP session """
+
+import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterable, Iterator, List, NamedTuple, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from fasta_cache import FastaCache
+
+BASE_URL = 'http://www.uniprot.org/uniprot'
+RETRY_STATUS = [429, 500, 502, 503, 504]
+
+
+class Fetched(NamedTuple):
+    """ One download: status is 0 if no response was received """
+    prot_id: str
+    url: str
+    status: int
+    text: str
+    error: Optional[str]
+
+
+# --------------------------------------------------
+def make_session(workers: int = 8,
+                 retries: int = 3,
+                 backoff: float = 0.5) -> requests.Session:
+    """
+    Session keeping up to `workers` connections per host alive. Failed
+    connections and RETRY_STATUS responses are retried, sleeping
+    backoff * 2 ** (attempt - 1) seconds (or as long as Retry-After asks)
+    """
+
+    retry = Retry(total=retries,
+                  backoff_factor=backoff,
+                  status_forcelist=RETRY_STATUS,
+                  allowed_methods=['GET'],
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=1,
+                          pool_maxsize=workers,
+                          max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# --------------------------------------------------
+def fasta_url(prot_id: str, base_url: str = BASE_URL) -> str:
+    """ URL for a protein's FASTA """
+
+    return f'{base_url.rstrip("/")}/{prot_id}.fasta'
+
+
+# --------------------------------------------------
+def test_fasta_url() -> None:
+    """ Test fasta_url """
+
+    assert fasta_url('B5ZC00') == 'http://www.uniprot.org/uniprot/B5ZC00.fasta'
+    assert fasta_url('X', 'http://localhost:8000/') == \
+        'http://localhost:8000/X.fasta'
+
+
+# --------------------------------------------------
+def fetch_all(prot_ids: Iterable[str],
+              base_url: str = BASE_URL,
+              workers: int = 8,
+              retries: int = 3,
+              backoff: float = 0.5,
+              timeout: float = 30.) -> Iterator[Fetched]:
+    """
+    Fetch every ID with at most `workers` requests in flight, yielding
+    the results in input order
+    """
+
+    workers = max(1, workers)
+    with make_session(workers, retries, backoff) as session, \
+            ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def fetch(prot_id: str) -> Fetched:
+            url = fasta_url(prot_id, base_url)
+            try:
+                response = session.get(url, timeout=timeout)
+            except requests.RequestException as err:
+                return Fetched(prot_id, url, 0, '', str(err))
+
+            ok = response.status_code == 200
+            return Fetched(prot_id, url, response.status_code,
+                           response.text if ok else '',
+                           None if ok else response.reason)
+
+        # map() would submit every ID up front, so keep a bounded window
+        pending: Deque[Future] = deque()
+        for prot_id in prot_ids:
+            pending.append(pool.submit(fetch, prot_id))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+
+        for future in pending:
+            yield future.result()
+
+
+# --------------------------------------------------
+def download(prot_ids: Iterable[str],
+             cache: FastaCache,
+             base_url: str = BASE_URL,
+             workers: int = 8) -> List[str]:
+    """
+    Fetch the FASTA for each ID the cache cannot supply, returning the
+    files present in input order. Failures are reported on STDERR, and
+    the cache is then evicted down to its budget, keeping these IDs.
+    """
+
+    prot_ids = [prot_id for prot_id in prot_ids if prot_id]
+    stale = cache.lookup(prot_ids)
+
+    for res in fetch_all(stale, base_url, workers):
+        cache.store(res.prot_id, res.status, res.text)
+        if res.status != 200:
+            print(f'Error fetching "{res.url}": "{res.status or res.error}"',
+                  file=sys.stderr)
+
+    files, fetched = [], set(stale)
+    for prot_id in prot_ids:
+        if (entry := cache.get(prot_id)) and entry.status == 200:
+            files.append(cache.path(prot_id))
+        elif entry and prot_id not in fetched:
+            print(f'Error fetching "{fasta_url(prot_id, base_url)}": '
+                  f'"{entry.status}" (cached)',
+                  file=sys.stderr)
+
+    cache.evict(keep=set(prot_ids))
+    return files
@@ -2,13 +2,49 @@
 """ Generate the mRNA sequences for a protein """
 
 import argparse
+import math
 import os
-from functools import reduce
-from itertools import product
+import random
+from itertools import islice, product
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+AA_TO_CODON = {
+    'A': ['GCA', 'GCC', 'GCG', 'GCU'],
+    'C': ['UGC', 'UGU'],
+    'D': ['GAC', 'GAU'],
+    'E': ['GAA', 'GAG'],
+    'F': ['UUC', 'UUU'],
+    'G': ['GGA', 'GGC', 'GGG', 'GGU'],
+    'H': ['CAC', 'CAU'],
+    'I': ['AUA', 'AUC', 'AUU'],
+    'K': ['AAA', 'AAG'],
+    'L': ['CUA', 'CUC', 'CUG', 'CUU', 'UUA', 'UUG'],
+    'M': ['AUG'],
+    'N': ['AAC', 'AAU'],
+    'P': ['CCA', 'CCC', 'CCG', 'CCU'],
+    'Q': ['CAA', 'CAG'],
+    'R': ['AGA', 'AGG', 'CGA', 'CGC', 'CGG', 'CGU'],
+    'S': ['AGC', 'AGU', 'UCA', 'UCC', 'UCG', 'UCU'],
+    'T': ['ACA', 'ACC', 'ACG', 'ACU'],
+    'V': ['GUA', 'GUC', 'GUG', 'GUU'],
+    'W': ['UGG'],
+    'Y': ['UAC', 'UAU'],
+    '*': ['UAA', 'UAG', 'UGA'],
+}
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    protein: str
+    start: int
+    count: Optional[int]
+    shard: Tuple[int, int]
+    sample: Optional[int]
+    seed: Optional[int]
 
 
 # --------------------------------------------------
-def get_args():
+def get_args() -> Args:
     """ Get command-line arguments """
 
     parser = argparse.ArgumentParser(
@@ -25,49 +61,204 @@ def get_args():
                         metavar='int',
                         type=int,
                         default=1000000,
-                        help='Modulo value')
+                        help='Modulo value (accepted as before, unused)')
+
+    parser.add_argument('--start',
+                        metavar='int',
+                        type=int,
+                        default=0,
+                        help='Index of the first mRNA (within the shard)')
+
+    parser.add_argument('--count',
+                        metavar='int',
+                        type=int,
+                        help='Number of mRNAs to print (default: all)')
+
+    parser.add_argument('--shard',
+                        metavar='i/n',
+                        type=str,
+                        default='1/1',
+                        help='Print only the ith of n equal slices')
+
+    parser.add_argument('--sample',
+                        metavar='int',
+                        type=int,
+                        help='Print this many mRNAs chosen at random instead')
+
+    parser.add_argument('--seed',
+                        metavar='int',
+                        type=int,
+                        help='Random seed')
 
     args = parser.parse_args()
 
     if os.path.isfile(args.protein):
         args.protein = open(args.protein).read().rstrip()
 
-    return args
+    if bad := next((aa for aa in args.protein if aa not in AA_TO_CODON),
+                   None):
+        parser.error(f'Invalid amino acid "{bad}"')
+
+    if args.start < 0:
+        parser.error(f'--start "{args.start}" must be >= 0')
+
+    if args.count is not None and args.count < 0:
+        parser.error(f'--count "{args.count}" must be >= 0')
+
+    if args.sample is not None and args.sample < 0:
+        parser.error(f'--sample "{args.sample}" must be >= 0')
+
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as err:
+        parser.error(str(err))
+
+    return Args(protein=args.protein,
+                start=args.start,
+                count=args.count,
+                shard=shard,
+                sample=args.sample,
+                seed=args.seed)
 
 
 # --------------------------------------------------
-def main():
+def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    aa_to_codon = {
-        'A': ['GCA', 'GCC', 'GCG', 'GCU'],
-        'C': ['UGC', 'UGU'],
-        'D': ['GAC', 'GAU'],
-        'E': ['GAA', 'GAG'],
-        'F': ['UUC', 'UUU'],
-        'G': ['GGA', 'GGC', 'GGG', 'GGU'],
-        'H': ['CAC', 'CAU'],
-        'I': ['AUA', 'AUC', 'AUU'],
-        'K': ['AAA', 'AAG'],
-        'L': ['CUA', 'CUC', 'CUG', 'CUU', 'UUA', 'UUG'],
-        'M': ['AUG'],
-        'N': ['AAC', 'AAU'],
-        'P': ['CCA', 'CCC', 'CCG', 'CCU'],
-        'Q': ['CAA', 'CAG'],
-        'R': ['AGA', 'AGG', 'CGA', 'CGC', 'CGG', 'CGU'],
-        'S': ['AGC', 'AGU', 'UCA', 'UCC', 'UCG', 'UCU'],
-        'T': ['ACA', 'ACC', 'ACG', 'ACU'],
-        'V': ['GUA', 'GUC', 'GUG', 'GUU'],
-        'W': ['UGG'],
-        'Y': ['UAC', 'UAU'],
-        '*': ['UAA', 'UAG', 'UGA'],
-    }
-
-    pool = map(aa_to_codon.get, args.protein + '*')
-    for i, codons in enumerate(product(*pool), start=1):
-        # print(f"{i:5}: {''.join(codons)}")
-        print(f"{''.join(codons)}")
+    pool = [AA_TO_CODON[aa] for aa in args.protein + '*']
+
+    if args.sample is not None:
+        rand = random.Random(args.seed)
+        total = num_candidates(pool)
+        for _ in range(args.sample):
+            print(unrank(pool, rand.randrange(total)))
+        return
+
+    low, high = shard_range(num_candidates(pool), *args.shard)
+    start = min(low + args.start, high)
+    stop = high if args.count is None else min(start + args.count, high)
+    for mrna in candidates(pool, start, stop):
+        print(mrna)
+
+
+# --------------------------------------------------
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """ Parse "i/n" where 1 <= i <= n """
+
+    i, sep, n = shard.partition('/')
+    if sep and i.isdigit() and n.isdigit() and 1 <= int(i) <= int(n):
+        return int(i), int(n)
+
+    raise ValueError(f'--shard "{shard}" must be i/n with 1 <= i <= n')
+
+
+# --------------------------------------------------
+def shard_range(total: int, i: int, n: int) -> Tuple[int, int]:
+    """ Start and stop of the ith of n slices, differing by at most 1 """
+
+    return total * (i - 1) // n, total * i // n
+
+
+# --------------------------------------------------
+def test_shards() -> None:
+    """ Test parse_shard, shard_range """
+
+    assert parse_shard('1/1') == (1, 1)
+    assert parse_shard('3/4') == (3, 4)
+    for bad in ['0/4', '5/4', '1', 'a/b', '1/0', '-1/2']:
+        try:
+            parse_shard(bad)
+        except ValueError:
+            pass
+        else:
+            assert False, bad
+
+    assert shard_range(10, 1, 1) == (0, 10)
+    assert [shard_range(10, i, 3) for i in [1, 2, 3]] == [(0, 3), (3, 6),
+                                                          (6, 10)]
+    assert shard_range(2, 1, 3) == (0, 0)
+
+
+# --------------------------------------------------
+def num_candidates(pool: List[List[str]]) -> int:
+    """ Number of mRNAs """
+
+    return math.prod(map(len, pool))
+
+
+# --------------------------------------------------
+def unrank(pool: List[List[str]], index: int) -> str:
+    """
+    The mRNA at index in the order of product(*pool), found directly by
+    writing index in the mixed-radix system whose digits are codon
+    choices, the last position changing fastest
+    """
+
+    if not 0 <= index < num_candidates(pool):
+        raise IndexError(f'mRNA index {index} out of range')
+
+    codons = []
+    for choices in reversed(pool):
+        index, digit = divmod(index, len(choices))
+        codons.append(choices[digit])
+
+    return ''.join(reversed(codons))
+
+
+# --------------------------------------------------
+def candidates(pool: List[List[str]], start: int, stop: int) -> Iterator[str]:
+    """
+    mRNAs from start up to stop, unranking the first and then counting
+    up like an odometer
+    """
+
+    if start >= stop:
+        return
+
+    digits = []
+    index = start
+    for choices in reversed(pool):
+        index, digit = divmod(index, len(choices))
+        digits.append(digit)
+    digits.reverse()
+
+    for _ in range(stop - start):
+        yield ''.join(choices[digit] for choices, digit in zip(pool, digits))
+        for pos in range(len(digits) - 1, -1, -1):
+            digits[pos] += 1
+            if digits[pos] < len(pool[pos]):
+                break
+            digits[pos] = 0
+
+
+# --------------------------------------------------
+def test_unrank() -> None:
+    """ Test unrank, candidates agree with product """
+
+    pool = [AA_TO_CODON[aa] for aa in 'MAW*']
+    expected = [''.join(codons) for codons in product(*pool)]
+    assert num_candidates(pool) == len(expected) == 12
+
+    assert [unrank(pool, i) for i in range(12)] == expected
+    assert list(candidates(pool, 0, 12)) == expected
+    assert list(candidates(pool, 5, 9)) == expected[5:9]
+    assert list(candidates(pool, 7, 7)) == []
+    assert list(islice(candidates(pool, 11, 12), 5)) == expected[11:]
+
+    for bad in [-1, 12]:
+        try:
+            unrank(pool, bad)
+        except IndexError:
+            pass
+        else:
+            assert False, bad
+
+    # Far past what could be enumerated
+    pool = [AA_TO_CODON['L']] * 100 + [AA_TO_CODON['*']]
+    last = num_candidates(pool) - 1
+    assert unrank(pool, last) == 'UUG' * 100 + 'UGA'
+    assert unrank(pool, 0) == 'CUA' * 100 + 'UAA'
 
 
 # --------------------------------------------------
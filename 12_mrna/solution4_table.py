@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+""" Infer mRNA from Protein """
+
+import argparse
+import io
+import os
+from typing import (BinaryIO, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Tuple)
+
+CODONS_PER_AA: Dict[str, int] = {
+    'A': 4, 'C': 2, 'D': 2, 'E': 2, 'F': 2, 'G': 4, 'H': 2, 'I': 3,
+    'K': 2, 'L': 6, 'M': 1, 'N': 2, 'P': 4, 'Q': 2, 'R': 6, 'S': 6,
+    'T': 4, 'V': 4, 'W': 1, 'Y': 2, '*': 3,
+}
+
+# Number of codons for every byte: whitespace is skipped with 1, and
+# anything else, e.g., X or a lowercase residue, has none
+DEGENERACY = bytes(
+    CODONS_PER_AA.get(chr(byte), 1 if chr(byte).isspace() else 0)
+    for byte in range(256))
+FACTORS = sorted(set(DEGENERACY) - {1})
+BLOCK_SIZE = 2**20
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    protein: str
+    modulo: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Infer mRNA from Protein',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('protein',
+                        metavar='protein',
+                        type=str,
+                        help='Input protein, file or multi-record FASTA')
+
+    parser.add_argument('-m',
+                        '--modulo',
+                        metavar='int',
+                        type=int,
+                        default=1000000,
+                        help='Modulo value')
+
+    args = parser.parse_args()
+
+    if args.modulo < 1:
+        parser.error(f'--modulo "{args.modulo}" must be > 0')
+
+    return Args(args.protein, args.modulo)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+
+    if not os.path.isfile(args.protein):
+        print(count_mrna([args.protein.encode()], args.modulo))
+        return
+
+    with open(args.protein, 'rb') as fh:
+        for name, blocks in read_proteins(fh):
+            count = count_mrna(blocks, args.modulo)
+            print(count if name is None else f'{name}\t{count}')
+
+
+# --------------------------------------------------
+def read_proteins(
+        fh: BinaryIO) -> Iterator[Tuple[Optional[str], Iterable[bytes]]]:
+    """
+    A plain file is one unnamed protein, read in blocks. A FASTA file
+    is the ID and sequence lines of each record.
+    """
+
+    first = fh.read(BLOCK_SIZE)
+    if not first.lstrip().startswith(b'>'):
+        yield None, chain_blocks(first, fh)
+        return
+
+    fh.seek(0)
+    name: Optional[str] = None
+    lines: List[bytes] = []
+    for line in fh:
+        if line.startswith(b'>'):
+            if name is not None:
+                yield name, lines
+            name, lines = (line[1:].split(None, 1) or [b''])[0].decode(), []
+        else:
+            lines.append(line)
+
+    if name is not None:
+        yield name, lines
+
+
+# --------------------------------------------------
+def chain_blocks(first: bytes, fh: BinaryIO) -> Iterator[bytes]:
+    """ The first block, then the rest of the file in blocks """
+
+    yield first
+    while block := fh.read(BLOCK_SIZE):
+        yield block
+
+
+# --------------------------------------------------
+def count_mrna(blocks: Iterable[bytes], modulo: int) -> int:
+    """
+    Number of mRNAs encoding the protein and a stop codon, modulo a value.
+    Each block is mapped to codon counts with bytes.translate(), and the
+    number of each count is tallied with bytes.count(), so the product
+    is a few modular powers instead of one multiplication per residue.
+    """
+
+    tally = dict.fromkeys(FACTORS, 0)
+    tally[CODONS_PER_AA['*']] += 1
+    for block in blocks:
+        codons = block.translate(DEGENERACY)
+        for factor in FACTORS:
+            tally[factor] += codons.count(factor)
+
+    result = 1 % modulo
+    for factor, num in tally.items():
+        result = result * pow(factor, num, modulo) % modulo
+
+    return result
+
+
+# --------------------------------------------------
+def test_count_mrna() -> None:
+    """ Test count_mrna """
+
+    assert count_mrna([b'MA'], 1000000) == 12
+    assert count_mrna([b'M', b'A\n'], 1000000) == 12
+    assert count_mrna([b''], 1000000) == 3
+    assert count_mrna([b'M A\r\n\tW\n'], 5) == 2
+    assert count_mrna([b'MA'], 1) == 0
+
+    # As in solution1_dict, a residue with no codons leaves no mRNA
+    for bad in [b'MAX', b'ma', b'MB', b'MU', b'M1', b'M.A']:
+        assert count_mrna([bad], 1000000) == 0, bad
+
+    # Same as the product of every residue's count
+    protein = 'MSVHDQCHHQLSFSMMECLLPRSEHTRMEWKTWDVVVWMPRRWPWGPSRDK*' * 50
+    expected = 3
+    for aa in protein:
+        expected = expected * CODONS_PER_AA[aa] % 1000000
+    assert count_mrna([protein.encode()], 1000000) == expected
+
+
+# --------------------------------------------------
+def test_read_proteins() -> None:
+    """ Test read_proteins """
+
+    fasta = b'>sp|1|A desc\nMA\nM\n>2\n\n>3\nW\n'
+    assert [(name, b''.join(seq))
+            for name, seq in read_proteins(io.BytesIO(fasta))] == [
+                ('sp|1|A', b'MA\nM\n'), ('2', b'\n'), ('3', b'W\n')
+            ]
+
+    assert [(name, b''.join(seq))
+            for name, seq in read_proteins(io.BytesIO(b'MA\n'))] == [
+                (None, b'MA\n')
+            ]
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
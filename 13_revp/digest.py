@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+""" Digest sequences with a table of restriction enzymes """
+
+import argparse
+import multiprocessing
+import os
+import random
+import re
+import sys
+from collections import deque
+from fractions import Fraction
+from itertools import product
+from typing import Deque, Dict, List, NamedTuple, Pattern, Set, TextIO, Tuple
+from Bio import Restriction
+from Bio.Seq import Seq
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from parallel import ordered  # noqa: E402 pylint: disable=C0413
+
+IUPAC = {
+    'A': 'A', 'C': 'C', 'G': 'G', 'T': 'T', 'R': 'AG', 'Y': 'CT',
+    'S': 'CG', 'W': 'AT', 'K': 'GT', 'M': 'AC', 'B': 'CGT', 'D': 'AGT',
+    'H': 'ACT', 'V': 'ACG', 'N': 'ACGT'
+}
+IUPAC_COMPLEMENT = str.maketrans('ACGTRYSWKMBDHVN', 'TGCAYRSWMKVHDBN')
+BASES = 'ACGT'
+MAX_EXPANSIONS = 256
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    files: List[TextIO]
+    enzymes: TextIO
+    names: List[str]
+    jobs: int
+    outfile: TextIO
+
+
+class Enzyme(NamedTuple):
+    """
+    A recognition site in IUPAC codes, and where the top and bottom
+    strands are cut as the number of bases after the start of the site
+    """
+    name: str
+    site: str
+    top: int
+    bottom: int
+
+
+class Site(NamedTuple):
+    """
+    The recognition site of enzyme number num on one strand, compiled
+    with a character class for each IUPAC code, and where the top and
+    bottom strands are cut after the start of a match
+    """
+    num: int
+    pattern: str
+    regex: Pattern
+    top: int
+    bottom: int
+
+
+class Automaton(NamedTuple):
+    """
+    Aho-Corasick automaton over ACGT as a complete transition table:
+    delta[state][code] where code 4 is any other character. hits[state]
+    lists (site number, bases from the start of the site to the end of
+    the anchor, whether the rest of the site must be checked) for every
+    anchor ending there.
+    """
+    delta: List[List[int]]
+    hits: List[List[Tuple[int, int, bool]]]
+    sites: List[Site]
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Digest sequences with a table of restriction enzymes',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('files',
+                        help='Input FASTA file(s)',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        nargs='+')
+
+    parser.add_argument('-e',
+                        '--enzymes',
+                        help='Enzyme table: name and site, e.g., G^AATTC '
+                        'or GGTCTC(1/5)',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        default='enzymes.txt')
+
+    parser.add_argument('-n',
+                        '--name',
+                        help='Use only these enzymes',
+                        metavar='name',
+                        type=str,
+                        nargs='+',
+                        default=[])
+
+    parser.add_argument('-j',
+                        '--jobs',
+                        help='Number of worker processes',
+                        metavar='int',
+                        type=int,
+                        default=multiprocessing.cpu_count())
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'),
+                        default=sys.stdout)
+
+    args = parser.parse_args()
+
+    if args.jobs < 1:
+        parser.error(f'--jobs "{args.jobs}" must be > 0')
+
+    return Args(files=args.files,
+                enzymes=args.enzymes,
+                names=args.name,
+                jobs=args.jobs,
+                outfile=args.outfile)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+
+    try:
+        enzymes = read_enzymes(args.enzymes)
+    except ValueError as err:
+        sys.exit(str(err))
+
+    if args.names:
+        known = {enz.name: enz for enz in enzymes}
+        if unknown := [name for name in args.names if name not in known]:
+            sys.exit(f'Unknown enzyme(s): {", ".join(unknown)}')
+        enzymes = [known[name] for name in args.names]
+
+    print('\t'.join(['record', 'enzyme', 'site', 'cuts', 'positions',
+                     'fragments']),
+          file=args.outfile)
+
+    records = (rec for fh in args.files for rec in SimpleFastaParser(fh))
+    with multiprocessing.Pool(args.jobs,
+                              initializer=init_worker,
+                              initargs=(enzymes, )) as pool:
+        for rows in ordered(pool, digest_record, records, 2 * args.jobs):
+            for row in rows:
+                print('\t'.join(row), file=args.outfile)
+
+
+# --------------------------------------------------
+def read_enzymes(fh: TextIO) -> List[Enzyme]:
+    """
+    Read "name site" lines, ignoring blanks and #comments. The site
+    marks the cut with ^, e.g., G^AATTC, or gives the cuts after the
+    site as (top/bottom), e.g., GGTCTC(1/5).
+    """
+
+    enzymes = []
+    for line_num, line in enumerate(fh, start=1):
+        if not (line := line.split('#', 1)[0].strip()):
+            continue
+
+        try:
+            name, site = line.split()
+            enzymes.append(parse_site(name, site))
+        except ValueError:
+            raise ValueError(f'{fh.name} line {line_num}: cannot parse '
+                             f'"{line}"') from None
+
+    return enzymes
+
+
+# --------------------------------------------------
+def parse_site(name: str, site: str) -> Enzyme:
+    """ Enzyme from a site like G^AATTC or GGTCTC(1/5) """
+
+    site = site.upper()
+    if '(' in site:
+        site, offsets = site.rstrip(')').split('(')
+        top, bottom = map(int, offsets.split('/'))
+        top, bottom = len(site) + top, len(site) + bottom
+    elif site.count('^') == 1:
+        top = site.index('^')
+        site = site.replace('^', '')
+        bottom = len(site) - top
+    else:
+        raise ValueError(f'No cut in "{site}"')
+
+    if not site or any(base not in IUPAC for base in site):
+        raise ValueError(f'Bad site "{site}"')
+
+    return Enzyme(name, site, top, bottom)
+
+
+# --------------------------------------------------
+def test_read_enzymes() -> None:
+    """ Test read_enzymes, parse_site """
+
+    assert parse_site('EcoRI', 'G^AATTC') == Enzyme('EcoRI', 'GAATTC', 1, 5)
+    assert parse_site('BsaI', 'GGTCTC(1/5)') == Enzyme('BsaI', 'GGTCTC', 7,
+                                                       11)
+    assert parse_site('HinfI', 'g^antc') == Enzyme('HinfI', 'GANTC', 1, 4)
+    for bad in ['GAATTC', 'G^AA^TTC', 'GAXTC^', '^', 'GG(1)']:
+        try:
+            parse_site('bad', bad)
+        except ValueError:
+            pass
+        else:
+            assert False, bad
+
+    with open('enzymes.txt') as fh:
+        enzymes = read_enzymes(fh)
+    assert Enzyme('EcoRI', 'GAATTC', 1, 5) in enzymes
+    assert len({enz.name for enz in enzymes}) == len(enzymes)
+
+
+# --------------------------------------------------
+def to_regex(site: str) -> str:
+    """ Regex for an IUPAC site, with a character class for each code """
+
+    return ''.join(bases if len(bases) == 1 else f'[{bases}]'
+                   for bases in map(IUPAC.__getitem__, site))
+
+
+# --------------------------------------------------
+def reverse_complement(site: str) -> str:
+    """ Reverse complement of an IUPAC site """
+
+    return site.translate(IUPAC_COMPLEMENT)[::-1]
+
+
+# --------------------------------------------------
+def compile_sites(enzymes: List[Enzyme]) -> List[Site]:
+    """
+    The site of every enzyme on both strands, or once if it is its own
+    reverse complement. Where the site is on the bottom strand, the top
+    strand is cut where the enzyme cuts its bottom strand, mirrored.
+    """
+
+    sites = []
+    for num, enz in enumerate(enzymes):
+        size = len(enz.site)
+        sites.append(
+            Site(num, enz.site, re.compile(to_regex(enz.site)), enz.top,
+                 enz.bottom))
+        if (revc := reverse_complement(enz.site)) != enz.site:
+            sites.append(
+                Site(num, revc, re.compile(to_regex(revc)),
+                     size - enz.bottom, size - enz.top))
+
+    return sites
+
+
+# --------------------------------------------------
+def expand(site: str) -> List[str]:
+    """ Every ACGT string matching an IUPAC site """
+
+    return [''.join(bases) for bases in product(*map(IUPAC.get, site))]
+
+
+# --------------------------------------------------
+def anchor(site: str) -> Tuple[int, int]:
+    """
+    Start and end of the part of a site that is least likely to match
+    random sequence with no more than MAX_EXPANSIONS expansions. A site
+    with a run of Ns is anchored on one side of it, as expanding the
+    whole site grows as 4^n.
+    """
+
+    best_count = len(IUPAC[site[0]])
+    best, best_chance = (0, 1), Fraction(best_count, 4)
+    for start in range(len(site)):
+        count = 1
+        for end in range(start + 1, len(site) + 1):
+            count *= len(IUPAC[site[end - 1]])
+            if count > MAX_EXPANSIONS:
+                break
+            chance = Fraction(count, 4**(end - start))
+            if (chance, count) < (best_chance, best_count):
+                best, best_chance, best_count = (start, end), chance, count
+
+    return best
+
+
+# --------------------------------------------------
+def test_anchor() -> None:
+    """ Test anchor, expand """
+
+    assert expand('GANTC') == ['GAATC', 'GACTC', 'GAGTC', 'GATTC']
+    assert anchor('GAATTC') == (0, 6)
+    assert anchor('GANTC') == (0, 5)
+    assert anchor('NGATC') == (1, 5)
+    assert anchor('GCCNNNNNGGC') in [(0, 3), (8, 11)]
+    assert anchor('GGCCNNNNNGGCC') in [(0, 4), (9, 13)]
+    assert anchor('N' * 10) == (0, 1)
+
+
+# --------------------------------------------------
+def build_automaton(enzymes: List[Enzyme]) -> Automaton:
+    """
+    One automaton for every expansion of the anchor of every site on
+    both strands
+    """
+
+    delta: List[List[int]] = [[0] * 5]
+    hits: List[List[Tuple[int, int, bool]]] = [[]]
+
+    def insert(pattern: str, hit: Tuple[int, int, bool]) -> None:
+        state = 0
+        for base in pattern:
+            code = BASES.index(base)
+            if not (nxt := delta[state][code]):
+                nxt = len(delta)
+                delta.append([0] * 5)
+                hits.append([])
+                delta[state][code] = nxt
+            state = nxt
+        hits[state].append(hit)
+
+    sites = compile_sites(enzymes)
+    for num, site in enumerate(sites):
+        start, end = anchor(site.pattern)
+        check = (start, end) != (0, len(site.pattern))
+        for pattern in expand(site.pattern[start:end]):
+            insert(pattern, (num, end, check))
+
+    # Breadth-first, filling in missing transitions from the failure
+    # links so that scanning never has to follow them
+    fail = [0] * len(delta)
+    queue: Deque[int] = deque()
+    for code in range(4):
+        if child := delta[0][code]:
+            queue.append(child)
+
+    while queue:
+        state = queue.popleft()
+        hits[state].extend(hits[fail[state]])
+        for code in range(4):
+            if child := delta[state][code]:
+                fail[child] = delta[fail[state]][code]
+                queue.append(child)
+            else:
+                delta[state][code] = delta[fail[state]][code]
+
+    return Automaton(delta, hits, sites)
+
+
+# --------------------------------------------------
+def find_cuts(automaton: Automaton, seq: str,
+              num_enzymes: int) -> List[Set[int]]:
+    """
+    Top-strand cut positions of each enzyme, as the number of bases
+    before the cut, in one pass over the sequence. Where only an anchor
+    of a site was found, the whole site is checked with its regex. Both
+    strands must be cut inside the sequence.
+    """
+
+    seq = seq.upper()
+    codes = seq.encode().translate(CODES)
+    delta, hits, sites = automaton
+    cuts: List[Set[int]] = [set() for _ in range(num_enzymes)]
+    length = len(seq)
+
+    state = 0
+    for pos, code in enumerate(codes, start=1):
+        state = delta[state][code]
+        if hits[state]:
+            for num, end, check in hits[state]:
+                site = sites[num]
+                start = pos - end
+                if check and (start < 0 or not site.regex.match(seq, start)):
+                    continue
+                if 0 < start + min(site.top, site.bottom) and \
+                        start + max(site.top, site.bottom) < length:
+                    cuts[site.num].add(start + site.top)
+
+    return cuts
+
+
+# Map A, C, G, T to 0-3 and every other byte to 4
+CODES = bytes(BASES.find(chr(byte)) % 5 for byte in range(256))
+
+
+# --------------------------------------------------
+def fragments(cuts: Set[int], length: int) -> List[int]:
+    """ Lengths of the pieces of a linear sequence """
+
+    bounds = [0] + sorted(cuts) + [length]
+    return [end - start for start, end in zip(bounds, bounds[1:])]
+
+
+# --------------------------------------------------
+def test_find_cuts() -> None:
+    """ Test find_cuts, fragments """
+
+    enzymes = [
+        Enzyme('EcoRI', 'GAATTC', 1, 5),
+        Enzyme('HinfI', 'GANTC', 1, 4),
+        Enzyme('BsaI', 'GGTCTC', 7, 11),
+        Enzyme('NotI', 'GCGGCCGC', 2, 6),
+    ]
+    automaton = build_automaton(enzymes)
+
+    #      0         1         2         3
+    #      0123456789012345678901234567890123456789
+    seq = 'AAGAATTCAAGGTCTCAAAAAAAGAGACCAANGACTCTT'
+    cuts = find_cuts(automaton, seq, len(enzymes))
+    assert cuts[0] == {3}
+    assert cuts[1] == {33}
+    assert cuts[2] == {17, 18}
+    assert cuts[3] == set()
+
+    assert fragments(cuts[0], len(seq)) == [3, 36]
+    assert fragments(cuts[2], len(seq)) == [17, 1, 21]
+    assert fragments(set(), 10) == [10]
+
+    # Same as checking the code of every base at every position
+    seq = 'GAATTCGACTCGAGTCGGAGACCGAATTCGGTCTCAGANTC' * 2
+    for num, enz in enumerate(enzymes):
+        expected = set()
+        size = len(enz.site)
+        strands = {enz.site: (enz.top, enz.bottom)}
+        strands.setdefault(reverse_complement(enz.site),
+                           (size - enz.bottom, size - enz.top))
+        for pattern, (top, bottom) in strands.items():
+            for start in range(len(seq) - size + 1):
+                if all(base in IUPAC[code] for base, code in zip(
+                        seq[start:start + size], pattern)) \
+                        and 0 < start + min(top, bottom) \
+                        and start + max(top, bottom) < len(seq):
+                    expected.add(start + top)
+        assert find_cuts(automaton, seq, len(enzymes))[num] == expected
+
+    # A site of many Ns is anchored on one side and checked whole
+    assert to_regex('GCNNNNNNNGC') == 'GC' + '[ACGT]' * 7 + 'GC'
+    many = build_automaton([Enzyme('SfiI', 'GGCCNNNNNGGCC', 8, 5)])
+    assert len(many.delta) < 10
+    assert find_cuts(many, 'AGGCCAAAAAGGCCA', 1) == [{9}]
+    assert find_cuts(many, 'AGGCCAAAAAAGGCCA', 1) == [set()]
+    assert find_cuts(many, 'GGCCAAAAAGGCCAAAAAGGCCA', 1) == [{8, 17}]
+    assert find_cuts(many, 'AGGCCAAAANGGCCA', 1) == [set()]
+
+
+# --------------------------------------------------
+def test_find_cuts_table() -> None:
+    """ The shipped table cuts where Bio.Restriction does """
+
+    with open('enzymes.txt') as fh:
+        enzymes = read_enzymes(fh)
+
+    rand = random.Random(1)
+    seq = ''.join(rand.choices('ACGT', k=20000))
+    cuts = find_cuts(build_automaton(enzymes), seq, len(enzymes))
+    for enz, found in zip(enzymes, cuts):
+        expected = getattr(Restriction, enz.name).search(Seq(seq),
+                                                         linear=True)
+        assert found == {pos - 1 for pos in expected}, enz.name
+
+
+WORKER: Dict[str, object] = {}
+
+
+# --------------------------------------------------
+def init_worker(enzymes: List[Enzyme]) -> None:
+    """ Build the automaton once per worker process """
+
+    WORKER['enzymes'] = enzymes
+    WORKER['automaton'] = build_automaton(enzymes)
+
+
+# --------------------------------------------------
+def digest_record(record: Tuple[str, str]) -> List[List[str]]:
+    """ One output row for each enzyme """
+
+    title, seq = record
+    rec_id = title.split(None, 1)[0] if title else ''
+    enzymes: List[Enzyme] = WORKER['enzymes']  # type: ignore
+    automaton: Automaton = WORKER['automaton']  # type: ignore
+
+    rows = []
+    for enz, cuts in zip(enzymes, find_cuts(automaton, seq, len(enzymes))):
+        rows.append([
+            rec_id, enz.name, enz.site,
+            str(len(cuts)), ','.join(map(str, sorted(cuts))),
+            ','.join(map(str, fragments(cuts, len(seq))))
+        ])
+
+    return rows
+
+
+# --------------------------------------------------
+def test_digest_record() -> None:
+    """ Test digest_record """
+
+    init_worker([
+        Enzyme('EcoRI', 'GAATTC', 1, 5),
+        Enzyme('NotI', 'GCGGCCGC', 2, 6)
+    ])
+    assert digest_record(('seq1 desc', 'AAGAATTCAA')) == [
+        ['seq1', 'EcoRI', 'GAATTC', '1', '3', '3,7'],
+        ['seq1', 'NotI', 'GCGGCCGC', '0', '', '10'],
+    ]
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
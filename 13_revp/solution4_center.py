@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+""" Locating Restriction Sites """
+
+import argparse
+from typing import Dict, List, NamedTuple, TextIO, Tuple
+from Bio import SeqIO, Seq
+
+# As Bio.Seq.reverse_complement, which leaves S, W, N and others as is
+COMPLEMENT = str.maketrans('ACGTUMRYKVHDBacgtumrykvhdb',
+                           'TGCAAKYRMBDHVtgcaakyrmbdhv')
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Locating Restriction Sites',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        help='Input FASTA file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'))
+
+    args = parser.parse_args()
+
+    return Args(args.file)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    for rec in SeqIO.parse(args.file, 'fasta'):
+        for pos, k in find_palindromes(str(rec.seq)):
+            print(pos, k)
+
+
+# --------------------------------------------------
+def find_palindromes(seq: str,
+                     min_len: int = 4,
+                     max_len: int = 12) -> List[Tuple[int, int]]:
+    """
+    (1-based position, length) of every reverse palindrome, ordered by
+    length and then position. Each center between two bases is extended
+    outward once while the bases on either side are complementary, as
+    is each base that is its own complement (S, W, N), which is the
+    center of the odd-length palindromes.
+    """
+
+    revc = seq.translate(COMPLEMENT)
+    found: Dict[int, List[int]] = {k: [] for k in range(min_len, max_len + 1)}
+
+    for center in range(1, len(seq)):
+        half = 0
+        reach = min(max_len // 2, center, len(seq) - center)
+        while half < reach and \
+                revc[center - 1 - half] == seq[center + half]:
+            half += 1
+
+        for size in range(max(1, (min_len + 1) // 2), half + 1):
+            found[2 * size].append(center - size + 1)
+
+    for center, base in enumerate(seq):
+        if revc[center] != base:
+            continue
+
+        half = 0
+        reach = min((max_len - 1) // 2, center, len(seq) - 1 - center)
+        while half < reach and \
+                revc[center - 1 - half] == seq[center + 1 + half]:
+            half += 1
+
+        for size in range(max(0, min_len // 2), half + 1):
+            found[2 * size + 1].append(center - size + 1)
+
+    return [(pos, k) for k, positions in found.items() for pos in positions]
+
+
+# --------------------------------------------------
+def test_find_palindromes() -> None:
+    """ Test find_palindromes """
+
+    assert find_palindromes('') == []
+    assert find_palindromes('CGCATGCATTGA') == [(3, 4), (5, 4), (2, 6),
+                                                (4, 6)]
+    assert find_palindromes('CCCGCATGCATT') == [(5, 4), (7, 4), (4, 6),
+                                                (6, 6)]
+    assert find_palindromes('GAATNATTCAAAAGCSGC') == [(3, 5), (14, 5),
+                                                      (2, 7), (1, 9)]
+    assert find_palindromes('GCSGC', 1, 3) == [(3, 1), (1, 2), (4, 2), (2, 3)]
+    assert find_palindromes('GAATTC', 2, 4) == [(3, 2), (2, 4)]
+    assert find_palindromes('GAATTC', 5, 12) == [(1, 6)]
+
+    # Same as comparing every k-mer with its reverse complement
+    seqs = ['TCAATGCATGCGGGTCTATATGCAT', 'AAAATTTTCCGGNNSSWWRYacgtTA',
+            'GGATCCGAATTCAAGCTTGCGGCCGC' * 3, 'AT', 'GAATNATTCAAAAGCSGC',
+            'ACGTSACGTWNCGAATTCGswnAGCT']
+    for seq in seqs:
+        expected = [(pos + 1, k) for k in range(4, 13)
+                    for pos in range(len(seq) - k + 1)
+                    if Seq.reverse_complement(seq[pos:pos + k]) ==
+                    seq[pos:pos + k]]
+        assert find_palindromes(seq) == expected, seq
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
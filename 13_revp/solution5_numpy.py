@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+""" Locating Restriction Sites """
+
+import argparse
+import sys
+from typing import Dict, Iterator, List, NamedTuple, TextIO, Tuple
+import numpy as np
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from solution3_revp import revp
+
+# As Bio.Seq.reverse_complement, which leaves S, W, N and others as is
+COMPLEMENT = np.arange(256, dtype=np.uint8)
+COMPLEMENT[np.frombuffer(b'ACGTUMRYKVHDBacgtumrykvhdb', dtype=np.uint8)] = \
+    np.frombuffer(b'TGCAAKYRMBDHVtgcaakyrmbdhv', dtype=np.uint8)
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+    chunk: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Locating Restriction Sites',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        help='Input FASTA file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'))
+
+    parser.add_argument('-c',
+                        '--chunk',
+                        help='Bases compared at a time',
+                        metavar='int',
+                        type=int,
+                        default=2**22)
+
+    args = parser.parse_args()
+
+    if args.chunk < 1:
+        parser.error(f'--chunk "{args.chunk}" must be > 0')
+
+    return Args(args.file, args.chunk)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    for _, seq in SimpleFastaParser(args.file):
+        for k, positions in find_palindromes(seq, chunk=args.chunk).items():
+            if len(positions):
+                suffix = f' {k}\n'
+                sys.stdout.write(suffix.join(map(str, positions)) + suffix)
+
+
+# --------------------------------------------------
+def find_palindromes(seq: str,
+                     min_len: int = 4,
+                     max_len: int = 12,
+                     chunk: int = 2**22) -> Dict[int, np.ndarray]:
+    """
+    1-based positions of the reverse palindromes of each length. The
+    sequence is compared in chunks that overlap by max_len - 1 bases,
+    so memory is bounded by the chunk size and not the sequence length.
+    """
+
+    bases = np.frombuffer(seq.encode(), dtype=np.uint8)
+    found: Dict[int, List[np.ndarray]] = {
+        k: []
+        for k in range(min_len, max_len + 1)
+    }
+
+    for start, window in chunks(bases, chunk, max_len - 1):
+        for k, starts in window_palindromes(window, min_len, max_len):
+            # Keep only the starts in this chunk, not the overlap
+            found[k].append(starts[starts < chunk] + start + 1)
+
+    return {
+        k: np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+        for k, parts in found.items()
+    }
+
+
+# --------------------------------------------------
+def chunks(bases: np.ndarray, size: int,
+           overlap: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """ Start and view of each chunk, extended by overlap bases """
+
+    for start in range(0, len(bases), size):
+        yield start, bases[start:start + size + overlap]
+
+
+# --------------------------------------------------
+def window_palindromes(window: np.ndarray, min_len: int,
+                       max_len: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    0-based starts of the reverse palindromes of each length in window.
+    half[c] stays true while the j bases either side of the point before
+    base c are complementary, so each longer length needs only one more
+    strided comparison. The odd lengths are found the same way around
+    each base that is its own complement (S, W, N).
+    """
+
+    size = len(window)
+    comp = COMPLEMENT[window]
+    half = np.ones(size + 1, dtype=bool)
+    for j in range(max_len // 2):
+        # Centers j + 1 .. size - j - 1 compare base c - 1 - j with c + j
+        stop = size - j
+        if stop <= j + 1:
+            break
+
+        matched = np.zeros(size + 1, dtype=bool)
+        matched[j + 1:stop] = half[j + 1:stop] & \
+            (comp[:size - 1 - 2 * j] == window[2 * j + 1:])
+        half = matched
+
+        if (k := 2 * (j + 1)) >= min_len:
+            yield k, np.flatnonzero(half) - (j + 1)
+
+    odd = comp == window
+    for j in range((max_len + 1) // 2):
+        # Centers j .. size - j - 1 compare base c - j with c + j
+        if j:
+            stop = size - j
+            if stop <= j:
+                break
+
+            matched = np.zeros(size, dtype=bool)
+            matched[j:stop] = odd[j:stop] & \
+                (comp[:size - 2 * j] == window[2 * j:])
+            odd = matched
+
+        if (k := 2 * j + 1) >= min_len:
+            yield k, np.flatnonzero(odd) - j
+
+
+# --------------------------------------------------
+def test_find_palindromes() -> None:
+    """ Test find_palindromes """
+
+    def as_lists(found: Dict[int, np.ndarray]) -> Dict[int, List[int]]:
+        return {k: list(pos) for k, pos in found.items() if len(pos)}
+
+    assert as_lists(find_palindromes('')) == {}
+    assert as_lists(find_palindromes('CGCATGCATTGA')) == {
+        4: [3, 5],
+        6: [2, 4]
+    }
+    assert as_lists(find_palindromes('GAATTC', 2, 4)) == {2: [3], 4: [2]}
+    assert as_lists(find_palindromes('GCSGC', 1, 5)) == {
+        1: [3],
+        2: [1, 4],
+        3: [2],
+        5: [1]
+    }
+
+    # Same as solution3_revp.py, which compares every k-mer with its
+    # reverse complement, for chunks shorter and longer than the
+    # palindromes, including odd lengths around S, W and N
+    seqs = ['TCAATGCATGCGGGTCTATATGCAT', 'AAAATTTTCCGGNNSSWWRYacgtTA',
+            'GGATCCGAATTCAAGCTTGCGGCCGC' * 3, 'AT', 'GAATNATTCAAAAGCSGC',
+            'ACGTSACGTWNCGAATTCGswnAGCT']
+    for seq in seqs:
+        expected = {
+            k: positions
+            for k in range(4, 13) if (positions := revp(seq, k))
+        }
+        for chunk in [1, 3, 7, 100, 2**22]:
+            assert as_lists(find_palindromes(seq, chunk=chunk)) == expected
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
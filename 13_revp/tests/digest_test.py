@@ -0,0 +1,127 @@
+""" Tests for digest.py """
+
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+
+PRG = './digest.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+INPUT = './tests/inputs/digest.fa'
+EMPTY = './tests/inputs/empty.fa'
+HEADER = ['record', 'enzyme', 'site', 'cuts', 'positions', 'fragments']
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Usage """
+
+    rv, out = getstatusoutput(RUN)
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_jobs() -> None:
+    """ Dies on bad --jobs """
+
+    rv, out = getstatusoutput(f'{RUN} -j 0 {INPUT}')
+    assert rv != 0
+    assert re.search('--jobs "0" must be > 0', out)
+
+
+# --------------------------------------------------
+def test_bad_name() -> None:
+    """ Dies on unknown enzyme """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {INPUT} -n EcoRI {bad}')
+    assert rv != 0
+    assert out == f'Unknown enzyme(s): {bad}'
+
+
+# --------------------------------------------------
+def test_bad_table() -> None:
+    """ Dies on a site without a cut """
+
+    table = random_string()
+    try:
+        with open(table, 'wt') as fh:
+            print('EcoRI G^AATTC\nBad GAATTC', file=fh)
+
+        rv, out = getstatusoutput(f'{RUN} {INPUT} -e {table}')
+        assert rv != 0
+        assert out == f'{table} line 2: cannot parse "Bad GAATTC"'
+    finally:
+        if os.path.isfile(table):
+            os.remove(table)
+
+
+# --------------------------------------------------
+def test_digest() -> None:
+    """ Reports cuts and fragments of each record """
+
+    rv, out = getstatusoutput(f'{RUN} {INPUT} -j 2 -n EcoRI BamHI BsaI')
+    assert rv == 0
+    rows = [line.split('\t') for line in out.splitlines()]
+    assert rows == [
+        HEADER,
+        ['seq1', 'EcoRI', 'GAATTC', '2', '3,23', '3,20,7'],
+        ['seq1', 'BamHI', 'GGATCC', '1', '13', '13,17'],
+        ['seq1', 'BsaI', 'GGTCTC', '0', '', '30'],
+        ['seq2', 'EcoRI', 'GAATTC', '0', '', '28'],
+        ['seq2', 'BamHI', 'GGATCC', '0', '', '28'],
+        ['seq2', 'BsaI', 'GGTCTC', '2', '9,15', '9,6,13'],
+        ['seq3', 'EcoRI', 'GAATTC', '0', '', '10'],
+        ['seq3', 'BamHI', 'GGATCC', '0', '', '10'],
+        ['seq3', 'BsaI', 'GGTCTC', '0', '', '10'],
+    ]
+
+
+# --------------------------------------------------
+def test_all_enzymes() -> None:
+    """ Uses every enzyme in the table by default """
+
+    outfile = random_string()
+    try:
+        rv, out = getstatusoutput(f'{RUN} {INPUT} {EMPTY} -o {outfile}')
+        assert rv == 0
+        assert out == ''
+        names = [
+            line.split()[0] for line in open('enzymes.txt')
+            if not line.startswith('#')
+        ]
+        rows = [line.split('\t') for line in open(outfile).read().splitlines()]
+        assert rows[0] == HEADER
+        assert [row[1] for row in rows[1:]] == names * 3
+    finally:
+        if os.path.isfile(outfile):
+            os.remove(outfile)
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """ Generate a random string """
+
+    k = random.randint(5, 10)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=k))
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+""" Call ORFs in large genomes or metagenomes in parallel """
+
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, TextIO, Tuple)
+from Bio.Data import CodonTable
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+from solution4_coords import Orf, Table, find_orfs, make_table, protein
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib'))
+from parallel import ordered  # noqa: E402 pylint: disable=C0413
+
+FORMATS = ['bed', 'gff']
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    files: List[TextIO]
+    fmt: str
+    proteins: Optional[TextIO]
+    min_len: int
+    nested: bool
+    table: int
+    alt_starts: bool
+    jobs: int
+    batch: int
+    outfile: TextIO
+
+
+class Settings(NamedTuple):
+    """ What each worker calls and prints """
+    table: Table
+    min_len: int
+    longest: bool
+    fmt: str
+    proteins: bool
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Call ORFs in large genomes or metagenomes in parallel',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('files',
+                        help='Input FASTA file(s)',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'),
+                        nargs='+')
+
+    parser.add_argument('-f',
+                        '--format',
+                        help='Output format',
+                        metavar='format',
+                        type=str,
+                        choices=FORMATS,
+                        default='bed')
+
+    parser.add_argument('-p',
+                        '--proteins',
+                        help='Also write the proteins to this FASTA file',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'))
+
+    parser.add_argument('-m',
+                        '--min_len',
+                        help='Minimum protein length',
+                        metavar='int',
+                        type=int,
+                        default=100)
+
+    parser.add_argument('-n',
+                        '--nested',
+                        help='Also call the ORFs from later starts before '
+                        'each stop',
+                        action='store_true')
+
+    parser.add_argument('-t',
+                        '--table',
+                        help='NCBI translation table',
+                        metavar='int',
+                        type=int,
+                        default=1)
+
+    parser.add_argument('-a',
+                        '--alt_starts',
+                        help='Also start at the other start codons of the '
+                        'table, e.g., GTG and TTG in table 11',
+                        action='store_true')
+
+    parser.add_argument('-j',
+                        '--jobs',
+                        help='Number of worker processes',
+                        metavar='int',
+                        type=int,
+                        default=multiprocessing.cpu_count())
+
+    parser.add_argument('-b',
+                        '--batch',
+                        help='Bases sent to a worker at a time',
+                        metavar='int',
+                        type=int,
+                        default=1000000)
+
+    parser.add_argument('-o',
+                        '--outfile',
+                        help='Output filename',
+                        metavar='FILE',
+                        type=argparse.FileType('wt'),
+                        default=sys.stdout)
+
+    args = parser.parse_args()
+
+    if args.min_len < 1:
+        parser.error(f'--min_len "{args.min_len}" must be > 0')
+
+    if args.table not in CodonTable.unambiguous_dna_by_id:
+        parser.error(f'--table "{args.table}" is not an NCBI table')
+
+    if args.jobs < 1:
+        parser.error(f'--jobs "{args.jobs}" must be > 0')
+
+    if args.batch < 1:
+        parser.error(f'--batch "{args.batch}" must be > 0')
+
+    return Args(files=args.files,
+                fmt=args.format,
+                proteins=args.proteins,
+                min_len=args.min_len,
+                nested=args.nested,
+                table=args.table,
+                alt_starts=args.alt_starts,
+                jobs=args.jobs,
+                batch=args.batch,
+                outfile=args.outfile)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    batches = batch_records(read_records(args.files), args.batch)
+    initargs = (args.table, args.alt_starts, args.min_len, not args.nested,
+                args.fmt, args.proteins is not None)
+
+    if args.fmt == 'gff':
+        print('##gff-version 3', file=args.outfile)
+
+    with multiprocessing.Pool(args.jobs,
+                              initializer=init_worker,
+                              initargs=initargs) as pool:
+        for features, proteins in ordered(pool, call_batch, batches,
+                                          2 * args.jobs):
+            args.outfile.write(features)
+            if args.proteins:
+                args.proteins.write(proteins)
+
+
+# --------------------------------------------------
+def read_records(files: List[TextIO]) -> Iterator[Tuple[str, str]]:
+    """ (ID, sequence) for every record in every file """
+
+    for fh in files:
+        for title, seq in SimpleFastaParser(fh):
+            yield (title.split(None, 1)[0] if title else ''), seq
+
+
+# --------------------------------------------------
+def batch_records(records: Iterable[Tuple[str, str]],
+                  size: int) -> Iterator[List[Tuple[str, str]]]:
+    """
+    Lists of records with about size bases, so that many small contigs
+    go to a worker together while a chromosome goes on its own
+    """
+
+    batch: List[Tuple[str, str]] = []
+    bases = 0
+    for rec in records:
+        batch.append(rec)
+        bases += len(rec[1])
+        if bases >= size:
+            yield batch
+            batch, bases = [], 0
+
+    if batch:
+        yield batch
+
+
+# --------------------------------------------------
+def test_batch_records() -> None:
+    """ Test batch_records """
+
+    recs = [('a', 'A' * 5), ('b', 'A' * 20), ('c', 'A'), ('d', 'A' * 3)]
+    assert [[rec_id for rec_id, _ in batch]
+            for batch in batch_records(recs, 10)] == [['a', 'b'],
+                                                      ['c', 'd']]
+    assert len(list(batch_records(recs, 1))) == 4
+    assert list(batch_records([], 10)) == []
+
+
+WORKER: Dict[str, Settings] = {}
+
+
+# --------------------------------------------------
+def init_worker(table_id: int, alt_starts: bool, min_len: int,
+                longest: bool, fmt: str, proteins: bool) -> None:
+    """ Build the translation table once per worker process """
+
+    WORKER['settings'] = Settings(make_table(table_id, alt_starts), min_len,
+                                  longest, fmt, proteins)
+
+
+# --------------------------------------------------
+def call_batch(batch: List[Tuple[str, str]]) -> Tuple[str, str]:
+    """ Formatted features and protein FASTA for a batch of records """
+
+    settings = WORKER['settings']
+    fmt = FORMATTERS[settings.fmt]
+    features, proteins = io.StringIO(), io.StringIO()
+    for rec_id, seq in batch:
+        orfs = find_orfs(seq, settings.min_len, settings.longest,
+                         settings.table)
+        for num, orf in enumerate(orfs, start=1):
+            name = f'{rec_id}_{num}'
+            features.write(fmt(rec_id, name, orf,
+                               (orf.end - orf.start) // 3 - 1))
+            if settings.proteins:
+                prot = protein(seq, orf, settings.table)
+                proteins.write(f'>{name} {rec_id}:{orf.start + 1}-'
+                               f'{orf.end}({strand(orf)})\n{prot}\n')
+
+    return features.getvalue(), proteins.getvalue()
+
+
+# --------------------------------------------------
+def strand(orf: Orf) -> str:
+    """ + or - """
+
+    return '+' if orf.frame > 0 else '-'
+
+
+# --------------------------------------------------
+def format_bed(rec_id: str, name: str, orf: Orf, length: int) -> str:
+    """ BED6 with the 0-based, half-open span """
+
+    return '\t'.join(
+        [rec_id, str(orf.start), str(orf.end), name, '0', strand(orf)]) + '\n'
+
+
+# --------------------------------------------------
+def format_gff(rec_id: str, name: str, orf: Orf, length: int) -> str:
+    """ GFF3 with the 1-based, closed span """
+
+    attrs = f'ID={name};frame={orf.frame:+d};length={length}'
+    return '\t'.join([
+        rec_id, 'call_orfs', 'ORF',
+        str(orf.start + 1), str(orf.end), '.', strand(orf), '0', attrs
+    ]) + '\n'
+
+
+FORMATTERS: Dict[str, Callable[[str, str, Orf, int], str]] = {
+    'bed': format_bed,
+    'gff': format_gff
+}
+
+
+# --------------------------------------------------
+def test_call_batch() -> None:
+    """ Test call_batch """
+
+    #                0         1         2
+    #                012345678901234567890123456
+    batch = [('r1', 'ATGAAATAGCCCTTACATCATCTACAT'), ('r2', 'CCC')]
+
+    init_worker(1, False, 2, True, 'bed', True)
+    assert call_batch(batch) == ('r1\t0\t9\tr1_1\t0\t+\n'
+                                 'r1\t12\t21\tr1_2\t0\t-\n',
+                                 '>r1_1 r1:1-9(+)\nMK\n'
+                                 '>r1_2 r1:13-21(-)\nMM\n')
+
+    init_worker(1, False, 1, False, 'gff', False)
+    features, proteins = call_batch(batch)
+    assert proteins == ''
+    assert features.splitlines()[2] == ('r1\tcall_orfs\tORF\t13\t21\t.\t-\t0'
+                                        '\tID=r1_3;frame=-1;length=2')
+    assert len(features.splitlines()) == 4
+
+    # Table 11 also starts at GTG and TTG, and the stops are its own
+    init_worker(11, True, 1, False, 'bed', True)
+    assert call_batch([('r3', 'GTGAAATTGCCCTAR')])[1] == (
+        '>r3_1 r3:1-15(+)\nMKLP\n>r3_2 r3:7-15(+)\nMP\n')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
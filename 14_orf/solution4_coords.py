@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+""" Open Reading Frames """
+
+import argparse
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterator, List, NamedTuple, Pattern, TextIO, Tuple
+from Bio import Seq
+from Bio.Data import CodonTable
+from Bio.SeqIO.FastaIO import SimpleFastaParser
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    file: TextIO
+    min_len: int
+    longest: bool
+    coords: bool
+
+
+class Table(NamedTuple):
+    """
+    An NCBI translation table and patterns for its start and stop
+    codons, including the ambiguous codons that can only be a stop,
+    e.g., TAR
+    """
+    id: int
+    codons: Dict[str, str]
+    start: Pattern
+    stop: Pattern
+
+
+class Orf(NamedTuple):
+    """
+    Frame 1-3 on the forward strand or -1 to -3 on the reverse, and the
+    0-based, half-open span on the forward strand including the stop
+    """
+    frame: int
+    start: int
+    end: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """ Get command-line arguments """
+
+    parser = argparse.ArgumentParser(
+        description='Open Reading Frames',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        help='Input FASTA file',
+                        metavar='FILE',
+                        type=argparse.FileType('rt'))
+
+    parser.add_argument('-m',
+                        '--min_len',
+                        help='Minimum protein length',
+                        metavar='int',
+                        type=int,
+                        default=1)
+
+    parser.add_argument('-l',
+                        '--longest',
+                        help='Only the longest ORF ending at each stop',
+                        action='store_true')
+
+    parser.add_argument('-c',
+                        '--coords',
+                        help='Print the frame, start and end of each ORF',
+                        action='store_true')
+
+    args = parser.parse_args()
+
+    if args.min_len < 1:
+        parser.error(f'--min_len "{args.min_len}" must be > 0')
+
+    return Args(args.file, args.min_len, args.longest, args.coords)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    for rec_id, seq in SimpleFastaParser(args.file):
+        orfs = find_orfs(seq, args.min_len, args.longest)
+        if args.coords:
+            rec_id = rec_id.split(None, 1)[0] if rec_id else ''
+            for orf in orfs:
+                prot = protein(seq, orf)
+                print('\t'.join(map(str, [rec_id, *orf, prot])))
+        else:
+            print('\n'.join(sorted({protein(seq, orf) for orf in orfs})))
+
+
+# --------------------------------------------------
+def make_table(table_id: int = 1, alt_starts: bool = False) -> Table:
+    """
+    Build an NCBI table, raising KeyError if there is no such table.
+    ORFs start only at ATG unless alt_starts, when any of the table's
+    start codons may begin one, e.g., GTG and TTG in table 11.
+    """
+
+    table = CodonTable.unambiguous_dna_by_id[table_id]
+    ambiguous = CodonTable.ambiguous_dna_by_id[table_id]
+    codons = {
+        **table.forward_table,
+        **dict.fromkeys(table.stop_codons, '*')
+    }
+    starts = ambiguous.start_codons if alt_starts else ['ATG']
+    return Table(table_id, codons, lookahead(starts),
+                 lookahead(ambiguous.stop_codons))
+
+
+# --------------------------------------------------
+def lookahead(codons: List[str]) -> Pattern:
+    """ Pattern for every position where one of the codons begins """
+
+    return re.compile('(?=' + '|'.join(sorted(codons)) + ')')
+
+
+STANDARD = make_table()
+
+
+# --------------------------------------------------
+def find_orfs(seq: str,
+              min_len: int = 1,
+              longest: bool = False,
+              table: Table = STANDARD) -> Iterator[Orf]:
+    """
+    ORFs of at least min_len amino acids in all six frames. Nothing is
+    translated, so a caller that needs only the coordinates or lengths
+    never pays for the proteins.
+    """
+
+    seq = seq.upper()
+    length = len(seq)
+    for strand, dna in [(1, seq), (-1, Seq.reverse_complement(seq))]:
+        starts, stops = find_codons(dna, table)
+        for offset in range(3):
+            frame = strand * (offset + 1)
+            for stop, mets in find_spans(starts[offset], stops[offset],
+                                         min_len, longest):
+                for met in mets:
+                    begin, end = met, stop + 3
+                    if strand < 0:
+                        begin, end = length - end, length - begin
+                    yield Orf(frame, begin, end)
+
+
+# --------------------------------------------------
+def protein(seq: str, orf: Orf, table: Table = STANDARD) -> str:
+    """
+    Translate the span of an ORF on its own strand, without the stop.
+    Every protein begins with M, as the initiator tRNA reads any start
+    codon as methionine.
+    """
+
+    dna = seq[orf.start:orf.end].upper()
+    if orf.frame < 0:
+        dna = Seq.reverse_complement(dna)
+    return 'M' + translate(dna, 3, len(dna) - 3, table)
+
+
+# --------------------------------------------------
+def find_codons(
+        dna: str,
+        table: Table = STANDARD) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Positions of the start and stop codons in each of the three frames
+    of one strand, each found in a single scan
+    """
+
+    starts: List[List[int]] = [[], [], []]
+    stops: List[List[int]] = [[], [], []]
+    for match in table.start.finditer(dna):
+        pos = match.start()
+        starts[pos % 3].append(pos)
+    for match in table.stop.finditer(dna):
+        pos = match.start()
+        stops[pos % 3].append(pos)
+
+    return starts, stops
+
+
+# --------------------------------------------------
+def translate(dna: str, start: int, stop: int,
+              table: Table = STANDARD) -> str:
+    """ Translate the codons from start up to stop """
+
+    codons = table.codons
+    return ''.join([
+        codons.get(codon) or translate_codon(codon, table.id)
+        for codon in (dna[i:i + 3] for i in range(start, stop, 3))
+    ])
+
+
+# --------------------------------------------------
+@lru_cache(maxsize=None)
+def translate_codon(codon: str, table_id: int) -> str:
+    """ Any other codon, e.g., with ambiguous bases, as Bio.Seq does """
+
+    return str(Seq.translate(codon, table=table_id))
+
+
+# --------------------------------------------------
+def find_spans(starts: List[int],
+               stops: List[int],
+               min_len: int = 1,
+               longest: bool = False) -> Iterator[Tuple[int, List[int]]]:
+    """
+    Each stop in a frame and the starts since the one before that are
+    at least min_len codons upstream, walking both lists once
+    """
+
+    i = 0
+    for stop in stops:
+        first = i
+        while i < len(starts) and starts[i] < stop:
+            i += 1
+        last = bisect_right(starts, stop - 3 * min_len, first, i)
+        if last > first:
+            yield stop, starts[first:first + 1 if longest else last]
+
+
+# --------------------------------------------------
+def test_find_spans() -> None:
+    """ Test find_codons, find_spans """
+
+    codons = {'M': 'ATG', 'A': 'GCC', 'P': 'CCC', 'R': 'CGC', '*': 'TAA'}
+
+    def orfs(aa: str, min_len: int = 1, longest: bool = False) -> List[str]:
+        starts, stops = find_codons(''.join(map(codons.get, aa)))
+        return [aa[met // 3:stop // 3] for stop, mets in
+                find_spans(starts[0], stops[0], min_len, longest)
+                for met in mets]
+
+    assert orfs('') == []
+    assert orfs('M') == []
+    assert orfs('*') == []
+    assert orfs('M*') == ['M']
+    assert orfs('MAMAPR*') == ['MAMAPR', 'MAPR']
+    assert orfs('MAMAPR*M') == ['MAMAPR', 'MAPR']
+    assert orfs('MAMAPR*MP*') == ['MAMAPR', 'MAPR', 'MP']
+    assert orfs('MAMAPR*MP*', min_len=4) == ['MAMAPR', 'MAPR']
+    assert orfs('MAMAPR*MP*', longest=True) == ['MAMAPR', 'MP']
+    assert orfs('MAMAPR*MP*', 3, True) == ['MAMAPR']
+
+    assert find_codons('ATGATAAATGA') == ([[0], [7], []], [[], [1, 4], [8]])
+
+
+# --------------------------------------------------
+def test_find_orfs() -> None:
+    """ Test find_orfs """
+
+    #      0         1         2
+    #      012345678901234567890123456
+    seq = 'ATGAAATAGCCCTTACATCATCTACAT'
+    assert list(find_orfs(seq)) == [
+        Orf(1, 0, 9), Orf(-1, 21, 27), Orf(-1, 12, 21), Orf(-1, 12, 18)
+    ]
+    assert [protein(seq, orf) for orf in find_orfs(seq)] == [
+        'MK', 'M', 'MM', 'M'
+    ]
+    assert list(find_orfs(seq, 2)) == [Orf(1, 0, 9), Orf(-1, 12, 21)]
+    assert list(find_orfs(seq, longest=True)) == [
+        Orf(1, 0, 9), Orf(-1, 21, 27), Orf(-1, 12, 21)
+    ]
+
+    def proteins(seq: str, table: Table = STANDARD) -> List[str]:
+        return [
+            protein(seq, orf, table) for orf in find_orfs(seq, table=table)
+        ]
+
+    # Ambiguous codons translate as Bio.Seq does
+    assert list(find_orfs('atggcngcyNNNtag')) == [Orf(1, 0, 15)]
+    assert proteins('atggcngcyNNNtag') == ['MAAX']
+    assert translate('GCNTAR', 0, 6) == Seq.translate('GCNTAR') == 'A*'
+
+    # Ambiguous codons that translate to * are stops
+    assert proteins('ATGGCCTARGCCTAACCC') == ['MA']
+    assert proteins('ATGAAATRAGGG') == ['MK']
+
+    # Mycoplasma read TGA as W
+    seq = 'ATGTGAAAATAA'
+    assert proteins(seq) == ['M']
+    assert proteins(seq, make_table(4)) == ['MWK']
+
+    # Bacteria may also start at GTG and TTG, which then read as M
+    seq = 'GTGAAATTGCCCTAA'
+    assert list(find_orfs(seq, table=make_table(11))) == []
+    assert list(find_orfs(seq, table=make_table(11, True))) == [
+        Orf(1, 0, 15), Orf(1, 6, 15)
+    ]
+    assert proteins(seq, make_table(11, True)) == ['MKLP', 'MP']
+
+    # The spans translate to the proteins on their own strand
+    seq = 'AGCCATGTAGCTAACTCAGGTTACATGGGGATGACCCCGCGACTTGGATTAGAGTCTC' \
+        'TTTTGGAATAAGCCTGAATGATCCGAGTAGCATCTCAG'
+    found = [(orf, protein(seq, orf)) for orf in find_orfs(seq)]
+    assert {prot for _, prot in found} == {
+        'M', 'MGMTPRLGLESLLE', 'MLLGSFRLIPKETLIQVAGSSPCNLS', 'MTPRLGLESLLE'
+    }
+    for orf, prot in found:
+        dna = seq[orf.start:orf.end]
+        if orf.frame < 0:
+            dna = Seq.reverse_complement(dna)
+        assert Seq.translate(dna) == prot + '*'
+        assert (orf.start if orf.frame > 0 else len(seq) - orf.end) % 3 == \
+            abs(orf.frame) - 1
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
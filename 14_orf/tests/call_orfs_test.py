@@ -0,0 +1,134 @@
+""" Tests for call_orfs.py """
+
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+
+PRG = './call_orfs.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+INPUT1 = './tests/inputs/1.fa'
+INPUT2 = './tests/inputs/2.fa'
+INPUT3 = './tests/inputs/3.fa'
+EMPTY = './tests/inputs/empty.fa'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Usage """
+
+    rv, out = getstatusoutput(RUN)
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_values() -> None:
+    """ Dies on bad numbers """
+
+    for opt, val, msg in [('-m', '0', '--min_len "0" must be > 0'),
+                          ('-t', '7', '--table "7" is not an NCBI table'),
+                          ('-j', '0', '--jobs "0" must be > 0'),
+                          ('-b', '0', '--batch "0" must be > 0')]:
+        rv, out = getstatusoutput(f'{RUN} {opt} {val} {INPUT1}')
+        assert rv != 0
+        assert re.search(msg, out)
+
+
+# --------------------------------------------------
+def test_empty_file() -> None:
+    """ Prints nothing on empty file """
+
+    rv, out = getstatusoutput(f'{RUN} {EMPTY}')
+    assert rv == 0
+    assert out == ''
+
+
+# --------------------------------------------------
+def test_proteins() -> None:
+    """ Finds the same proteins as orf.py """
+
+    for file in [INPUT1, INPUT2, INPUT3]:
+        proteins = random_string()
+        try:
+            rv, out = getstatusoutput(
+                f'{RUN} -m 1 -n -p {proteins} {file}')
+            assert rv == 0
+            lines = open(proteins).read().splitlines()
+            assert len(lines) == 2 * len(out.splitlines())
+            expected = set(open(file + '.out').read().splitlines())
+            assert set(lines[1::2]) == expected
+        finally:
+            if os.path.isfile(proteins):
+                os.remove(proteins)
+
+
+# --------------------------------------------------
+def test_bed() -> None:
+    """ BED in input order no matter how the work is split """
+
+    inputs = f'{INPUT2} {INPUT3} {INPUT1}'
+    rv, expected = getstatusoutput(f'{RUN} -m 10 -j 1 {inputs}')
+    assert rv == 0
+
+    rows = [line.split('\t') for line in expected.splitlines()]
+    assert rows[-1] == [
+        'Rosalind_99', '10', '91', 'Rosalind_99_2', '0', '-'
+    ]
+    records = [row[0] for row in rows]
+    assert sorted(set(records), key=records.index) == [
+        'Rosalind_2116', 'Rosalind_4620', 'Rosalind_99'
+    ]
+
+    rv, out = getstatusoutput(f'{RUN} -m 10 -j 3 -b 1 {inputs}')
+    assert rv == 0
+    assert out == expected
+
+
+# --------------------------------------------------
+def test_gff() -> None:
+    """ GFF3 """
+
+    outfile = random_string()
+    try:
+        rv, out = getstatusoutput(f'{RUN} -f gff -m 5 -o {outfile} {INPUT1}')
+        assert rv == 0
+        assert out == ''
+        assert open(outfile).read().splitlines() == [
+            '##gff-version 3',
+            'Rosalind_99\tcall_orfs\tORF\t25\t69\t.\t+\t0\t'
+            'ID=Rosalind_99_1;frame=+1;length=14',
+            'Rosalind_99\tcall_orfs\tORF\t11\t91\t.\t-\t0\t'
+            'ID=Rosalind_99_2;frame=-3;length=26',
+        ]
+    finally:
+        if os.path.isfile(outfile):
+            os.remove(outfile)
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """ Generate a random string """
+
+    k = random.randint(5, 10)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=k))
@@ -12,6 +12,7 @@ RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
 INPUT1 = './tests/inputs/1.fa'
 INPUT2 = './tests/inputs/2.fa'
 INPUT3 = './tests/inputs/3.fa'
+INPUT4 = './tests/inputs/4.fa'
 EMPTY = './tests/inputs/empty.fa'
 
 
@@ -84,6 +85,13 @@ def test_ok3() -> None:
     run(INPUT3)
 
 
+# --------------------------------------------------
+def test_ambiguous_stops() -> None:
+    """ Ambiguous codons that can only be stops end an ORF """
+
+    run(INPUT4)
+
+
 # --------------------------------------------------
 def random_string() -> str:
     """ Generate a random string """
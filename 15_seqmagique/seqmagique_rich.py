@@ -2,17 +2,31 @@
 """ Mimic seqmagick, print stats on FASTA sequences """
 
 import argparse
+import io
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from functools import partial
+from typing import BinaryIO, Iterable, List, NamedTuple, Optional, Tuple
 import numpy as np
-from typing import List, NamedTuple, TextIO
 from rich.console import Console
 from rich.progress import track
 from rich.table import Table, Column
-from Bio import SeqIO
+from solution2_bytes import BLOCK_SIZE, SPACE, byte_counts, seq_lengths
+
+# Histogram bins include the lower bound and not the upper
+EDGES = [100, 1000, 10**4, 10**5, 10**6]
+BINS = ['0-99', '100-999', '1K-10K', '10K-100K', '100K-1M', '1M+']
 
 
 class Args(NamedTuple):
     """ Command-line arguments """
-    file: List[TextIO]
+    files: List[str]
+    jobs: int
+    shard_size: int
+    extended: bool
+    quiet: bool
 
 
 class FastaInfo(NamedTuple):
@@ -20,27 +34,114 @@ class FastaInfo(NamedTuple):
     filename: str
     min_len: int
     max_len: int
-    avg_len: int
+    avg_len: float
     num_seqs: int
 
 
+class Shard(NamedTuple):
+    """ A byte range of a file """
+    filename: str
+    start: int
+    stop: int
+
+
+class Piece(NamedTuple):
+    """
+    Bases of a shard that may belong to a sequence from an earlier shard
+    and, for the extended stats, the count of each byte value
+    """
+    bases: int
+    counts: Optional[np.ndarray] = None
+
+
+class Tally(NamedTuple):
+    """
+    Totals of the lengths of the sequences that start and end in a shard
+    and, for the extended stats, the lengths and the count of each byte
+    value. lead is the rest of the line the shard starts in the middle
+    of, which is a header or bases, and head runs from the next line to
+    the first header, or is None if there is no next line. tail is the
+    bases after the last header, or None if there is no header, and
+    in_header is whether the shard ends in a header line, or None if it
+    has no line of its own.
+    """
+    num_seqs: int
+    total: int
+    min_len: int
+    max_len: int
+    lengths: Optional[np.ndarray] = None
+    counts: Optional[np.ndarray] = None
+    lead: Piece = Piece(0)
+    head: Optional[Piece] = None
+    tail: Optional[int] = None
+    in_header: Optional[bool] = None
+
+
+class Assembly(NamedTuple):
+    """ Assembly statistics """
+    total_len: int
+    n50: int
+    l50: int
+    n90: int
+    gc_pct: float
+    num_ns: int
+    histogram: List[int]
+
+
 # --------------------------------------------------
 def get_args() -> Args:
     """Get command-line arguments"""
 
     parser = argparse.ArgumentParser(
-        description='Argparse Python script',
+        description='Mimic seqmagick, print stats on FASTA sequences',
         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 
-    parser.add_argument('file',
+    parser.add_argument('files',
                         metavar='FILE',
-                        type=argparse.FileType('rt'),
+                        type=str,
                         nargs='+',
                         help='Input file(s)')
 
+    parser.add_argument('-j',
+                        '--jobs',
+                        help='Number of worker processes',
+                        metavar='int',
+                        type=int,
+                        default=multiprocessing.cpu_count())
+
+    parser.add_argument('-s',
+                        '--shard_size',
+                        help='Bytes of a large file read by one worker',
+                        metavar='int',
+                        type=int,
+                        default=2**26)
+
+    parser.add_argument('-x',
+                        '--extended',
+                        help='Also show the total bases, N50, L50, N90, GC, '
+                        'Ns and a histogram of the lengths',
+                        action='store_true')
+
+    parser.add_argument('-q',
+                        '--quiet',
+                        help='Do not show progress',
+                        action='store_true')
+
     args = parser.parse_args()
 
-    return Args(args.file)
+    # Only opened by the workers, so thousands of files are not held open
+    for filename in args.files:
+        if not os.path.isfile(filename):
+            parser.error(f"No such file or directory: '{filename}'")
+
+    if args.jobs < 1:
+        parser.error(f'--jobs "{args.jobs}" must be > 0')
+
+    if args.shard_size < 1:
+        parser.error(f'--shard_size "{args.shard_size}" must be > 0')
+
+    return Args(args.files, args.jobs, args.shard_size, args.extended,
+                args.quiet)
 
 
 # --------------------------------------------------
@@ -48,38 +149,369 @@ def main() -> None:
     """ Make a jazz noise here """
 
     args = get_args()
-    table = Table('Name',
-                  Column(header='Min. Len', justify='right'),
-                  Column(header='Max. Len', justify='right'),
-                  Column(header='Avg. Len', justify='right'),
-                  Column(header='Num. Seqs', justify='right'),
+    headers = ['Min. Len', 'Max. Len', 'Avg. Len', 'Num. Seqs']
+    if args.extended:
+        headers += ['Total', 'N50', 'L50', 'N90', 'GC %', 'Ns']
+    table = Table(Column(header='Name', overflow='fold'),
+                  *[Column(header=hdr, justify='right') for hdr in headers],
                   header_style="bold black")
+    histogram = Table(Column(header='Name', overflow='fold'),
+                      *[Column(header=hdr, justify='right') for hdr in BINS],
+                      title='Sequences by length',
+                      header_style="bold black")
 
-    for fh in track(args.file):
-        file = process(fh)
-        table.add_row(file.filename, str(file.min_len), str(file.max_len),
-                      str(file.avg_len), str(file.num_seqs))
+    # Results come back in the order of the shards, and a file's row is
+    # added once all of its shards are in
+    file_shards = [shards(file, args.shard_size) for file in args.files]
+    tasks = [shard for each in file_shards for shard in each]
+    pending = deque(zip(args.files, map(len, file_shards)))
+    tallies: List[Tally] = []
+    with multiprocessing.Pool(args.jobs) as pool:
+        for tally in track(pool.imap(partial(scan, extended=args.extended),
+                                     tasks),
+                           total=len(tasks),
+                           console=Console(stderr=True),
+                           disable=args.quiet):
+            tallies.append(tally)
+            filename, num_shards = pending[0]
+            if len(tallies) == num_shards:
+                joined = stitch(tallies)
+                file = summarize(filename, joined)
+                row = [
+                    str(file.min_len),
+                    str(file.max_len), f'{file.avg_len:.2f}',
+                    str(file.num_seqs)
+                ]
+                if args.extended:
+                    stats = assemble(joined)
+                    row += [
+                        str(stats.total_len),
+                        str(stats.n50),
+                        str(stats.l50),
+                        str(stats.n90), f'{stats.gc_pct:.2f}',
+                        str(stats.num_ns)
+                    ]
+                    histogram.add_row(filename, *map(str, stats.histogram))
+                table.add_row(filename, *row)
+                pending.popleft()
+                tallies = []
 
     console = Console()
     console.print(table)
+    if args.extended:
+        console.print(histogram)
+
+
+# --------------------------------------------------
+def shards(filename: str, size: int) -> List[Shard]:
+    """ Split a file into byte ranges of size, or one if it is empty """
+
+    length = os.path.getsize(filename)
+    return [
+        Shard(filename, start, min(start + size, length))
+        for start in range(0, max(length, 1), size)
+    ]
+
+
+# --------------------------------------------------
+def scan(shard: Shard, extended: bool = False) -> Tally:
+    """
+    Lengths of the sequences in the shard, reading none of the bytes of
+    the file outside it, so one long sequence is split among workers
+    """
+
+    counts = np.zeros(256, dtype=np.int64) if extended else None
+    size = shard.stop - shard.start
+    with open(shard.filename, 'rb') as fh:
+        at_line_start = True
+        if shard.start:
+            fh.seek(shard.start - 1)
+            at_line_start = fh.read(1) == b'\n'
+
+        lead, head, first = leading(fh, size, at_line_start, extended)
+        if first is None:
+            return Tally(0, 0, 0, 0,
+                         compact([]) if extended else None,
+                         counts, lead, head, None,
+                         None if head is None else False)
+
+        fh.seek(shard.start + first)
+        parts = [
+            compact(lengths) for lengths in seq_lengths(
+                fh, limit=size - first, counts=counts)
+        ]
+        in_header = ends_in_header(fh, shard.start + first, shard.stop)
+
+    # The last sequence may go on into the next shard
+    lengths = np.concatenate(parts)
+    lengths, tail = lengths[:-1], int(lengths[-1])
+    found = len(lengths) > 0
+    return Tally(num_seqs=len(lengths),
+                 total=int(lengths.sum(dtype=np.int64)),
+                 min_len=int(lengths.min()) if found else 0,
+                 max_len=int(lengths.max()) if found else 0,
+                 lengths=lengths if extended else None,
+                 counts=counts,
+                 lead=lead,
+                 head=head,
+                 tail=tail,
+                 in_header=in_header)
+
+
+# --------------------------------------------------
+def leading(fh: BinaryIO, size: int, at_line_start: bool,
+            extended: bool) -> Tuple[Piece, Optional[Piece], Optional[int]]:
+    """
+    The lead and head of a shard of size bytes from the position of fh,
+    and the offset of its first header, if any
+    """
+
+    pieces: List[List] = [[0, None], [0, None]]
+    if extended:
+        pieces = [[0, np.zeros(256, dtype=np.int64)] for _ in pieces]
+
+    def add(part: int, data: bytes) -> None:
+        arr = np.frombuffer(data, dtype=np.uint8)
+        pieces[part][0] += int(np.count_nonzero(arr > SPACE))
+        if extended:
+            pieces[part][1] += byte_counts(arr)
+
+    part = 1 if at_line_start else 0
+    after_newline = at_line_start
+    offset = 0
+    while block := fh.read(min(BLOCK_SIZE, size - offset)):
+        # A header starts with ">" after a newline
+        if after_newline and block.startswith(b'>'):
+            header = 0
+        else:
+            header = block.find(b'\n>') + 1 or len(block)
+
+        data = block[:header]
+        if part == 0 and (newline := data.find(b'\n')) >= 0:
+            add(0, data[:newline + 1])
+            data, part = data[newline + 1:], 1
+        add(part, data)
+
+        if header < len(block):
+            return Piece(*pieces[0]), Piece(*pieces[1]), offset + header
+
+        after_newline = block.endswith(b'\n')
+        offset += len(block)
+
+    return Piece(*pieces[0]), Piece(*pieces[1]) if part else None, None
 
 
 # --------------------------------------------------
-def process(fh: TextIO) -> FastaInfo:
-    """ Process a file """
-
-    if lengths := [len(rec.seq) for rec in SeqIO.parse(fh, 'fasta')]:
-        return FastaInfo(filename=fh.name,
-                         min_len=min(lengths),
-                         max_len=max(lengths),
-                         avg_len=round(np.mean(lengths), 2),
-                         num_seqs=len(lengths))
-
-    return FastaInfo(filename=fh.name,
-                     min_len=0,
-                     max_len=0,
-                     avg_len=0,
-                     num_seqs=0)
+def ends_in_header(fh: BinaryIO, header: int, stop: int) -> bool:
+    """
+    Whether the last line before stop is a header, looking back no
+    further than the header that starts at that offset
+    """
+
+    end = stop
+    while end > header:
+        start = max(header, end - BLOCK_SIZE)
+        fh.seek(start)
+        if (newline := fh.read(end - start).rfind(b'\n')) >= 0:
+            line = start + newline + 1
+            fh.seek(line)
+            return line < stop and fh.read(1) == b'>'
+        end = start
+
+    return True
+
+
+# --------------------------------------------------
+def compact(lengths: Iterable[int]) -> np.ndarray:
+    """
+    Lengths as 32-bit integers to halve their memory, unless one needs
+    64 bits, e.g., a sequence of more than 4Gb joined across shards.
+    Sums of the lengths are always taken as 64-bit integers.
+    """
+
+    arr = np.asarray(lengths, dtype=np.int64)
+    return arr if len(arr) and arr.max() >= 2**32 else arr.astype(np.uint32)
+
+
+# --------------------------------------------------
+def stitch(tallies: List[Tally]) -> Tally:
+    """
+    Combine the tallies of the shards of a file in order, joining the
+    pieces of each sequence that runs from one shard into the next
+    """
+
+    extended = tallies[0].counts is not None
+    counts = np.zeros(256, dtype=np.int64) if extended else None
+    joined: List[int] = []
+    length: Optional[int] = None  # Of the sequence that is still open
+    in_header = False
+    for tally in tallies:
+        pieces = [] if in_header else [tally.lead]
+        if tally.head is not None:
+            pieces.append(tally.head)
+        if length is not None:
+            for piece in pieces:
+                length += piece.bases
+                if counts is not None:
+                    counts += piece.counts
+
+        if tally.tail is not None:
+            if length is not None:
+                joined.append(length)
+            length = tally.tail
+
+        if tally.in_header is not None:
+            in_header = tally.in_header
+        if counts is not None:
+            counts += tally.counts
+
+    if length is not None:
+        joined.append(length)
+
+    found = [tally for tally in tallies if tally.num_seqs]
+    mins = [tally.min_len for tally in found] + joined
+    maxes = [tally.max_len for tally in found] + joined
+    lengths = None
+    if extended:
+        lengths = np.concatenate([t.lengths for t in tallies] +
+                                 [compact(joined)])
+
+    return Tally(num_seqs=sum(t.num_seqs for t in found) + len(joined),
+                 total=sum(t.total for t in found) + sum(joined),
+                 min_len=min(mins, default=0),
+                 max_len=max(maxes, default=0),
+                 lengths=lengths,
+                 counts=counts)
+
+
+# --------------------------------------------------
+def summarize(filename: str, tally: Tally) -> FastaInfo:
+    """ File information from the tally of a whole file """
+
+    num_seqs = tally.num_seqs
+    return FastaInfo(filename=filename,
+                     min_len=tally.min_len,
+                     max_len=tally.max_len,
+                     avg_len=round(tally.total / num_seqs, 2)
+                     if num_seqs else 0.,
+                     num_seqs=num_seqs)
+
+
+# --------------------------------------------------
+def assemble(tally: Tally) -> Assembly:
+    """
+    Assembly statistics of the tally of a whole file made with extended,
+    sorting all the lengths once
+    """
+
+    lengths = np.sort(tally.lengths)
+    counts = tally.counts
+    total_len = int(lengths.sum(dtype=np.int64))
+
+    # Covered by the longest sequences, from the longest down
+    covered = np.cumsum(lengths[::-1], dtype=np.int64)
+
+    def nx(pct: int) -> int:
+        """ Index of the shortest of the longest sequences with pct % """
+        return int(np.searchsorted(covered, -(-total_len * pct // 100)))
+
+    def bases(letters: bytes) -> int:
+        """ Count of the letters in either case """
+        return int(counts[list(letters + letters.lower())].sum())
+
+    acgt = bases(b'ACGT')
+    return Assembly(
+        total_len=total_len,
+        n50=int(lengths[::-1][nx(50)]) if total_len else 0,
+        l50=nx(50) + 1 if total_len else 0,
+        n90=int(lengths[::-1][nx(90)]) if total_len else 0,
+        gc_pct=round(100 * bases(b'GC') / acgt, 2) if acgt else 0.,
+        num_ns=bases(b'N'),
+        histogram=np.diff(
+            np.append(np.searchsorted(lengths, [0, *EDGES]),
+                      len(lengths))).tolist())
+
+
+# --------------------------------------------------
+def test_scan() -> None:
+    """ Test shards, scan, stitch, summarize """
+
+    # Every shard size counts each sequence once
+    filename = './tests/inputs/2.fa'
+    for size in [1, 2, 7, 50, 51, 100, 1000]:
+        tallies = [scan(shard) for shard in shards(filename, size)]
+        assert summarize(filename, stitch(tallies)) == FastaInfo(
+            filename, 49, 79, 64., 5)
+
+    filename = './tests/inputs/empty.fa'
+    assert shards(filename, 10) == [Shard(filename, 0, 0)]
+    assert summarize(filename, stitch(
+        [scan(shard) for shard in shards(filename, 10)])) == \
+        FastaInfo(filename, 0, 0, 0., 0)
+
+    # Sequences and headers split anywhere are joined as they are read
+    # in one piece
+    data = [
+        b'>chr1 one long sequence\n' + b'ACGTN\n' * 20,
+        b'junk\n>a desc>\nACGT\nAC\n>b\n\n>c\nNNNN\nA\n>d>\n>e\nA\r\nC\r\n',
+        b'>x ' + b'h' * 30 + b'\n' + b'G' * 50 + b'\n>y\nCC',
+    ]
+    for each in data:
+        with tempfile.NamedTemporaryFile(suffix='.fa') as tmp:
+            tmp.write(each)
+            tmp.flush()
+            whole = stitch([scan(Shard(tmp.name, 0, len(each)), True)])
+            expected = [
+                int(n) for lengths in seq_lengths(io.BytesIO(each))
+                for n in lengths
+            ]
+            assert sorted(whole.lengths) == sorted(expected)
+            for size in range(1, len(each) + 1):
+                tally = stitch(
+                    [scan(shard, True) for shard in shards(tmp.name, size)])
+                assert tally.num_seqs == len(expected)
+                assert tally.total == sum(expected)
+                assert sorted(tally.lengths) == sorted(expected)
+                assert list(tally.counts) == list(whole.counts)
+
+
+# --------------------------------------------------
+def test_assemble() -> None:
+    """ Test assemble """
+
+    # Any shards give the same stats
+    filename = './tests/inputs/2.fa'
+    for size in [1, 50, 1000]:
+        tallies = [scan(shard, True) for shard in shards(filename, size)]
+        assert assemble(stitch(tallies)) == Assembly(320, 59, 3, 49, 45.31, 0,
+                                                     [5, 0, 0, 0, 0, 0])
+
+    counts = np.zeros(256, dtype=np.int64)
+    counts[list(b'ACGTNgn')] = [10, 5, 5, 10, 3, 10, 2]
+    lengths = np.array([5000, 40, 2000000, 300, 100, 1000], dtype=np.uint32)
+    assert assemble(Tally(0, 0, 0, 0, lengths, counts)) == \
+        Assembly(2006440, 2000000, 1, 2000000, 50., 5, [1, 2, 2, 0, 0, 1])
+
+    # Totals and single sequences past 32 bits
+    lengths = compact([2**31] * 3)
+    assert lengths.dtype == np.uint32
+    assert assemble(Tally(0, 0, 0, 0, lengths, counts)) == \
+        Assembly(3 * 2**31, 2**31, 2, 2**31, 50., 5, [0, 0, 0, 0, 0, 3])
+
+    long = Tally(1, 2**32 + 10, 2**32 + 10, 2**32 + 10,
+                 compact([2**32 + 10]), counts, tail=2**32 - 1)
+    tally = stitch(
+        [long, Tally(0, 0, 0, 0, compact([]), counts, Piece(7, counts))])
+    assert tally.lengths.dtype == np.int64
+    assert sorted(tally.lengths) == [2**32 + 6, 2**32 + 10]
+    assert (tally.num_seqs, tally.total, tally.max_len) == \
+        (2, 2**33 + 16, 2**32 + 10)
+    assert assemble(tally).histogram == [0, 0, 0, 0, 0, 2]
+
+    filename = './tests/inputs/empty.fa'
+    assert assemble(stitch([scan(shard, True)
+                            for shard in shards(filename, 1)])) \
+        == Assembly(0, 0, 0, 0, 0., 0, [0] * 6)
 
 
 # --------------------------------------------------
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+""" Mimic seqmagick """
+
+import argparse
+import io
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional
+import numpy as np
+from tabulate import tabulate
+
+BLOCK_SIZE = 2**22
+NEWLINE, SPACE, HEADER = ord('\n'), ord(' '), ord('>')
+
+
+class Args(NamedTuple):
+    """ Command-line arguments """
+    files: List[BinaryIO]
+    tablefmt: str
+
+
+class FastaInfo(NamedTuple):
+    """ FASTA file information """
+    filename: str
+    min_len: int
+    max_len: int
+    avg_len: float
+    num_seqs: int
+
+
+# --------------------------------------------------
+def get_args() -> Args:
+    """Get command-line arguments"""
+
+    parser = argparse.ArgumentParser(
+        description='Mimic seqmagick',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument('file',
+                        metavar='FILE',
+                        type=argparse.FileType('rb'),
+                        nargs='+',
+                        help='Input FASTA file(s)')
+
+    parser.add_argument('-t',
+                        '--tablefmt',
+                        metavar='table',
+                        type=str,
+                        choices=[
+                            'plain', 'simple', 'grid', 'pipe', 'orgtbl', 'rst',
+                            'mediawiki', 'latex', 'latex_raw', 'latex_booktabs'
+                        ],
+                        default='plain',
+                        help='Tabulate table style')
+
+    args = parser.parse_args()
+
+    return Args(args.file, args.tablefmt)
+
+
+# --------------------------------------------------
+def main() -> None:
+    """ Make a jazz noise here """
+
+    args = get_args()
+    data = [process(fh) for fh in args.files]
+    hdr = ['name', 'min_len', 'max_len', 'avg_len', 'num_seqs']
+    print(tabulate(data, tablefmt=args.tablefmt, headers=hdr, floatfmt='.2f'))
+
+
+# --------------------------------------------------
+def process(fh: BinaryIO) -> FastaInfo:
+    """ Process a file, keeping only running totals of the lengths """
+
+    min_len, max_len, total, num_seqs = 0, 0, 0, 0
+    for lengths in seq_lengths(fh):
+        if len(lengths):
+            low, high = int(lengths.min()), int(lengths.max())
+            min_len = min(min_len, low) if num_seqs else low
+            max_len = max(max_len, high)
+            total += int(lengths.sum())
+            num_seqs += len(lengths)
+
+    return FastaInfo(filename=fh.name,
+                     min_len=min_len,
+                     max_len=max_len,
+                     avg_len=round(total / num_seqs, 2) if num_seqs else 0.,
+                     num_seqs=num_seqs)
+
+
+# --------------------------------------------------
+def seq_lengths(fh: BinaryIO,
+                block_size: int = BLOCK_SIZE,
+                at_line_start: bool = True,
+                limit: Optional[int] = None,
+                counts: Optional[np.ndarray] = None) -> Iterator[np.ndarray]:
+    """
+    Lengths of the sequences that end in each raw block of the file. A
+    header is a ">" at the start of a line and runs to the end of the
+    line. Any other bytes but whitespace and control characters are
+    bases, as Bio.SeqIO reads them. Anything before the first header is
+    skipped. With limit, no more than that many bytes are read, so the
+    last length is of the part of a sequence before the limit. If given,
+    counts has the number of each byte value in the sequences,
+    whitespace included, added to it.
+
+    The whitespace of a block is found with one comparison, and the
+    headers by looking after each newline. Every header runs to the
+    newline after the one it follows, so the span of each sequence and
+    the whitespace inside it are found by indexing the newlines rather
+    than searching for them, and there is no loop over records or lines.
+    """
+
+    length = -1  # No record until the first header
+    in_header = False
+    offset = 0
+
+    while block := fh.read(block_size if limit is None else
+                           min(block_size, limit - offset)):
+        arr = np.frombuffer(block, dtype=np.uint8)
+        end = len(arr)
+        spaces = np.flatnonzero(arr <= SPACE)
+        where = np.flatnonzero(arr[spaces] == NEWLINE)
+        newlines = spaces[where]
+
+        # Each newline and its index among the spaces, after a line
+        # before the block and before a line after it
+        pos = np.concatenate([[-1], newlines, [end]])
+        idx = np.concatenate([[-1], where, [len(spaces) - 1]])
+
+        # A header starts with ">" after a newline, or at the start of
+        # the block, and runs to the next newline
+        after = newlines[newlines < end - 1] + 1
+        heads = np.flatnonzero(arr[after] == HEADER) + 1
+        if at_line_start and block.startswith(b'>'):
+            heads = np.insert(heads, 0, 0)
+
+        # Bases are the bytes from each header's end to the next
+        # header that are not whitespace
+        first = np.concatenate([[1 if in_header else 0], heads + 1])
+        begins = (pos[first] + 1).clip(max=end)
+        stops = np.append(pos[heads] + 1, end)
+        bases = stops - begins - (np.append(idx[heads], len(spaces) - 1) -
+                                  idx[first])
+
+        if counts is not None:
+            # Mask the bytes outside the sequences by alternating runs
+            keep = 0 if length >= 0 else 1
+            seq_begins, seq_stops = begins[keep:], stops[keep:]
+            runs = np.empty(2 * len(seq_begins) + 1, dtype=np.int64)
+            runs[0::2] = np.append(seq_begins, end) - np.append(0, seq_stops)
+            runs[1::2] = seq_stops - seq_begins
+            inside = np.repeat(np.arange(len(runs)) % 2 == 1, runs)
+            counts += byte_counts(arr[:end][inside])
+
+        if length >= 0:
+            bases[0] += length
+            yield bases[:-1]
+        else:
+            yield bases[1:-1]
+        length = int(bases[-1]) if len(heads) or length >= 0 else -1
+
+        in_header = bool(heads[-1] == len(newlines)) if len(heads) else \
+            in_header and not len(newlines)
+        at_line_start = block.endswith(b'\n')
+        offset += len(block)
+
+    if length >= 0:
+        yield np.array([length])
+
+
+# --------------------------------------------------
+def byte_counts(arr: np.ndarray) -> np.ndarray:
+    """
+    The number of each of the 256 byte values, counted in pairs as 16-bit
+    values, which is twice as fast as np.bincount() on the bytes
+    """
+
+    even = len(arr) - len(arr) % 2
+    pairs = np.bincount(arr[:even].view(np.uint16),
+                        minlength=2**16).reshape(256, 256)
+    counts = pairs.sum(axis=0) + pairs.sum(axis=1)
+    if even < len(arr):
+        counts[arr[-1]] += 1
+
+    return counts
+
+
+# --------------------------------------------------
+def test_byte_counts() -> None:
+    """ Test byte_counts """
+
+    arr = np.frombuffer(b'ACGTNNacgt\n\xff\x00A', dtype=np.uint8)
+    for i in range(len(arr) + 1):
+        assert list(byte_counts(arr[:i])) == list(
+            np.bincount(arr[:i], minlength=256))
+
+
+# --------------------------------------------------
+def test_seq_lengths() -> None:
+    """ Test seq_lengths """
+
+    def lengths(data: bytes) -> List[int]:
+        found = [
+            [int(n) for lengths in seq_lengths(io.BytesIO(data), size)
+             for n in lengths]
+            for size in range(1, len(data) + 2)
+        ]
+        assert all(each == found[0] for each in found)
+        return found[0]
+
+    assert lengths(b'') == []
+    assert lengths(b'>SEQ0\nAAA') == [3]
+    assert lengths(b'>SEQ0\nAAA\n>SEQ1\nCCCC\n') == [3, 4]
+    assert lengths(b'>a\n>b\nAC\nGT\r\n') == [0, 4]
+    assert lengths(b'>a x>y\nAC\n\n> b\nA C\n>c') == [2, 2, 0]
+    assert lengths(b'junk\n>a\nAC') == [2]
+    assert lengths(b'>a desc>\nACGT\nAC\n>b\n\n>c\nNNNN\nA\n>d>\n>e\nA\r\n'
+                   b'C\r\n') == [6, 0, 5, 0, 2]
+
+    # Reading up to a limit is the same as reading only those bytes
+    data = b'>a desc>\nACGT\nAC\n>b\n\n>c\nNNNN\nA\n>d>\n>e\nA\r\nC\r\n'
+    for cut in range(len(data) + 1):
+        for size in [1, 4, 64]:
+            found = seq_lengths(io.BytesIO(data), size, limit=cut)
+            assert [int(n) for lengths in found
+                    for n in lengths] == lengths(data[:cut])
+
+    # Only the bytes of the sequences are counted
+    for size in range(1, len(data) + 2):
+        counts = np.zeros(256, dtype=np.int64)
+        for _ in seq_lengths(io.BytesIO(b'GG\n' + data), size, counts=counts):
+            pass
+        assert {chr(byte): int(n) for byte, n in enumerate(counts) if n} == {
+            'A': 4, 'C': 3, 'G': 1, 'T': 1, 'N': 4, '\n': 7, '\r': 2
+        }
+
+
+# --------------------------------------------------
+def test_process() -> None:
+    """ Test process """
+
+    def info(data: bytes) -> FastaInfo:
+        fh = io.BytesIO(data)
+        fh.name = 'x.fa'  # type: ignore
+        return process(fh)
+
+    assert info(b'') == FastaInfo('x.fa', 0, 0, 0., 0)
+    assert info(b'>SEQ0\nAAA') == FastaInfo('x.fa', 3, 3, 3., 1)
+    assert info(b'>SEQ0\nAAA\n>SEQ1\nCCCC') == FastaInfo('x.fa', 3, 4, 3.5, 2)
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
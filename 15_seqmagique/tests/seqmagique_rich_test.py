@@ -0,0 +1,103 @@
+""" Tests for seqmagique_rich.py """
+
+import os
+import platform
+import random
+import re
+import string
+from subprocess import getstatusoutput
+from typing import List
+
+PRG = './seqmagique_rich.py'
+RUN = f'python {PRG}' if platform.system() == 'Windows' else PRG
+INPUT1 = './tests/inputs/1.fa'
+INPUT2 = './tests/inputs/2.fa'
+EMPTY = './tests/inputs/empty.fa'
+
+
+# --------------------------------------------------
+def test_exists() -> None:
+    """ Program exists """
+
+    assert os.path.isfile(PRG)
+
+
+# --------------------------------------------------
+def test_usage() -> None:
+    """ Prints usage """
+
+    for flag in ['', '-h', '--help']:
+        rv, out = getstatusoutput(f'{RUN} {flag}')
+        assert out.lower().startswith('usage:')
+
+
+# --------------------------------------------------
+def test_bad_file() -> None:
+    """ Dies on bad file """
+
+    bad = random_string()
+    rv, out = getstatusoutput(f'{RUN} {INPUT1} {bad}')
+    assert rv != 0
+    assert out.lower().startswith('usage:')
+    assert re.search(f"No such file or directory: '{bad}'", out)
+
+
+# --------------------------------------------------
+def test_bad_args() -> None:
+    """ Dies on bad --jobs, --shard_size """
+
+    for flag in ['-j', '--jobs', '-s', '--shard_size']:
+        bad = random.choice([0, -1])
+        rv, out = getstatusoutput(f'{RUN} {flag} {bad} {INPUT1}')
+        assert rv != 0
+        assert re.search(f'"{bad}" must be > 0', out)
+
+
+# --------------------------------------------------
+def rows(out: str) -> List[List[str]]:
+    """ The cells of each row of the table """
+
+    return [[cell.strip() for cell in line.split('│')[1:-1]]
+            for line in out.splitlines() if line.startswith('│')]
+
+
+# --------------------------------------------------
+def test_files() -> None:
+    """ Rows are in input order for any number of jobs and shards """
+
+    expected = [[INPUT2, '49', '79', '64.00', '5'],
+                [EMPTY, '0', '0', '0.00', '0'],
+                [INPUT1, '50', '50', '50.00', '1']]
+
+    for opts in ['', '-j 1', '-j 3', '-j 2 -s 20', '--jobs 4 --shard_size 1']:
+        rv, out = getstatusoutput(f'{RUN} -q {opts} {INPUT2} {EMPTY} {INPUT1}')
+        assert rv == 0
+        assert rows(out) == expected
+
+
+# --------------------------------------------------
+def test_extended() -> None:
+    """ Adds the assembly stats and a histogram of the lengths """
+
+    rv, out = getstatusoutput(
+        f'COLUMNS=200 {RUN} -q -x -s 30 {INPUT2} {EMPTY} {INPUT1}')
+    assert rv == 0
+    assert rows(out) == [
+        [INPUT2, '49', '79', '64.00', '5', '320', '59', '3', '49', '45.31',
+         '0'],
+        [EMPTY, '0', '0', '0.00', '0', '0', '0', '0', '0', '0.00', '0'],
+        [INPUT1, '50', '50', '50.00', '1', '50', '50', '1', '50', '52.00',
+         '0'],
+        [INPUT2, '5', '0', '0', '0', '0', '0'],
+        [EMPTY, '0', '0', '0', '0', '0', '0'],
+        [INPUT1, '1', '0', '0', '0', '0', '0'],
+    ]
+    assert 'Sequences by length' in out
+
+
+# --------------------------------------------------
+def random_string() -> str:
+    """ Generate a random string """
+
+    k = random.randint(5, 10)
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=k))
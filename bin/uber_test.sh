@@ -10,7 +10,7 @@ echo "ROOT $ROOT"
 PYLINTRC="$ROOT/.pylintrc"
 [[ -f "$PYLINTRC" ]] && export PYLINTRC
 
-DIRS=$(find "$ROOT" -mindepth 1 -maxdepth 1 -type d -name \[01\]\* | sort)
+DIRS=$(find "$ROOT" -mindepth 1 -maxdepth 1 -type d -name \[01\]\* | sort && echo "$ROOT/lib")
 for DIR in $DIRS; do
     BASE=$(basename "$DIR")
     echo "==> $BASE <=="
@@ -0,0 +1,46 @@
+""" Helpers shared by the chapters' multiprocessing tools """
+
+import multiprocessing
+from collections import deque
+from multiprocessing.pool import AsyncResult, Pool
+from typing import Callable, Deque, Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+# --------------------------------------------------
+def ordered(pool: Pool, func: Callable[[T], R],
+            tasks: Iterable[T], window: int) -> Iterator[R]:
+    """
+    Results of func in the order of the tasks. Pool.imap() reads every
+    task up front, so at most window tasks are held, finished or not,
+    and each is yielded once those before it are done.
+    """
+
+    pending: Deque[AsyncResult] = deque()
+    for task in tasks:
+        pending.append(pool.apply_async(func, (task, )))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+
+    while pending:
+        yield pending.popleft().get()
+
+
+# --------------------------------------------------
+def test_ordered() -> None:
+    """ Test ordered reads no more than window tasks ahead """
+
+    read: List[int] = []
+
+    def tasks() -> Iterator[int]:
+        for i in range(10):
+            read.append(i)
+            yield i
+
+    with multiprocessing.Pool(2) as pool:
+        results = ordered(pool, abs, tasks(), 3)
+        assert next(results) == 0
+        assert len(read) == 3
+        assert list(results) == list(range(1, 10))